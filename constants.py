@@ -30,6 +30,13 @@ DEFAULT_PROFILE = "default"
 # Интервалы проверок (секунды)
 PROCESS_CHECK_INTERVAL = 0.1
 PROCESS_MONITOR_INTERVAL = 0.2
+PROCESS_MONITOR_MAX_INTERVAL = 2.0  # предел периода опроса, пока пользователь бездействует
+CONFIG_WATCH_INTERVAL = 1.0
+AUTOSAVE_INTERVAL = 60.0  # сохранение выученных настроек во время сеанса asyncio
+
+# Максимальный размер кэша имен процессов по PID
+PID_CACHE_SIZE = 128
+PID_CACHE_TTL = 2.0  # секунд, в течение которых имя из кэша не перепроверяется
 
 # Проверка доступности Windows API
 try:
@@ -17,6 +17,9 @@ def __getattr__(name):
     elif name == 'ActionExecutor':
         from .action_executor import ActionExecutor
         return ActionExecutor
+    elif name in ('InputBackend', 'KeyboardBackend', 'SimulatedBackend'):
+        from . import input_backend
+        return getattr(input_backend, name)
     else:
         raise AttributeError(f"module 'core' has no attribute '{name}'")
 
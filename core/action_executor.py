@@ -2,25 +2,46 @@
 Исполнитель действий для приложения переназначения клавиш.
 """
 
-import time
-from datetime import datetime
+from contextlib import nullcontext
+from dataclasses import dataclass
+from time import perf_counter_ns
+from typing import Any, Callable, ContextManager, Dict, Optional
 
-try:
-    import pyperclip
-    import keyboard
-except ImportError:
-    pass  # Обработка ошибок будет в main
+from core.datetime_renderer import DATE_FORMAT_PREFIX, DateTemplateError, DateTimeRenderer
+from core.input_backend import InputBackend, KeyboardBackend
+from core.latency_tracker import LatencyTracker
+from core.text_injector import TextInjector
+from models.mapping import ActionType
+
+
+@dataclass(frozen=True)
+class CompiledAction:
+    """Предварительно разобранное действие, готовое к выполнению."""
+
+    action: str
+    action_type: ActionType
+    run: Callable[[], None]
+
+    def __call__(self) -> None:
+        self.run()
 
 
 class ActionExecutor:
     """Выполнение различных типов действий."""
 
-    def __init__(self):
-        self._date_formats = {
-            1: "января", 2: "февраля", 3: "марта", 4: "апреля",
-            5: "мая", 6: "июня", 7: "июля", 8: "августа",
-            9: "сентября", 10: "октября", 11: "ноября", 12: "декабря"
-        }
+    def __init__(self, backend: Optional[InputBackend] = None):
+        self.backend = backend if backend is not None else KeyboardBackend()
+        self.text_injector = TextInjector(self.backend)
+        self._compiled_cache: Dict[str, CompiledAction] = {}
+        self.latency_tracker: Optional[LatencyTracker] = None
+        self.datetime_renderer = DateTimeRenderer()
+
+        # Поиск макроса по имени для действий 'macro:имя' (задает KeyboardRemapper)
+        self.macro_resolver: Optional[Callable[[str], Any]] = None
+
+        # Отпускает удерживаемые модификаторы на время вставки (задает KeyboardRemapper на время сеанса:
+        # какие модификаторы удерживаются, знает его единый хук)
+        self.modifier_guard: Optional[Callable[[], ContextManager[None]]] = None
 
         self._currency_symbols = {
             'ruble': '₽',
@@ -52,20 +73,19 @@ class ActionExecutor:
 
     def get_date_long(self) -> str:
         """Текущая дата в длинном формате"""
-        now = datetime.now()
-        return f"{now.day} {self._date_formats[now.month]} {now.year}"
+        return self.datetime_renderer.render('date_long')
 
     def get_date_short(self) -> str:
         """Текущая дата в коротком формате"""
-        return datetime.now().strftime("%d.%m.%Y")
+        return self.datetime_renderer.render('date_short')
 
     def get_datetime_full(self) -> str:
         """Дата и время"""
-        return datetime.now().strftime("%d.%m.%Y %H:%M:%S")
+        return self.datetime_renderer.render('datetime')
 
     def get_time(self) -> str:
         """Текущее время"""
-        return datetime.now().strftime("%H:%M:%S")
+        return self.datetime_renderer.render('time')
 
     def get_currency_symbol(self, currency: str) -> str:
         """Получить символ валюты"""
@@ -77,47 +97,107 @@ class ActionExecutor:
 
     def insert_text(self, text: str) -> None:
         """Вставка текста с поддержкой русского языка и многострочности"""
-        try:
-            # Используем буфер обмена для русского текста
-            original = pyperclip.paste()
-            pyperclip.copy(text)
-            keyboard.press_and_release('ctrl+v')
-            time.sleep(0.05)
-            pyperclip.copy(original)
-        except ImportError:
-            # Резервный метод для многострочного текста
-            lines = text.split('\n')
-            for i, line in enumerate(lines):
-                keyboard.write(line)
-                if i < len(lines) - 1:
-                    keyboard.press_and_release('enter')
-                    time.sleep(0.05)
+        started_ns = perf_counter_ns()
+        with self._released_modifiers():
+            method = self.text_injector.inject(text)
 
-    def execute_action(self, action: str) -> None:
-        """Выполнение действия"""
-        if action == "date_long":
-            self.insert_text(self.get_date_long())
-        elif action == "date_short":
-            self.insert_text(self.get_date_short())
-        elif action == "datetime":
-            self.insert_text(self.get_datetime_full())
-        elif action == "time":
-            self.insert_text(self.get_time())
+        if self.latency_tracker is not None:
+            self.latency_tracker.record('inject', perf_counter_ns() - started_ns, action_type=f'text_{method}')
+
+    def send_combo(self, combo: str) -> None:
+        """Отправка комбинации клавиш без удерживаемых пользователем модификаторов"""
+        with self._released_modifiers():
+            self.backend.send(combo)
+
+    def _released_modifiers(self) -> ContextManager[None]:
+        guard = self.modifier_guard
+        return guard() if guard is not None else nullcontext()
+
+    def compile_action(self, action: str) -> CompiledAction:
+        """Разбирает строку действия один раз и возвращает готовое замыкание."""
+        compiled = self._compiled_cache.get(action)
+        if compiled is not None:
+            return compiled
+
+        date_actions = {
+            "date_long": ActionType.DATE_LONG,
+            "date_short": ActionType.DATE_SHORT,
+            "datetime": ActionType.DATETIME,
+            "time": ActionType.TIME,
+        }
+
+        if action in date_actions or action.startswith(DATE_FORMAT_PREFIX):
+            action_type = date_actions.get(action, ActionType.DATE_FORMAT)
+            try:
+                template = self.datetime_renderer.compile_action(action)
+                run = lambda: self.insert_text(template.render())
+            except DateTemplateError as e:
+                print(f"⚠️  {e} (действие '{action}' ничего не вставит)")
+                run = lambda: None
+        elif action.startswith('macro:'):
+            action_type = ActionType.MACRO
+            macro_name = action[len('macro:'):]
+            run = lambda: self.execute_macro(macro_name)
         elif action.startswith('currency:'):
-            currency = action.replace('currency:', '')
-            symbol = self.get_currency_symbol(currency)
-            if symbol:
-                self.insert_text(symbol)
+            action_type = ActionType.CURRENCY
+            run = self._make_text_runner(self.get_currency_symbol(action[len('currency:'):]))
         elif action.startswith('symbol:'):
-            symbol_name = action.replace('symbol:', '')
-            symbol = self.get_ascii_symbol(symbol_name)
-            if symbol:
-                self.insert_text(symbol)
-        elif action.startswith('"') and action.endswith('"'):
-            text = action[1:-1]
-            self.insert_text(text)
-        elif action.startswith('"""') and action.endswith('"""'):
-            text = action[3:-3]
-            self.insert_text(text)
+            action_type = ActionType.SYMBOL
+            run = self._make_text_runner(self.get_ascii_symbol(action[len('symbol:'):]))
+        elif len(action) >= 6 and action.startswith('"""') and action.endswith('"""'):
+            action_type = ActionType.MULTILINE_TEXT
+            run = self._make_text_runner(action[3:-3])
+        elif len(action) >= 2 and action.startswith('"') and action.endswith('"'):
+            action_type = ActionType.TEXT
+            run = self._make_text_runner(action[1:-1])
         else:
-            keyboard.send(action)
\ No newline at end of file
+            action_type = ActionType.KEY_COMBO
+            run = lambda: self.send_combo(action)
+
+        compiled = CompiledAction(action=action, action_type=action_type, run=run)
+        self._compiled_cache[action] = compiled
+        return compiled
+
+    def compile_mappings(self, mappings: Dict[str, str]) -> Dict[str, CompiledAction]:
+        """Строит таблицу диспетчеризации клавиша → скомпилированное действие."""
+        return {key: self.compile_action(action) for key, action in mappings.items()}
+
+    def compile_hotstring(self, abbreviation: str, action: str) -> CompiledAction:
+        """Действие сокращения: стирает набранную часть сокращения и выполняет действие.
+
+        Последний символ сокращения подавляется хуком, поэтому стирается
+        на один символ меньше длины сокращения.
+        """
+        compiled = self.compile_action(action)
+        erase_count = len(abbreviation) - 1
+        backend = self.backend
+
+        def run():
+            for _ in range(erase_count):
+                backend.send('backspace')
+            compiled()
+
+        return CompiledAction(action=action, action_type=compiled.action_type, run=run)
+
+    def execute_macro(self, name: str) -> None:
+        """Выполняет макрос по имени."""
+        macro = self.macro_resolver(name) if self.macro_resolver is not None else None
+        if macro is None:
+            print(f"⚠️  Макрос '{name}' не найден")
+            return
+        macro.execute(self)
+
+    def _make_text_runner(self, text: str) -> Callable[[], None]:
+        """Создает замыкание вставки фиксированного текста."""
+        if not text:
+            return lambda: None
+        return lambda: self.insert_text(text)
+
+    def execute_action(self, action: str) -> None:
+        """Выполнение действия"""
+        compiled = self.compile_action(action)
+        started_ns = perf_counter_ns()
+        compiled()
+        if self.latency_tracker is not None:
+            self.latency_tracker.record('execute', perf_counter_ns() - started_ns,
+                                        action_type=compiled.action_type.value)
@@ -0,0 +1,159 @@
+"""
+Очередь выполнения действий вне потока клавиатурного хука.
+"""
+
+import queue
+import threading
+from time import perf_counter_ns
+from typing import Callable, Optional, Tuple
+
+
+OVERFLOW_POLICIES = ('drop_oldest', 'drop_newest')
+
+
+class ActionQueue:
+    """Ограниченная очередь действий с одним упорядоченным рабочим потоком.
+
+    Хук только кладет действие в очередь и сразу возвращается, а вставка
+    текста, работа с буфером обмена и задержки выполняются в отдельном
+    потоке строго в порядке нажатий.
+    """
+
+    def __init__(self, maxsize: int = 64, overflow_policy: str = 'drop_oldest',
+                 on_complete: Optional[Callable[[str, Callable[[], None], int, int, int], None]] = None):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            overflow_policy = 'drop_oldest'
+
+        self.maxsize = max(1, int(maxsize))
+        self.overflow_policy = overflow_policy
+        self.dropped_count = 0
+        self.executed_count = 0
+        # Вызывается после действия: (клавиша, действие, постановка, начало, конец) в нс
+        self.on_complete = on_complete
+        self._queue: "queue.Queue[Tuple[Optional[str], Optional[Callable[[], None]], int]]" = queue.Queue(self.maxsize)
+        self._worker_thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    @property
+    def is_running(self) -> bool:
+        """Запущен ли рабочий поток."""
+        return self._worker_thread is not None
+
+    def start(self) -> None:
+        """Запускает рабочий поток."""
+        if self._worker_thread is not None:
+            return
+
+        self._stopping.clear()
+        self._worker_thread = threading.Thread(
+            target=self._worker,
+            name="ActionQueueWorker",
+            daemon=True
+        )
+        self._worker_thread.start()
+
+    def stop(self, timeout: float = 1.0) -> bool:
+        """Останавливает рабочий поток после выполнения уже поставленных действий.
+
+        С начала остановки новые действия не принимаются. Если очередь
+        полна, признак остановки вытесняет самые старые действия (они
+        считаются отброшенными). Возвращает False, если рабочий поток не
+        завершился за timeout секунд, например из-за зависшего действия:
+        тогда ожидающие действия отбрасываются, и поток завершится сразу
+        после текущего.
+        """
+        if self._worker_thread is None:
+            return True
+
+        self._stopping.set()
+        self._force_put((None, None, 0))
+        self._worker_thread.join(timeout=timeout)
+        if self._worker_thread.is_alive():
+            # Рабочий поток завершит текущее действие, но остальные уже не выполнит
+            self._discard_pending()
+            self._force_put((None, None, 0))
+            return False
+        self._worker_thread = None
+        return True
+
+    def submit(self, key: str, action: Callable[[], None], enqueued_ns: int = 0) -> bool:
+        """Ставит действие в очередь без блокировки. Возвращает False, если действие отброшено."""
+        if self._stopping.is_set():
+            self.dropped_count += 1
+            return False
+        return self._put((key, action, enqueued_ns or perf_counter_ns()))
+
+    def pending_count(self) -> int:
+        """Количество действий, ожидающих выполнения."""
+        return self._queue.qsize()
+
+    def _put(self, item: Tuple[str, Callable[[], None], int]) -> bool:
+        """Неблокирующая постановка в очередь с учетом политики переполнения."""
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            pass
+
+        if self.overflow_policy == 'drop_newest':
+            self.dropped_count += 1
+            return False
+
+        # drop_oldest: освобождаем место за счет самого старого действия
+        try:
+            self._queue.get_nowait()
+            self.dropped_count += 1
+        except queue.Empty:
+            pass
+
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            self.dropped_count += 1
+            return False
+
+    def _force_put(self, item: Tuple[Optional[str], Optional[Callable[[], None]], int]) -> None:
+        """Ставит элемент в очередь, вытесняя самые старые действия."""
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                pass
+            try:
+                self._queue.get_nowait()
+                self.dropped_count += 1
+            except queue.Empty:
+                pass
+
+    def _discard_pending(self) -> None:
+        """Удаляет из очереди все ожидающие действия."""
+        while True:
+            try:
+                key, action, _ = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if action is not None:
+                self.dropped_count += 1
+
+    def _worker(self) -> None:
+        """Рабочий поток: выполняет действия по одному в порядке поступления."""
+        while True:
+            key, action, enqueued_ns = self._queue.get()
+            if action is None:
+                break
+
+            started_ns = perf_counter_ns()
+            try:
+                action()
+                self.executed_count += 1
+            except Exception as e:
+                print(f"\n⚠️  Ошибка при выполнении действия для {key}: {e}")
+                continue
+
+            if self.on_complete is not None:
+                try:
+                    self.on_complete(key, action, enqueued_ns, started_ns, perf_counter_ns())
+                except Exception as e:
+                    print(f"\n⚠️  Ошибка при учете выполнения действия для {key}: {e}")
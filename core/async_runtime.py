@@ -0,0 +1,195 @@
+"""
+Среда выполнения сеанса переназначения на одном цикле asyncio.
+"""
+
+import asyncio
+import threading
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+from core.scheduler import DEFAULT_SCHEDULER, Scheduler, TimerHandle
+
+# Периодическая задача сеанса: (имя, период в секундах, вызов, блокирующий ли)
+_PeriodicTask = Tuple[str, float, Callable[[], None], bool]
+
+
+class LoopTimer(TimerHandle):
+    """Таймер цикла, который можно ставить и отменять из любого потока."""
+
+    def __init__(self, runtime: 'AsyncRuntime', callback: Callable[..., Any], args: Tuple[Any, ...],
+                 blocking: bool = False):
+        self._runtime = runtime
+        self._callback = callback
+        self._args = args
+        self._blocking = blocking
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        handle = self._handle
+        if handle is not None:
+            self._runtime.call_soon(handle.cancel)
+
+    def _arm(self, loop: asyncio.AbstractEventLoop, delay: float) -> None:
+        """Ставит таймер в цикл (вызывается в потоке цикла)."""
+        if not self.cancelled:
+            self._handle = loop.call_later(delay, self._fire, loop)
+            self._runtime._timers.add(self)
+
+    def _fire(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._handle = None
+        self._runtime._timers.discard(self)
+        if self.cancelled:
+            return
+        if self._blocking:
+            # Блокирующий вызов выполняется в пуле потоков цикла, run() дождется его при остановке
+            loop.run_in_executor(None, self._runtime._invoke, self._callback, self._args)
+        else:
+            self._runtime._invoke(self._callback, self._args)
+
+
+class AsyncRuntime(Scheduler):
+    """Цикл asyncio, которому принадлежит сеанс переназначения.
+
+    Цикл работает в потоке, вызвавшем run(), и заменяет несколько спящих
+    потоков: таймеры восстановления буфера обмена, таймаута
+    последовательностей и опроса активного окна ставятся в него через
+    call_later, а отслеживание файла конфигурации и автосохранение
+    выполняются задачами. Обратные вызовы хуков и источника смены окна
+    передаются в цикл через call_soon (call_soon_threadsafe), поэтому
+    состояние сеанса меняется только в одном потоке.
+
+    Остановка (stop() или Ctrl+C) отменяет задачи и ожидающие таймеры и
+    дожидается их завершения до возврата из run(). Таймеры, поставленные
+    вне работающего цикла (например, рабочим потоком действий во время
+    остановки), ждут в потоках DEFAULT_SCHEDULER.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._periodic: List[_PeriodicTask] = []
+        self._timers: Set[LoopTimer] = set()
+        self._stopping = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        """Работает ли цикл."""
+        return self._loop is not None
+
+    def in_loop_thread(self) -> bool:
+        """Вызван ли метод в потоке цикла."""
+        return self._loop_thread == threading.get_ident()
+
+    def add_periodic(self, name: str, interval: float, callback: Callable[[], None],
+                     blocking: bool = False) -> None:
+        """Добавляет задачу, вызывающую callback каждые interval секунд.
+
+        Блокирующий вызов (запись файлов) выполняется в пуле потоков
+        цикла, чтобы не задерживать таймеры и обратные вызовы.
+        """
+        self._periodic.append((name, interval, callback, blocking))
+
+    def run(self) -> None:
+        """Выполняет цикл до вызова stop() или Ctrl+C и завершает все задачи."""
+        loop = asyncio.new_event_loop()
+        with self._lock:
+            self._loop = loop
+            self._loop_thread = threading.get_ident()
+        main = loop.create_task(self._main())
+        try:
+            loop.run_until_complete(main)
+        finally:
+            with self._lock:
+                self._loop = None
+            # Ctrl+C прерывает run_until_complete: задачи отменяются здесь же
+            try:
+                main.cancel()
+                loop.run_until_complete(asyncio.gather(main, return_exceptions=True))
+                self._cancel_timers()
+                loop.run_until_complete(loop.shutdown_default_executor())
+            finally:
+                self._loop_thread = None
+                self._stop_event = None
+                self._stopping = False
+                loop.close()
+
+    def stop(self) -> None:
+        """Просит цикл завершиться (из любого потока)."""
+        self._stopping = True
+        self.call_soon(self._request_stop)
+
+    def call_soon(self, callback: Callable[..., Any], *args: Any) -> bool:
+        """Передает вызов в цикл. Возвращает False, если цикл не работает."""
+        with self._lock:
+            loop = self._loop
+            if loop is None:
+                return False
+            if self.in_loop_thread():
+                loop.call_soon(self._invoke, callback, args)
+            else:
+                loop.call_soon_threadsafe(self._invoke, callback, args)
+            return True
+
+    def call_later(self, delay: float, callback: Callable[..., Any], *args: Any,
+                   name: Optional[str] = None, daemon: bool = True,
+                   blocking: bool = False) -> TimerHandle:
+        with self._lock:
+            loop = self._loop
+            if loop is not None:
+                timer = LoopTimer(self, callback, args, blocking)
+                if self.in_loop_thread():
+                    timer._arm(loop, delay)
+                else:
+                    loop.call_soon_threadsafe(timer._arm, loop, delay)
+                return timer
+        return DEFAULT_SCHEDULER.call_later(delay, callback, *args, name=name, daemon=daemon,
+                                            blocking=blocking)
+
+    async def _main(self) -> None:
+        self._stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        tasks = [
+            loop.create_task(self._run_periodic(interval, callback, blocking), name=name)
+            for name, interval, callback, blocking in self._periodic
+        ]
+        try:
+            if not self._stopping:
+                await self._stop_event.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_periodic(self, interval: float, callback: Callable[[], None], blocking: bool) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if blocking:
+                    await loop.run_in_executor(None, callback)
+                else:
+                    callback()
+            except Exception as e:
+                print(f"⚠️  Ошибка фоновой задачи сеанса: {e}")
+
+    def _request_stop(self) -> None:
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    def _cancel_timers(self) -> None:
+        """Отменяет таймеры, которые еще ждут в цикле."""
+        timers, self._timers = self._timers, set()
+        for timer in timers:
+            timer.cancelled = True
+            if timer._handle is not None:
+                timer._handle.cancel()
+
+    @staticmethod
+    def _invoke(callback: Callable[..., Any], args: Tuple[Any, ...]) -> None:
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"⚠️  Ошибка обратного вызова сеанса: {e}")
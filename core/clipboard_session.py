@@ -0,0 +1,206 @@
+"""
+Сеанс буфера обмена с отложенным объединенным восстановлением.
+"""
+
+import itertools
+import threading
+import time
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from core.input_backend import InputBackend
+from core.paste_calibrator import PasteSettleCalibrator
+from core.scheduler import DEFAULT_SCHEDULER, Scheduler, TimerHandle
+
+# Пауза после Ctrl+V, за которую целевое окно успевает прочитать буфер обмена
+PASTE_SETTLE_DELAY = 0.05
+
+
+class ClipboardSession:
+    """Захватывает исходное содержимое буфера обмена один раз на серию вставок.
+
+    Первая вставка серии сохраняет содержимое буфера обмена, следующие
+    только записывают в него свой текст. Восстановление выполняется
+    один раз по таймеру вне потока хука, после restore_delay секунд без
+    новых вставок. Если за это время пользователь сам скопировал что-то
+    в буфер обмена, его содержимое не перезаписывается.
+
+    С калибратором пауза после вставки берется для активного процесса,
+    имя которого возвращает foreground(). В режиме калибровки бэкенд
+    сообщает, когда приложение прочитало буфер обмена: это время
+    становится замером, а пауза перед следующей вставкой заканчивается
+    сразу после чтения.
+
+    Таймер восстановления ставит scheduler (поток или цикл сеанса) как
+    блокирующий вызов: в цикле asyncio он выполняется в пуле потоков.
+    Пауза после вставки выжидается без блокировки сеанса.
+    """
+
+    def __init__(self, backend: InputBackend, restore_delay: float = 0.5,
+                 settle_delay: float = PASTE_SETTLE_DELAY):
+        self.backend = backend
+        self.restore_delay = restore_delay
+        self.settle_delay = settle_delay
+        self.scheduler: Scheduler = DEFAULT_SCHEDULER
+        self.calibrator: Optional[PasteSettleCalibrator] = None
+        self.foreground: Optional[Callable[[], Optional[str]]] = None
+
+        self._lock = threading.Lock()
+        self._original: Optional[str] = None
+        self._last_text: Optional[str] = None
+        self._last_paste_time = 0.0
+        # Пауза последней вставки (для откалиброванного процесса короче settle_delay)
+        self._settle = settle_delay
+
+        # Замер текущей вставки: (номер, процесс, время Ctrl+V); _read - буфер уже прочитан
+        self._probe: Optional[Tuple[int, Optional[str], float]] = None
+        self._probe_ids = itertools.count(1)
+        self._probe_lock = threading.Lock()
+        self._read = threading.Event()
+        self._timer: Optional[TimerHandle] = None
+        self._generation = 0
+
+        self.captures = 0
+        self.pastes = 0
+        self.restores = 0
+
+    @property
+    def is_active(self) -> bool:
+        """Захвачено ли исходное содержимое буфера обмена."""
+        return self._original is not None
+
+    def paste(self, text: str) -> None:
+        """Вставляет текст через буфер обмена и откладывает восстановление."""
+        calibrator = self.calibrator
+        process_name = None
+        if calibrator is not None and calibrator.is_used and self.foreground is not None:
+            process_name = self.foreground()
+
+        # Предыдущая вставка должна успеть прочитать буфер обмена
+        self._lock_settled()
+        try:
+            captured = self._original is None
+            if captured:
+                self._original = self.backend.paste_clipboard()
+                self.captures += 1
+            self._end_probe()
+
+            self._read.clear()
+            try:
+                if calibrator is None or not calibrator.calibrating or \
+                        not self._copy_tracked(text, process_name):
+                    self.backend.copy_clipboard(text)
+            except Exception:
+                # Буфер обмена занят: захват этой вставки отменяется, ошибку обрабатывает вызывающий
+                self._end_probe()
+                if captured:
+                    self._original = None
+                raise
+            self.backend.send('ctrl+v')
+            self._last_text = text
+            self._last_paste_time = time.monotonic()
+            self._settle = calibrator.delay_for(process_name, self.settle_delay) \
+                if calibrator is not None else self.settle_delay
+            self.pastes += 1
+            self._schedule_restore()
+        finally:
+            self._lock.release()
+
+    def flush(self) -> None:
+        """Немедленно восстанавливает буфер обмена (например, при остановке)."""
+        self._lock_settled()
+        try:
+            self._cancel_timer()
+            if self._original is not None:
+                self._restore_locked()
+        finally:
+            self._lock.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Счетчики захватов, вставок и восстановлений."""
+        return {
+            'captures': self.captures,
+            'pastes': self.pastes,
+            'restores': self.restores,
+        }
+
+    def _lock_settled(self) -> None:
+        """Берет блокировку, когда пауза после последней вставки серии закончилась.
+
+        Пауза заканчивается раньше, если бэкенд сообщил о чтении буфера
+        обмена. Ожидание идет без блокировки, поэтому после него паузу
+        новой вставки из другого потока проверяем заново.
+        """
+        while True:
+            self._lock.acquire()
+            remaining = self._last_paste_time + self._settle - time.monotonic()
+            if self._original is None or remaining <= 0 or self._read.is_set():
+                return
+            self._lock.release()
+            self._read.wait(remaining)
+
+    def _copy_tracked(self, text: str, process_name: Optional[str]) -> bool:
+        """Записывает текст с замером времени до его чтения (под блокировкой)."""
+        probe_id = next(self._probe_ids)
+        with self._probe_lock:
+            self._probe = (probe_id, process_name, time.monotonic())
+        if self.backend.copy_clipboard_tracked(text, partial(self._on_clipboard_read, probe_id)):
+            return True
+        with self._probe_lock:
+            self._probe = None
+        return False
+
+    def _on_clipboard_read(self, probe_id: int) -> None:
+        """Приложение прочитало вставленный текст (вызывается потоком бэкенда)."""
+        with self._probe_lock:
+            probe = self._probe
+            if probe is None or probe[0] != probe_id:
+                return
+            self._probe = None
+        self._read.set()
+        calibrator = self.calibrator
+        if calibrator is not None:
+            calibrator.record(probe[1], time.monotonic() - probe[2])
+
+    def _end_probe(self) -> None:
+        """Завершает замер перед сменой или чтением буфера обмена: непрочитанная вставка - промах."""
+        with self._probe_lock:
+            probe, self._probe = self._probe, None
+        calibrator = self.calibrator
+        if probe is not None and calibrator is not None:
+            calibrator.record_missed(probe[1])
+
+    def _schedule_restore(self) -> None:
+        """Перезапускает таймер восстановления (вызывается под блокировкой)."""
+        self._cancel_timer()
+        self._generation += 1
+        delay = max(self.restore_delay, self._settle)
+        self._timer = self.scheduler.call_later(delay, self._on_timer, self._generation,
+                                                name="ClipboardRestore", daemon=False, blocking=True)
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _on_timer(self, generation: int) -> None:
+        with self._lock:
+            # Таймер, который успели перезапустить, ничего не делает
+            if generation != self._generation or self._original is None:
+                return
+            self._timer = None
+            self._restore_locked()
+
+    def _restore_locked(self) -> None:
+        """Восстанавливает исходное содержимое (вызывается под блокировкой)."""
+        original, self._original = self._original, None
+        # Свое чтение буфера обмена не должно попасть в замер
+        self._end_probe()
+        try:
+            if self.backend.paste_clipboard() == self._last_text:
+                self.backend.copy_clipboard(original)
+                self.restores += 1
+        except Exception as e:
+            print(f"⚠️  Не удалось восстановить буфер обмена: {e}")
+        finally:
+            self._last_text = None
@@ -0,0 +1,127 @@
+"""
+Отслеживание чтения буфера обмена через отложенную отрисовку (delayed rendering).
+"""
+
+import threading
+from typing import Callable, Optional
+
+from constants import WINDOWS_API_AVAILABLE
+
+if WINDOWS_API_AVAILABLE:
+    try:
+        import win32api
+        import win32clipboard
+        import win32con
+        import win32gui
+    except ImportError:
+        WINDOWS_API_AVAILABLE = False
+
+# Родитель окна только для сообщений (HWND_MESSAGE)
+HWND_MESSAGE = -3
+
+
+class ClipboardReadWatcher:
+    """Кладет текст в буфер обмена так, что первое чтение сообщает о себе.
+
+    Буфер обмена получает только обещание формата CF_UNICODETEXT. Когда
+    приложение впервые запрашивает текст, Windows присылает скрытому окну
+    WM_RENDERFORMAT: окно отдает текст и вызывает on_read. Это и есть
+    момент, после которого буфер обмена можно менять, не опасаясь, что
+    вставка прочитает чужой текст.
+
+    Окно и его цикл сообщений живут в отдельном потоке, запускаемом при
+    первом offer().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._hwnd = 0
+        self._text: Optional[str] = None
+        self._on_read: Optional[Callable[[], None]] = None
+
+    @staticmethod
+    def is_available() -> bool:
+        """Доступны ли модули pywin32 для работы с буфером обмена."""
+        return WINDOWS_API_AVAILABLE
+
+    def offer(self, text: str, on_read: Callable[[], None]) -> bool:
+        """Записывает текст с отложенной отрисовкой. Возвращает False, если окно не создано."""
+        if not self._ensure_window():
+            return False
+
+        win32clipboard.OpenClipboard(self._hwnd)
+        try:
+            # EmptyClipboard присылает прежнему владельцу (возможно, этому же окну)
+            # WM_DESTROYCLIPBOARD, поэтому новый текст запоминается только после него
+            win32clipboard.EmptyClipboard()
+            with self._lock:
+                self._text = text
+                self._on_read = on_read
+            # Владелец буфера теперь наше окно: данные отрисуются по запросу
+            win32clipboard.SetClipboardData(win32con.CF_UNICODETEXT, 0)
+        finally:
+            win32clipboard.CloseClipboard()
+        return True
+
+    def _ensure_window(self) -> bool:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="ClipboardWatcher", daemon=True)
+            self._thread.start()
+            self._ready.wait(timeout=1.0)
+        return bool(self._hwnd)
+
+    def _run(self) -> None:
+        try:
+            window_class = win32gui.WNDCLASS()
+            window_class.lpszClassName = "KeyRemapperClipboardWatcher"
+            window_class.lpfnWndProc = {
+                win32con.WM_RENDERFORMAT: self._on_render_format,
+                win32con.WM_RENDERALLFORMATS: self._on_render_all_formats,
+                win32con.WM_DESTROYCLIPBOARD: self._on_destroy_clipboard,
+            }
+            window_class.hInstance = win32api.GetModuleHandle(None)
+            atom = win32gui.RegisterClass(window_class)
+            self._hwnd = win32gui.CreateWindow(atom, "KeyRemapper clipboard", 0, 0, 0, 0, 0,
+                                               HWND_MESSAGE, 0, window_class.hInstance, None)
+        except Exception as e:
+            print(f"⚠️  Не удалось создать окно отслеживания буфера обмена: {e}")
+            self._hwnd = 0
+            return
+        finally:
+            self._ready.set()
+
+        win32gui.PumpMessages()
+
+    def _on_render_format(self, hwnd, message, wparam, lparam) -> int:
+        # Буфер обмена уже открыт запросившим приложением: только отдаем данные
+        with self._lock:
+            text, on_read = self._text, self._on_read
+            self._on_read = None
+        if text is not None:
+            win32clipboard.SetClipboardData(win32con.CF_UNICODETEXT, text)
+        if on_read is not None:
+            on_read()
+        return 0
+
+    def _on_render_all_formats(self, hwnd, message, wparam, lparam) -> int:
+        # Окно закрывается, пока буфер обмена хранит обещание: отдаем текст сразу
+        with self._lock:
+            text = self._text
+        if text is None:
+            return 0
+        win32clipboard.OpenClipboard(hwnd)
+        try:
+            if win32clipboard.GetClipboardOwner() == hwnd:
+                win32clipboard.SetClipboardData(win32con.CF_UNICODETEXT, text)
+        finally:
+            win32clipboard.CloseClipboard()
+        return 0
+
+    def _on_destroy_clipboard(self, hwnd, message, wparam, lparam) -> int:
+        # Буфер обмена очистил кто-то другой: обещанный текст больше не нужен
+        with self._lock:
+            self._text = None
+            self._on_read = None
+        return 0
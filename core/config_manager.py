@@ -6,10 +6,12 @@ import os
 import shutil
 import json
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 from constants import CONFIG_FILE, BACKUP_DIR, DEFAULT_PROFILE, DEFAULT_TARGET_PROCESS
 from models.profile import Profile
+from core.process_matcher import ProcessMatcher
+from utils.formatters import format_target_process
 
 
 class ConfigManager:
@@ -20,6 +22,10 @@ class ConfigManager:
         self.current_profile_name: str = DEFAULT_PROFILE
         self._ensure_default_profile()
 
+        # Индекс матчер целевого процесса → имя профиля для автопереключения
+        self._process_index: List[Tuple[ProcessMatcher, str]] = []
+        self._process_profile_cache: Dict[Optional[str], Optional[str]] = {}
+
     def _ensure_default_profile(self) -> None:
         """Убеждается, что профиль по умолчанию существует."""
         if DEFAULT_PROFILE not in self.profiles:
@@ -51,43 +57,8 @@ class ConfigManager:
             return False
 
         try:
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-
-            # Обработка разных форматов конфигурации
-            if isinstance(config, dict) and 'profiles' in config:
-                # Новый формат с профилями
-                self.profiles = {}
-                for profile_name, profile_data in config['profiles'].items():
-                    self.profiles[profile_name] = Profile.from_dict(profile_name, profile_data)
-                self.current_profile_name = config.get('current_profile', DEFAULT_PROFILE)
-            elif isinstance(config, dict) and 'mappings' in config:
-                # Старый формат (без профилей) - мигрируем в профиль default
-                self.profiles = {
-                    DEFAULT_PROFILE: Profile.from_dict(DEFAULT_PROFILE, {
-                        'mappings': config.get('mappings', {}),
-                        'target_process': config.get('target_process', DEFAULT_TARGET_PROCESS)
-                    })
-                }
-                self.current_profile_name = DEFAULT_PROFILE
-            else:
-                # Очень старый формат - только mappings
-                self.profiles = {
-                    DEFAULT_PROFILE: Profile.from_dict(DEFAULT_PROFILE, {
-                        'mappings': config,
-                        'target_process': DEFAULT_TARGET_PROCESS
-                    })
-                }
-                self.current_profile_name = DEFAULT_PROFILE
-
-            # Убеждаемся, что есть профиль по умолчанию
-            self._ensure_default_profile()
-
-            # Проверяем, что текущий профиль существует
-            if self.current_profile_name not in self.profiles:
-                print(f"⚠️  Профиль '{self.current_profile_name}' не найден, переключаемся на '{DEFAULT_PROFILE}'")
-                self.current_profile_name = DEFAULT_PROFILE
-
+            self.profiles, self.current_profile_name = self._read_config_file()
+            self.build_process_index()
             print(f"✅ Конфигурация загружена (профиль: {self.current_profile_name})")
             return True
         except Exception as e:
@@ -95,6 +66,70 @@ class ConfigManager:
             self._initialize_default_config()
             return False
 
+    def reload_config(self) -> bool:
+        """Перечитывает файл конфигурации во время работы.
+
+        Профили заменяются только после успешного разбора: недописанный
+        или ошибочный файл оставляет текущую конфигурацию без изменений.
+        """
+        try:
+            profiles, current_profile_name = self._read_config_file()
+        except Exception as e:
+            print(f"⚠️  Файл конфигурации не разобран, текущие назначения сохранены: {e}")
+            return False
+
+        self.profiles = profiles
+        self.current_profile_name = current_profile_name
+        self.build_process_index()
+        print(f"✅ Конфигурация загружена (профиль: {self.current_profile_name})")
+        return True
+
+    def _read_config_file(self) -> Tuple[Dict[str, Profile], str]:
+        """Разбирает файл конфигурации, не меняя текущее состояние."""
+        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+
+        # Обработка разных форматов конфигурации
+        if isinstance(config, dict) and 'profiles' in config:
+            # Новый формат с профилями
+            profiles = {}
+            for profile_name, profile_data in config['profiles'].items():
+                profiles[profile_name] = Profile.from_dict(profile_name, profile_data)
+            current_profile_name = config.get('current_profile', DEFAULT_PROFILE)
+        elif isinstance(config, dict) and 'mappings' in config:
+            # Старый формат (без профилей) - мигрируем в профиль default
+            profiles = {
+                DEFAULT_PROFILE: Profile.from_dict(DEFAULT_PROFILE, {
+                    'mappings': config.get('mappings', {}),
+                    'target_process': config.get('target_process', DEFAULT_TARGET_PROCESS)
+                })
+            }
+            current_profile_name = DEFAULT_PROFILE
+        else:
+            # Очень старый формат - только mappings
+            profiles = {
+                DEFAULT_PROFILE: Profile.from_dict(DEFAULT_PROFILE, {
+                    'mappings': config,
+                    'target_process': DEFAULT_TARGET_PROCESS
+                })
+            }
+            current_profile_name = DEFAULT_PROFILE
+
+        # Убеждаемся, что есть профиль по умолчанию
+        if DEFAULT_PROFILE not in profiles:
+            profiles[DEFAULT_PROFILE] = Profile(
+                name=DEFAULT_PROFILE,
+                mappings={},
+                target_process=DEFAULT_TARGET_PROCESS
+            )
+
+        # Проверяем, что текущий профиль существует
+        if current_profile_name not in profiles:
+            print(f"⚠️  Профиль '{current_profile_name}' не найден, переключаемся на '{DEFAULT_PROFILE}'")
+            current_profile_name = DEFAULT_PROFILE
+
+        return profiles, current_profile_name
+
     def _initialize_default_config(self) -> None:
         """Инициализация конфигурации по умолчанию."""
         self.profiles = {
@@ -124,11 +159,49 @@ class ConfigManager:
             with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
                 json.dump(config, f, indent=2, ensure_ascii=False)
 
+            self.build_process_index()
             return True
         except Exception as e:
             print(f"❌ Ошибка сохранения: {e}")
             return False
 
+    def build_process_index(self) -> None:
+        """Строит индекс целевых процессов профилей для автопереключения.
+
+        Текущий профиль проверяется первым, профили без целевого процесса
+        (совпадающие с любым окном) - последними.
+        """
+        ordered_names = [self.current_profile_name] + sorted(
+            name for name in self.profiles if name != self.current_profile_name
+        )
+
+        specific = []
+        fallback = []
+        for name in ordered_names:
+            profile = self.profiles.get(name)
+            if profile is None:
+                continue
+            matcher = ProcessMatcher(profile.target_process)
+            (fallback if matcher.match_all else specific).append((matcher, name))
+
+        self._process_index = specific + fallback
+        self._process_profile_cache = {}
+
+    def find_profile_for_process(self, process_name: Optional[str]) -> Optional[str]:
+        """Возвращает имя профиля, целевой процесс которого совпадает с указанным."""
+        if process_name in self._process_profile_cache:
+            return self._process_profile_cache[process_name]
+
+        result = None
+        if process_name:
+            for matcher, profile_name in self._process_index:
+                if matcher.matches(process_name):
+                    result = profile_name
+                    break
+
+        self._process_profile_cache[process_name] = result
+        return result
+
     def get_current_profile(self) -> Profile:
         """Возвращает текущий профиль."""
         # Убеждаемся, что текущий профиль существует
@@ -186,6 +259,6 @@ class ConfigManager:
         for profile_name in sorted(self.profiles.keys()):
             profile = self.profiles[profile_name]
             mappings_count = len(profile.mappings)
-            target_process = profile.target_process
+            target_process = format_target_process(profile.target_process)
             marker = "👉" if profile_name == self.current_profile_name else "  "
             print(f"{marker} {profile_name} - {mappings_count} назначений, процесс: {target_process}")
\ No newline at end of file
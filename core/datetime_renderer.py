@@ -0,0 +1,221 @@
+"""
+Рендеринг даты и времени по скомпилированным шаблонам с кэшем по интервалам.
+"""
+
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+# Префикс действия с пользовательским шаблоном: date:%Y-%m-%d или date:en:%B %d, %Y
+DATE_FORMAT_PREFIX = 'date:'
+
+DEFAULT_LOCALE = 'ru'
+
+# Названия месяцев и дней недели. Для русского полное название месяца
+# в родительном падеже ("17 октября"), как и в прежнем длинном формате.
+LOCALE_NAMES = {
+    'ru': {
+        'B': ('января', 'февраля', 'марта', 'апреля', 'мая', 'июня',
+              'июля', 'августа', 'сентября', 'октября', 'ноября', 'декабря'),
+        'b': ('янв', 'фев', 'мар', 'апр', 'мая', 'июн',
+              'июл', 'авг', 'сен', 'окт', 'ноя', 'дек'),
+        'A': ('понедельник', 'вторник', 'среда', 'четверг', 'пятница', 'суббота', 'воскресенье'),
+        'a': ('пн', 'вт', 'ср', 'чт', 'пт', 'сб', 'вс'),
+    },
+    'en': {
+        'B': ('January', 'February', 'March', 'April', 'May', 'June',
+              'July', 'August', 'September', 'October', 'November', 'December'),
+        'b': ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+              'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'),
+        'A': ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'),
+        'a': ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'),
+    },
+}
+
+# Шаблоны встроенных действий
+BUILTIN_TEMPLATES = {
+    'date_long': '%-d %B %Y',
+    'date_short': '%d.%m.%Y',
+    'datetime': '%d.%m.%Y %H:%M:%S',
+    'time': '%H:%M:%S',
+}
+
+# Гранулярность кэша по самому мелкому полю шаблона
+GRANULARITY_SECOND = 'second'
+GRANULARITY_MINUTE = 'minute'
+GRANULARITY_HOUR = 'hour'
+GRANULARITY_DAY = 'day'
+GRANULARITY_NONE = 'none'
+
+# Поля strftime, которые работают и в Windows (CRT), и в остальных системах;
+# прочие (%E, %Q, %k, %s...) в Windows вызывают ValueError при рендеринге
+SUPPORTED_DIRECTIVES = frozenset('aAbBcCdDeFgGhHIjmMnprRStTuUVwWxXyYzZf')
+
+_SECOND_FIELDS = frozenset('ScXTr')
+_MINUTE_FIELDS = frozenset('MR')
+_HOUR_FIELDS = frozenset('HI')
+_NO_CACHE_FIELDS = frozenset('f')
+_GRANULARITY_ORDER = (GRANULARITY_DAY, GRANULARITY_HOUR, GRANULARITY_MINUTE,
+                      GRANULARITY_SECOND, GRANULARITY_NONE)
+
+_DIRECTIVE_RE = re.compile(r'%(-?)([A-Za-z%])')
+_LOCALE_RE = re.compile(r'^([a-z]{2}):')
+
+Part = Union[str, Callable[[datetime], str]]
+
+
+class DateTemplateError(ValueError):
+    """Шаблон даты содержит неподдерживаемое поле."""
+
+
+def _field_granularity(code: str) -> str:
+    if code in _NO_CACHE_FIELDS:
+        return GRANULARITY_NONE
+    if code in _SECOND_FIELDS:
+        return GRANULARITY_SECOND
+    if code in _MINUTE_FIELDS:
+        return GRANULARITY_MINUTE
+    if code in _HOUR_FIELDS or code == 'p':
+        return GRANULARITY_HOUR
+    return GRANULARITY_DAY
+
+
+def _make_field(code: str, strip_zero: bool, names: Dict[str, Tuple[str, ...]]) -> Callable[[datetime], str]:
+    """Функция одного поля шаблона."""
+    if code == 'B':
+        table = names['B']
+        return lambda dt: table[dt.month - 1]
+    if code == 'b':
+        table = names['b']
+        return lambda dt: table[dt.month - 1]
+    if code == 'A':
+        table = names['A']
+        return lambda dt: table[dt.weekday()]
+    if code == 'a':
+        table = names['a']
+        return lambda dt: table[dt.weekday()]
+
+    directive = f'%{code}'
+    if strip_zero:
+        # Флаг '-' (как в GNU strftime) работает и в Windows
+        return lambda dt: dt.strftime(directive).lstrip('0') or '0'
+    return lambda dt: dt.strftime(directive)
+
+
+class DateTimeTemplate:
+    """Скомпилированный шаблон даты с кэшем последнего результата.
+
+    Строка шаблона разбирается один раз. Результат рендеринга кэшируется
+    до начала следующего интервала (секунды, минуты, часа или дня),
+    определяемого самым мелким полем шаблона, поэтому повторные нажатия
+    внутри интервала стоят одного сравнения времени.
+
+    Поля вне SUPPORTED_DIRECTIVES отклоняются при разборе
+    (DateTemplateError), а не при каждом рендеринге.
+    """
+
+    __slots__ = ('template', 'locale', 'granularity', '_parts', '_cache')
+
+    def __init__(self, template: str, locale: str = DEFAULT_LOCALE):
+        self.template = template
+        self.locale = locale if locale in LOCALE_NAMES else DEFAULT_LOCALE
+        names = LOCALE_NAMES[self.locale]
+
+        parts: List[Part] = []
+        granularity_index = 0
+        position = 0
+        for match in _DIRECTIVE_RE.finditer(template):
+            if match.start() > position:
+                parts.append(template[position:match.start()])
+            strip_zero, code = match.group(1) == '-', match.group(2)
+            if code != '%' and code not in SUPPORTED_DIRECTIVES:
+                raise DateTemplateError(f"Неподдерживаемое поле шаблона даты: %{code}")
+            if code == '%':
+                parts.append('%')
+            else:
+                parts.append(_make_field(code, strip_zero, names))
+                granularity_index = max(granularity_index,
+                                        _GRANULARITY_ORDER.index(_field_granularity(code)))
+            position = match.end()
+        if position < len(template):
+            parts.append(template[position:])
+
+        # Соседние литералы склеиваются, чтобы рендеринг делал меньше шагов
+        merged: List[Part] = []
+        for part in parts:
+            if isinstance(part, str) and merged and isinstance(merged[-1], str):
+                merged[-1] += part
+            else:
+                merged.append(part)
+
+        self._parts: Tuple[Part, ...] = tuple(merged)
+        self.granularity = _GRANULARITY_ORDER[granularity_index]
+        # (окончание интервала, строка) - заменяется целиком одной ссылкой
+        self._cache: Optional[Tuple[float, str]] = None
+
+    def render(self, now: Optional[float] = None) -> str:
+        """Возвращает строку для текущего момента (или для метки времени now)."""
+        timestamp = time.time() if now is None else now
+        cache = self._cache
+        if cache is not None and timestamp < cache[0]:
+            return cache[1]
+
+        dt = datetime.fromtimestamp(timestamp)
+        rendered = ''.join(part if isinstance(part, str) else part(dt) for part in self._parts)
+
+        if self.granularity != GRANULARITY_NONE:
+            self._cache = (self._bucket_end(dt), rendered)
+        return rendered
+
+    def _bucket_end(self, dt: datetime) -> float:
+        """Метка времени начала следующего интервала кэша."""
+        if self.granularity == GRANULARITY_SECOND:
+            start = dt.replace(microsecond=0)
+            return (start + timedelta(seconds=1)).timestamp()
+        if self.granularity == GRANULARITY_MINUTE:
+            start = dt.replace(second=0, microsecond=0)
+            return (start + timedelta(minutes=1)).timestamp()
+        if self.granularity == GRANULARITY_HOUR:
+            start = dt.replace(minute=0, second=0, microsecond=0)
+            return (start + timedelta(hours=1)).timestamp()
+        start = dt.replace(hour=0, minute=0, second=0, microsecond=0)
+        return (start + timedelta(days=1)).timestamp()
+
+    def __repr__(self) -> str:
+        return f"DateTimeTemplate({self.template!r}, locale={self.locale!r})"
+
+
+def parse_date_action(action: str) -> Tuple[str, str]:
+    """Разбирает действие 'date:[локаль:]шаблон' в (шаблон, локаль)."""
+    spec = action[len(DATE_FORMAT_PREFIX):] if action.startswith(DATE_FORMAT_PREFIX) else action
+    match = _LOCALE_RE.match(spec)
+    if match and match.group(1) in LOCALE_NAMES:
+        return spec[match.end():], match.group(1)
+    return spec, DEFAULT_LOCALE
+
+
+class DateTimeRenderer:
+    """Компилирует шаблоны дат один раз и переиспользует их между назначениями."""
+
+    def __init__(self):
+        self._templates: Dict[Tuple[str, str], DateTimeTemplate] = {}
+
+    def compile(self, template: str, locale: str = DEFAULT_LOCALE) -> DateTimeTemplate:
+        """Возвращает скомпилированный шаблон (общий для одинаковых шаблонов)."""
+        key = (template, locale)
+        compiled = self._templates.get(key)
+        if compiled is None:
+            compiled = self._templates[key] = DateTimeTemplate(template, locale)
+        return compiled
+
+    def compile_action(self, action: str) -> DateTimeTemplate:
+        """Компилирует встроенное действие даты или действие 'date:...'."""
+        if action in BUILTIN_TEMPLATES:
+            return self.compile(BUILTIN_TEMPLATES[action])
+        template, locale = parse_date_action(action)
+        return self.compile(template, locale)
+
+    def render(self, action: str) -> str:
+        """Рендерит действие даты для текущего момента."""
+        return self.compile_action(action).render()
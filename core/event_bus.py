@@ -0,0 +1,124 @@
+"""
+Внутренняя шина событий между ремаппером, монитором процессов, настройками и макросами.
+"""
+
+import itertools
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+
+class Topic(Enum):
+    """Темы событий."""
+
+    FOCUS_CHANGED = "focus_changed"          # pid, process_name
+    PROFILE_SWITCHED = "profile_switched"    # profile_name, previous
+    MAPPING_CHANGED = "mapping_changed"      # added, removed, changed
+    SETTING_CHANGED = "setting_changed"      # key, value, old_value
+    ACTION_EXECUTED = "action_executed"      # key, action_type, duration_ns
+
+
+@dataclass(frozen=True)
+class Event:
+    """Событие шины."""
+
+    topic: Topic
+    payload: Mapping[str, Any] = field(default_factory=dict)
+    timestamp: float = 0.0
+
+    def __getitem__(self, key: str) -> Any:
+        return self.payload[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.payload.get(key, default)
+
+
+EventHandler = Callable[[Event], None]
+
+# Подписчик: (идентификатор, обработчик, доставка через очередь)
+_Subscriber = Tuple[int, EventHandler, bool]
+
+
+class EventBus:
+    """Легкая шина публикации и подписки с синхронной и отложенной доставкой.
+
+    Синхронный подписчик вызывается в потоке публикующего, поэтому должен
+    быть быстрым. Подписчик с queued=True получает события в отдельном
+    потоке доставки в порядке публикации, и публикующий (поток источника
+    активного окна, хук клавиатуры) его не ждет. Ошибка одного подписчика
+    не мешает остальным. Списки подписчиков заменяются целиком при
+    подписке, поэтому publish не берет блокировок, а публикация темы без
+    подписчиков стоит одного поиска в словаре.
+    """
+
+    def __init__(self, queue_size: int = 1024):
+        self._subscribers: Dict[Topic, Tuple[_Subscriber, ...]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Tuple[EventHandler, Event]]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self.dropped = 0
+
+    def subscribe(self, topic: Topic, handler: EventHandler, queued: bool = False) -> int:
+        """Подписывает обработчик на тему. Возвращает идентификатор подписки."""
+        with self._lock:
+            subscription_id = next(self._ids)
+            self._subscribers[topic] = self._subscribers.get(topic, ()) + ((subscription_id, handler, queued),)
+            if queued and self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name="EventBus", daemon=True)
+                self._thread.start()
+            return subscription_id
+
+    def unsubscribe(self, subscription_id: int) -> None:
+        """Отменяет подписку."""
+        with self._lock:
+            for topic, subscribers in list(self._subscribers.items()):
+                remaining = tuple(s for s in subscribers if s[0] != subscription_id)
+                if remaining:
+                    self._subscribers[topic] = remaining
+                else:
+                    del self._subscribers[topic]
+
+    def publish(self, topic: Topic, **payload: Any) -> None:
+        """Публикует событие всем подписчикам темы."""
+        subscribers = self._subscribers.get(topic)
+        if not subscribers:
+            return
+
+        event = Event(topic, payload, time.time())
+        for _, handler, queued in subscribers:
+            if not queued:
+                self._deliver(handler, event)
+                continue
+            try:
+                self._queue.put_nowait((handler, event))
+            except queue.Full:
+                with self._lock:
+                    self.dropped += 1
+                print(f"⚠️  Очередь событий переполнена, событие отброшено ({topic.value})")
+
+    def flush(self) -> None:
+        """Ждет доставки всех событий, уже поставленных в очередь.
+
+        Нельзя вызывать из обработчика с queued=True: поток доставки ждал бы сам себя.
+        """
+        if self._thread is not None:
+            self._queue.join()
+
+    def _worker(self) -> None:
+        while True:
+            handler, event = self._queue.get()
+            try:
+                self._deliver(handler, event)
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    def _deliver(handler: EventHandler, event: Event) -> None:
+        try:
+            handler(event)
+        except Exception as e:
+            print(f"Event handler error ({event.topic.value}): {e}")
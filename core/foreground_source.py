@@ -0,0 +1,304 @@
+"""
+Источники событий смены активного окна: WinEvent, опрос и сценарий для тестов.
+"""
+
+import sys
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Optional, Tuple
+
+from core.scheduler import Scheduler, TimerHandle
+
+# (PID, имя процесса) активного окна
+Foreground = Tuple[Optional[int], Optional[str]]
+ForegroundResolver = Callable[[], Foreground]
+ForegroundCallback = Callable[[Optional[int], Optional[str]], None]
+
+# Константы WinEvent (winuser.h)
+EVENT_SYSTEM_FOREGROUND = 0x0003
+WINEVENT_OUTOFCONTEXT = 0x0000
+WM_QUIT = 0x0012
+
+
+class ForegroundSource(ABC):
+    """Источник уведомлений о смене активного окна.
+
+    Подписчик получает (PID, имя процесса) сразу при запуске и затем
+    только при изменении. Источник с is_push = True сообщает о смене
+    сам, и последнее переданное значение всегда актуально; опрашивающий
+    источник узнает о смене с задержкой до одного периода опроса.
+
+    scheduler, если задан до start(), используется источниками, которым
+    нужны таймеры (опрос); источники с push-уведомлениями его не используют.
+    """
+
+    is_push = False
+
+    def __init__(self, resolve: ForegroundResolver):
+        self.resolve = resolve
+        self.scheduler: Optional[Scheduler] = None
+        self._on_change: Optional[ForegroundCallback] = None
+        self._last: Optional[Foreground] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._on_change is not None
+
+    @abstractmethod
+    def start(self, on_change: ForegroundCallback) -> bool:
+        """Начинает доставку событий подписчику. Возвращает False, если источник не запустился."""
+
+    @abstractmethod
+    def stop(self) -> None:
+        """Прекращает доставку событий."""
+
+    def poke(self) -> None:
+        """Сообщает об активности пользователя (источнику с push-уведомлениями не нужно)."""
+
+    def _emit(self, foreground: Optional[Foreground] = None) -> bool:
+        """Передает подписчику активное окно, если оно изменилось. Возвращает True при смене."""
+        if foreground is None:
+            foreground = self.resolve()
+        with self._lock:
+            on_change = self._on_change
+            if on_change is None or foreground == self._last:
+                return False
+            self._last = foreground
+        on_change(*foreground)
+        return True
+
+
+class PollingForegroundSource(ForegroundSource):
+    """Адаптивный опрос активного окна с уведомлением только об изменениях.
+
+    Сразу после смены окна или активности пользователя (poke) окно
+    опрашивается раз в interval секунд, а пока ничего не меняется,
+    период удваивается до max_interval. poke() будит спящий опрос
+    немедленно, поэтому длинный период не задерживает реакцию на
+    нажатие.
+
+    Без планировщика опрос идет в собственном потоке, с планировщиком
+    (цикл сеанса asyncio) каждая проверка ставит следующую таймером.
+    """
+
+    def __init__(self, resolve: ForegroundResolver, interval: float,
+                 max_interval: Optional[float] = None, backoff: float = 2.0):
+        super().__init__(resolve)
+        self.interval = interval
+        self.max_interval = max(interval, max_interval if max_interval is not None else interval)
+        self.backoff = max(1.0, backoff)
+        self.current_interval = interval
+        self.polls = 0
+        self._stopping = False
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._timer: Optional[TimerHandle] = None
+        self._generation = 0
+
+    def start(self, on_change: ForegroundCallback) -> bool:
+        if self._thread is not None or self._timer is not None:
+            return True
+
+        self._on_change = on_change
+        self._last = None
+        self._stopping = False
+        self._wake.clear()
+        self.current_interval = self.interval
+        if self.scheduler is not None:
+            self._generation += 1
+            self._timer = self.scheduler.call_later(0, self._tick, self._generation,
+                                                    name="ForegroundPolling")
+            return True
+
+        self._thread = threading.Thread(target=self._run, name="ForegroundPolling", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        if self._timer is not None:
+            self._generation += 1
+            self._timer.cancel()
+            self._timer = None
+            self._on_change = None
+            return
+        if self._thread is None:
+            return
+
+        self._stopping = True
+        self._wake.set()
+        self._thread.join(timeout=1.0)
+        self._thread = None
+        self._on_change = None
+
+    def poke(self) -> None:
+        """Возвращает быстрый опрос и будит поток, если период уже вырос."""
+        if self.current_interval > self.interval:
+            self.current_interval = self.interval
+            timer = self._timer
+            if timer is None:
+                self._wake.set()
+                return
+            # Ожидающий таймер заменяется немедленной проверкой
+            self._generation += 1
+            timer.cancel()
+            self._timer = self.scheduler.call_later(0, self._tick, self._generation,
+                                                    name="ForegroundPolling")
+
+    def _run(self) -> None:
+        self._emit()
+        while True:
+            self._wake.wait(self.current_interval)
+            if self._stopping:
+                return
+            self._wake.clear()
+            self._poll()
+
+    def _tick(self, generation: int) -> None:
+        """Проверка по таймеру планировщика; перезапущенный таймер ничего не делает."""
+        if generation != self._generation:
+            return
+        self._poll()
+        if generation == self._generation:
+            self._timer = self.scheduler.call_later(self.current_interval, self._tick, generation,
+                                                    name="ForegroundPolling")
+
+    def _poll(self) -> None:
+        """Одна проверка активного окна с подстройкой периода."""
+        self.polls += 1
+        try:
+            changed = self._emit()
+        except Exception as e:
+            print(f"Process monitor error: {e}")
+            changed = False
+
+        if changed:
+            self.current_interval = self.interval
+        else:
+            self.current_interval = min(self.max_interval, self.current_interval * self.backoff)
+
+
+class WinEventForegroundSource(ForegroundSource):
+    """Уведомления EVENT_SYSTEM_FOREGROUND через SetWinEventHook (ctypes).
+
+    Хук работает в отдельном потоке с циклом сообщений и между сменами
+    окна не просыпается. Остановка посылает потоку WM_QUIT.
+    """
+
+    is_push = True
+
+    def __init__(self, resolve: ForegroundResolver):
+        super().__init__(resolve)
+        self._thread: Optional[threading.Thread] = None
+        self._thread_id = 0
+        self._ready = threading.Event()
+        self._failed = False
+
+    @staticmethod
+    def is_available() -> bool:
+        """Доступен ли SetWinEventHook в этой системе."""
+        return sys.platform == 'win32'
+
+    def start(self, on_change: ForegroundCallback) -> bool:
+        if self._thread is not None:
+            return True
+
+        self._on_change = on_change
+        self._last = None
+        self._failed = False
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name="ForegroundWinEvent", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=1.0)
+
+        if self._failed:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+            self._thread_id = 0
+            self._on_change = None
+            return False
+        return True
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+
+        import ctypes
+        if self._thread_id:
+            ctypes.windll.user32.PostThreadMessageW(self._thread_id, WM_QUIT, 0, 0)
+        self._thread.join(timeout=1.0)
+        self._thread = None
+        self._thread_id = 0
+        self._on_change = None
+
+    def _run(self) -> None:
+        import ctypes
+        from ctypes import wintypes
+
+        user32 = ctypes.windll.user32
+        win_event_proc = ctypes.WINFUNCTYPE(
+            None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+            wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD
+        )
+        # Ссылка на обратный вызов должна жить, пока установлен хук
+        callback = win_event_proc(self._on_win_event)
+
+        self._thread_id = ctypes.windll.kernel32.GetCurrentThreadId()
+        hook = user32.SetWinEventHook(EVENT_SYSTEM_FOREGROUND, EVENT_SYSTEM_FOREGROUND,
+                                      0, callback, 0, 0, WINEVENT_OUTOFCONTEXT)
+        if not hook:
+            self._report_failure()
+            return
+
+        try:
+            # Начальное окно передается до возврата из start(). Ошибка определения окна
+            # не мешает хуку: окно сообщит следующее событие смены
+            try:
+                self._emit()
+            except Exception as e:
+                print(f"Process monitor error: {e}")
+            self._ready.set()
+            msg = wintypes.MSG()
+            while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+                user32.TranslateMessage(ctypes.byref(msg))
+                user32.DispatchMessageW(ctypes.byref(msg))
+        finally:
+            user32.UnhookWinEvent(hook)
+
+    def _report_failure(self) -> None:
+        """Сообщает start(), что хук не установлен."""
+        print("⚠️  Не удалось установить WinEvent-хук смены активного окна")
+        self._failed = True
+        self._ready.set()
+
+    def _on_win_event(self, hook, event, hwnd, id_object, id_child, thread_id, event_time) -> None:
+        try:
+            self._emit()
+        except Exception as e:
+            print(f"Process monitor error: {e}")
+
+
+class ScriptedForegroundSource(ForegroundSource):
+    """Источник для тестов и систем без Windows API: смену окна задает emit()."""
+
+    is_push = True
+
+    def __init__(self, initial: Foreground = (None, None)):
+        super().__init__(lambda: self.current)
+        self.current: Foreground = initial
+        self.emitted = 0
+
+    def start(self, on_change: ForegroundCallback) -> bool:
+        self._on_change = on_change
+        self._last = None
+        self._emit()
+        return True
+
+    def stop(self) -> None:
+        self._on_change = None
+
+    def emit(self, pid: Optional[int], name: Optional[str]) -> None:
+        """Делает активным окно процесса и синхронно уведомляет подписчика."""
+        self.current = (pid, name)
+        self.emitted += 1
+        self._emit()
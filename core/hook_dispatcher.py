@@ -0,0 +1,308 @@
+"""
+Единый низкоуровневый хук клавиатуры с диспетчеризацией по маске модификаторов.
+"""
+
+from contextlib import contextmanager
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+
+from core.input_backend import InputBackend
+from core.key_sequence import KeySequenceDFA, SequenceMatcher, Step, split_key_sequence
+
+
+# Биты маски модификаторов
+MODIFIER_BITS = {
+    'ctrl': 1,
+    'alt': 2,
+    'shift': 4,
+    'win': 8,
+}
+
+# Имена клавиш библиотеки keyboard для каждого модификатора
+MODIFIER_KEY_NAMES = {
+    'ctrl': ['ctrl', 'left ctrl', 'right ctrl'],
+    'alt': ['alt', 'left alt', 'right alt', 'alt gr'],
+    'shift': ['shift', 'left shift', 'right shift'],
+    'win': ['windows', 'left windows', 'right windows'],
+}
+
+# Модификаторы, одиночное отпускание которых открывает меню окна или «Пуск»
+MENU_MODIFIER_BITS = MODIFIER_BITS['alt'] | MODIFIER_BITS['win']
+
+# Клавиша, которой маскируется отпускание Alt/Win после подавленной комбинации
+MASK_KEY = 'ctrl'
+
+
+def parse_key_combo(key: str) -> Optional[Tuple[int, str]]:
+    """Разбирает комбинацию вида 'ctrl+shift+a' в (маска модификаторов, основная клавиша)."""
+    parts = [part.strip() for part in key.lower().split('+')]
+    main_key = parts[-1]
+    if not main_key or main_key in MODIFIER_BITS:
+        return None
+
+    mask = 0
+    for part in parts[:-1]:
+        bit = MODIFIER_BITS.get(part)
+        if bit is None:
+            return None
+        mask |= bit
+
+    return mask, main_key
+
+
+def _resolve_scan_codes(backend: InputBackend, names: List[str]) -> Set[int]:
+    """Возвращает все скан-коды для списка имен клавиш."""
+    scan_codes = set()
+    for name in names:
+        try:
+            scan_codes.update(backend.key_to_scan_codes(name))
+        except ValueError:
+            continue
+    return scan_codes
+
+
+class HookDispatcher:
+    """Один глобальный хук вместо отдельного add_hotkey на каждое назначение.
+
+    Состояние модификаторов хранится целочисленной битовой маской, а
+    обработчик находится одним поиском в словаре по (scan_code, маска),
+    поэтому стоимость события не зависит от количества назначений.
+
+    Обработчик, вернувший истинное значение, пропускает событие дальше
+    без подавления.
+
+    Модификаторы всегда доходят до системы, подавляется только основная
+    клавиша. Поэтому после сработавшей комбинации с Alt или Win их
+    отпускание маскируется нажатием MASK_KEY (как в AutoHotkey), иначе
+    система увидела бы одиночное нажатие и открыла меню окна или «Пуск».
+    released_modifiers() отпускает удерживаемые модификаторы на время
+    вставки, чтобы Ctrl+V не превратился в Ctrl+Alt+V.
+
+    Последовательности клавиш компилируются в автомат, который получает
+    событие раньше таблицы одиночных назначений. select_sequences()
+    оставляет в автомате только последовательности активного профиля;
+    автомат для каждого набора строится один раз и подменяется целиком.
+    """
+
+    def __init__(self, backend: InputBackend):
+        self.backend = backend
+        self._table: Dict[Tuple[int, int], Callable[[], Optional[bool]]] = {}
+        self._modifier_scan_codes: Dict[int, int] = {}
+        self._pressed_modifiers: Dict[int, int] = {}
+        self._modifier_names: Dict[int, str] = {}
+        self._modifier_mask = 0
+        self._mask_pending = False
+        self._suppressed_keys: Set[int] = set()
+        self._sequence_defs: Dict[str, Tuple[List[Step], Callable[[], Optional[bool]]]] = {}
+        self._active_sequences: Optional[FrozenSet[str]] = None
+        self._dfa_cache: Dict[Optional[FrozenSet[str]], KeySequenceDFA] = {}
+        self.sequences = SequenceMatcher()
+        self._hook = None
+
+    @property
+    def is_running(self) -> bool:
+        """Установлен ли хук."""
+        return self._hook is not None
+
+    def add_mapping(self, key: str, handler: Callable[[], Optional[bool]]) -> bool:
+        """Добавляет назначение в таблицу. Возвращает False, если комбинацию нельзя обработать хуком."""
+        parsed = parse_key_combo(key)
+        if parsed is None:
+            return False
+
+        mask, main_key = parsed
+        scan_codes = _resolve_scan_codes(self.backend, [main_key])
+        if not scan_codes:
+            return False
+
+        for scan_code in scan_codes:
+            self._table[(scan_code, mask)] = handler
+        return True
+
+    def remove_mapping(self, key: str) -> None:
+        """Удаляет назначение из таблицы."""
+        parsed = parse_key_combo(key)
+        if parsed is None:
+            return
+
+        mask, main_key = parsed
+        for scan_code in _resolve_scan_codes(self.backend, [main_key]):
+            self._table.pop((scan_code, mask), None)
+
+    def add_sequence(self, key: str, handler: Callable[[], Optional[bool]]) -> bool:
+        """Добавляет последовательность 'ctrl+k, ctrl+d' в автомат. Возвращает False, если шаг нельзя разобрать.
+
+        Одиночная комбинация, совпадающая с первым шагом последовательности,
+        тоже добавляется сюда: она срабатывает, если продолжения не последовало.
+        """
+        steps = []
+        for step in split_key_sequence(key):
+            parsed = parse_key_combo(step)
+            if parsed is None:
+                return False
+            mask, main_key = parsed
+            scan_codes = _resolve_scan_codes(self.backend, [main_key])
+            if not scan_codes:
+                return False
+            steps.append((mask, scan_codes))
+
+        self._sequence_defs[key] = (steps, handler)
+        self._rebuild_sequences()
+        return True
+
+    def remove_sequence(self, key: str) -> None:
+        """Удаляет последовательность из автомата."""
+        if self._sequence_defs.pop(key, None) is not None:
+            self._rebuild_sequences()
+
+    @property
+    def has_entries(self) -> bool:
+        """Есть ли назначения или последовательности, которым нужен хук."""
+        return bool(self._table or self._sequence_defs)
+
+    def clear(self) -> None:
+        """Очищает таблицу назначений и последовательностей."""
+        self._table.clear()
+        self._sequence_defs.clear()
+        self._rebuild_sequences()
+
+    def select_sequences(self, keys: Optional[Iterable[str]]) -> None:
+        """Оставляет в автомате только последовательности из keys (None - все)."""
+        self._active_sequences = frozenset(keys) if keys is not None else None
+        self._load_sequences()
+
+    def _rebuild_sequences(self) -> None:
+        """Сбрасывает собранные автоматы после изменения последовательностей."""
+        self._dfa_cache.clear()
+        self._load_sequences()
+
+    def _load_sequences(self) -> None:
+        """Подменяет автомат на собранный для выбранного набора последовательностей."""
+        keys = self._active_sequences
+        dfa = self._dfa_cache.get(keys)
+        if dfa is None:
+            dfa = self._dfa_cache[keys] = KeySequenceDFA(
+                definition for key, definition in self._sequence_defs.items() if keys is None or key in keys
+            )
+        self.sequences.load(dfa)
+
+    def start(self) -> None:
+        """Устанавливает глобальный хук."""
+        if self._hook is not None:
+            return
+
+        self._modifier_scan_codes = {}
+        for modifier, names in MODIFIER_KEY_NAMES.items():
+            for scan_code in _resolve_scan_codes(self.backend, names):
+                self._modifier_scan_codes[scan_code] = MODIFIER_BITS[modifier]
+
+        self._pressed_modifiers.clear()
+        self._modifier_names.clear()
+        self._modifier_mask = 0
+        self._mask_pending = False
+        self._suppressed_keys.clear()
+        self._hook = self.backend.hook(self._on_event, suppress=True)
+
+    def stop(self) -> None:
+        """Снимает глобальный хук."""
+        if self._hook is None:
+            return
+
+        try:
+            self.backend.unhook(self._hook)
+        except (KeyError, ValueError):
+            pass
+        self._hook = None
+        self._pressed_modifiers.clear()
+        self._modifier_names.clear()
+        self._modifier_mask = 0
+        self.sequences.reset()
+
+    @contextmanager
+    def released_modifiers(self) -> Iterator[None]:
+        """Отпускает физически удерживаемые модификаторы на время вставки.
+
+        После вставки снова нажимаются только те модификаторы, которые
+        пользователь все еще держит.
+        """
+        held = dict(self._modifier_names)
+        if held:
+            self._send_mask()
+            for name in held.values():
+                self.backend.release(name)
+        try:
+            yield
+        finally:
+            for scan_code, name in held.items():
+                if scan_code in self._pressed_modifiers:
+                    self.backend.press(name)
+
+    def _send_mask(self) -> None:
+        """Маскирует отпускание Alt/Win; при удерживаемом Ctrl меню и так не откроется."""
+        mask = self._modifier_mask
+        if mask & MENU_MODIFIER_BITS and not mask & MODIFIER_BITS['ctrl']:
+            self.backend.send(MASK_KEY)
+
+    def _on_modifier(self, event, bit: int) -> bool:
+        """Обновляет маску модификаторов. Возвращает False, чтобы подавить событие."""
+        scan_code = event.scan_code
+        if event.event_type == 'down':
+            self._pressed_modifiers[scan_code] = bit
+            self._modifier_names[scan_code] = event.name or ''
+            self._modifier_mask |= bit
+            return True
+
+        if self._mask_pending and bit & MENU_MODIFIER_BITS and scan_code in self._pressed_modifiers:
+            # Отпускание подавляется и отправляется заново после маскирующей клавиши,
+            # чтобы система получила их именно в этом порядке
+            self._send_mask()
+            self.backend.release(self._modifier_names.get(scan_code) or event.name)
+            suppress = True
+        else:
+            suppress = False
+
+        self._pressed_modifiers.pop(scan_code, None)
+        self._modifier_names.pop(scan_code, None)
+        mask = 0
+        for pressed_bit in self._pressed_modifiers.values():
+            mask |= pressed_bit
+        self._modifier_mask = mask
+        if not mask & MENU_MODIFIER_BITS:
+            self._mask_pending = False
+        return not suppress
+
+    def _suppress(self, scan_code: int) -> bool:
+        """Подавляет нажатие основной клавиши сработавшей комбинации."""
+        self._suppressed_keys.add(scan_code)
+        if self._modifier_mask & MENU_MODIFIER_BITS:
+            self._mask_pending = True
+        return False
+
+    def _on_event(self, event) -> bool:
+        """Обработчик событий хука. Возвращает False, чтобы подавить событие."""
+        # Свои синтетические события не меняют маску и не сопоставляются с назначениями
+        ledger = self.backend.ledger
+        if ledger is not None and ledger.is_injected(event):
+            return True
+
+        scan_code = event.scan_code
+        bit = self._modifier_scan_codes.get(scan_code)
+        if bit is not None:
+            return self._on_modifier(event, bit)
+
+        if event.event_type != 'down':
+            if scan_code in self._suppressed_keys:
+                self._suppressed_keys.discard(scan_code)
+                return False
+            return True
+
+        if self._sequence_defs and self.sequences.feed((scan_code, self._modifier_mask)):
+            return self._suppress(scan_code)
+
+        handler = self._table.get((scan_code, self._modifier_mask))
+        if handler is None:
+            return True
+
+        if handler():
+            return True
+
+        return self._suppress(scan_code)
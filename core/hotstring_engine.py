@@ -0,0 +1,249 @@
+"""
+Автозамена сокращений (hotstrings) на автомате Ахо-Корасик.
+"""
+
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional
+
+from core.input_backend import InputBackend
+
+# Сколько последних состояний хранится для отката по Backspace
+HOTSTRING_HISTORY_SIZE = 64
+
+# Клавиши-модификаторы: их нажатие не меняет буфер
+_MODIFIER_NAMES = frozenset((
+    'shift', 'left shift', 'right shift', 'caps lock',
+))
+
+# Клавиши-модификаторы, при которых набор считается сочетанием, а не текстом
+_SHORTCUT_MODIFIERS = frozenset((
+    'ctrl', 'left ctrl', 'right ctrl', 'alt', 'left alt', 'right alt',
+    'windows', 'left windows', 'right windows', 'win',
+))
+
+# Имена клавиш библиотеки keyboard, которые печатают символ
+_CHAR_KEY_NAMES = {'space': ' ', 'tab': '\t'}
+
+
+class AhoCorasickAutomaton:
+    """Автомат Ахо-Корасик над набором сокращений.
+
+    Переход по символу стоит O(1) амортизированно независимо от числа
+    сокращений. Добавление сокращения достраивает бор, удаление только
+    снимает отметку конца слова; ссылки неудач пересчитывает build().
+    Если его не вызвали, их пересчитывает следующий переход.
+    """
+
+    ROOT = 0
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._terminal: List[Optional[str]] = [None]
+        self._output: List[Optional[str]] = [None]
+        self._dirty = False
+        self.patterns: set = set()
+        for pattern in patterns:
+            self.add(pattern)
+
+    def add(self, pattern: str) -> None:
+        """Добавляет сокращение."""
+        if not pattern or pattern in self.patterns:
+            return
+
+        state = self.ROOT
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._terminal.append(None)
+                self._output.append(None)
+                self._goto[state][char] = next_state
+            state = next_state
+
+        self._terminal[state] = pattern
+        self.patterns.add(pattern)
+        self._dirty = True
+
+    def remove(self, pattern: str) -> None:
+        """Удаляет сокращение (узлы бора остаются и переиспользуются)."""
+        if pattern not in self.patterns:
+            return
+
+        state = self.ROOT
+        for char in pattern:
+            state = self._goto[state][char]
+        self._terminal[state] = None
+        self.patterns.discard(pattern)
+        self._dirty = True
+
+    def build(self) -> None:
+        """Пересчитывает ссылки неудач после изменения набора сокращений."""
+        if self._dirty:
+            self._build_links()
+
+    def step(self, state: int, char: str) -> int:
+        """Переход автомата по символу."""
+        if self._dirty:
+            self._build_links()
+
+        goto = self._goto
+        fail = self._fail
+        while True:
+            next_state = goto[state].get(char)
+            if next_state is not None:
+                return next_state
+            if state == self.ROOT:
+                return self.ROOT
+            state = fail[state]
+
+    def match(self, state: int) -> Optional[str]:
+        """Самое длинное сокращение, оканчивающееся в состоянии."""
+        return self._output[state]
+
+    def _build_links(self) -> None:
+        """Пересчитывает ссылки неудач и выходы обходом в ширину."""
+        self._output[self.ROOT] = None
+        queue: Deque[int] = deque()
+        for child in self._goto[self.ROOT].values():
+            self._fail[child] = self.ROOT
+            self._output[child] = self._terminal[child]
+            queue.append(child)
+
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while char not in self._goto[fallback] and fallback != self.ROOT:
+                    fallback = self._fail[fallback]
+                link = self._goto[fallback].get(char, self.ROOT)
+                self._fail[child] = link if link != child else self.ROOT
+                self._output[child] = self._terminal[child] or self._output[self._fail[child]]
+                queue.append(child)
+
+        self._dirty = False
+
+
+class HotstringEngine:
+    """Отслеживает набираемый текст и распознает сокращения.
+
+    Сокращение срабатывает сразу после ввода последнего символа. Этот
+    символ подавляется, а обработчик on_match получает сокращение и
+    должен стереть уже набранную часть (длина сокращения - 1 символ).
+    Backspace откатывает автомат к предыдущему состоянию, навигационные
+    клавиши и сочетания с Ctrl/Alt/Win сбрасывают буфер.
+
+    update() строит новый автомат целиком в потоке вызывающего и
+    публикует его заменой ссылки, поэтому поток хука никогда не
+    пересчитывает ссылки неудач. Состояние автомата и история меняются
+    только под _lock, вместе с заменой автомата.
+    """
+
+    def __init__(self, backend: InputBackend, on_match: Callable[[str], bool]):
+        self.backend = backend
+        self.on_match = on_match
+        self.automaton = AhoCorasickAutomaton()
+        self._state = AhoCorasickAutomaton.ROOT
+        self._history: Deque[int] = deque(maxlen=HOTSTRING_HISTORY_SIZE)
+        self._held_shortcut_modifiers: set = set()
+        self._hook = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        """Установлен ли хук."""
+        return self._hook is not None
+
+    def update(self, abbreviations: Iterable[str]) -> None:
+        """Заменяет набор сокращений; при изменении автомат строится заново до публикации."""
+        new_patterns = set(abbreviations)
+        automaton = self.automaton
+        if new_patterns != automaton.patterns:
+            automaton = AhoCorasickAutomaton(new_patterns)
+            automaton.build()
+        with self._lock:
+            self.automaton = automaton
+            self._clear_buffer()
+
+    def reset(self) -> None:
+        """Сбрасывает набранный буфер."""
+        with self._lock:
+            self._clear_buffer()
+
+    def _clear_buffer(self) -> None:
+        # Вызывается под _lock
+        self._state = AhoCorasickAutomaton.ROOT
+        self._history.clear()
+
+    def start(self) -> None:
+        """Устанавливает хук клавиатуры."""
+        if self._hook is None:
+            self.reset()
+            self._held_shortcut_modifiers.clear()
+            self._hook = self.backend.hook(self._on_event, suppress=True)
+
+    def stop(self) -> None:
+        """Снимает хук клавиатуры."""
+        if self._hook is None:
+            return
+
+        try:
+            self.backend.unhook(self._hook)
+        except (KeyError, ValueError):
+            pass
+        self._hook = None
+
+    def feed(self, char: str) -> Optional[str]:
+        """Подает символ автомату и возвращает распознанное сокращение."""
+        with self._lock:
+            self._history.append(self._state)
+            self._state = self.automaton.step(self._state, char)
+            return self.automaton.match(self._state)
+
+    def backspace(self) -> None:
+        """Откатывает последний символ."""
+        with self._lock:
+            self._state = self._history.pop() if self._history else AhoCorasickAutomaton.ROOT
+
+    def _on_event(self, event) -> bool:
+        """Обработчик событий хука. Возвращает False, чтобы подавить событие."""
+        name = event.name or ''
+        ledger = self.backend.ledger
+        if ledger is not None and ledger.is_injected(event):
+            return True
+
+        if name in _SHORTCUT_MODIFIERS:
+            if event.event_type == 'down':
+                self._held_shortcut_modifiers.add(name)
+            else:
+                self._held_shortcut_modifiers.discard(name)
+            return True
+
+        if event.event_type != 'down' or name in _MODIFIER_NAMES:
+            return True
+
+        if self._held_shortcut_modifiers:
+            self.reset()
+            return True
+
+        if name == 'backspace':
+            self.backspace()
+            return True
+
+        char = _CHAR_KEY_NAMES.get(name, name)
+        if len(char) != 1:
+            # Enter, стрелки, Home и т.п. переносят курсор - буфер больше не соответствует тексту
+            self.reset()
+            return True
+
+        abbreviation = self.feed(char)
+        if abbreviation is None:
+            return True
+
+        if self.on_match(abbreviation):
+            self.reset()
+            return False
+        return True
@@ -0,0 +1,122 @@
+"""
+Журнал собственных синтетических событий для фильтрации на входе в хуки.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Tuple
+
+# Сколько секунд отправленное событие ждет своего возврата в хук
+INJECTION_TTL = 0.2
+
+# Имена печатаемых символов, под которыми их возвращает хук
+_CHAR_EVENT_NAMES = {'\n': 'enter', ' ': 'space', '\t': 'tab'}
+
+# Атрибут, которым помечается уже проверенное событие: все хуки получают один объект
+_EVENT_MARK = '_remapper_injected'
+
+
+def _normalize_name(name: str) -> str:
+    """Приводит имя клавиши к виду, общему для отправки и хука ('left ctrl' → 'ctrl')."""
+    name = name.strip().lower()
+    for prefix in ('left ', 'right '):
+        if name.startswith(prefix):
+            name = name[len(prefix):]
+    return 'win' if name == 'windows' else name
+
+
+def combo_key_names(combo: str) -> Iterable[str]:
+    """Имена клавиш, которые нажимает отправка комбинации ('ctrl+k, ctrl+d')."""
+    for step in combo.split(','):
+        for part in step.split('+'):
+            if part.strip():
+                yield part
+
+
+class InjectionLedger:
+    """Короткоживущий журнал клавиш, отправленных самим приложением.
+
+    Бэкенд записывает каждое отправленное нажатие и отпускание до того,
+    как оно попадет в систему. Хук, получив событие, один раз погашает
+    совпадающую по имени и типу запись, не старше ttl секунд, и помечает
+    объект события, чтобы следующие хуки не проверяли его заново. Так
+    свои события не сопоставляются с назначениями, не распознаются как
+    сокращения и не записываются в макросы. Флаг is_injected, если его
+    выставляет бэкенд, учитывается сразу.
+
+    Горячие клавиши add_hotkey не получают событие, поэтому для них
+    хук журнала (on_event), установленный раньше остальных, запоминает
+    результат последнего события в last_injected.
+    """
+
+    def __init__(self, ttl: float = INJECTION_TTL):
+        self.ttl = ttl
+        self.last_injected = False
+        self.recorded = 0
+        self.filtered = 0
+
+        self._pending: Dict[Tuple[str, str], Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, names: Iterable[str], event_types: Tuple[str, ...] = ('down', 'up')) -> None:
+        """Записывает события, которые сейчас будут отправлены."""
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            for name in names:
+                name = _normalize_name(name)
+                for event_type in event_types:
+                    self._pending.setdefault((name, event_type), deque()).append(expires)
+                    self.recorded += 1
+
+    def record_text(self, text: str) -> None:
+        """Записывает нажатия, которыми печатается текст."""
+        self.record(_CHAR_EVENT_NAMES.get(char, char) for char in text)
+
+    def consume(self, name: str, event_type: str) -> bool:
+        """Погашает запись о событии. Возвращает True, если событие отправлено приложением."""
+        if not self._pending:
+            return False
+
+        key = (_normalize_name(name), event_type)
+        now = time.monotonic()
+        with self._lock:
+            pending = self._pending.get(key)
+            if not pending:
+                return False
+            while pending and pending[0] < now:
+                pending.popleft()
+            if not pending:
+                del self._pending[key]
+                return False
+            pending.popleft()
+            if not pending:
+                del self._pending[key]
+            self.filtered += 1
+            return True
+
+    def is_injected(self, event: Any) -> bool:
+        """Отправлено ли событие хука приложением (результат запоминается в событии)."""
+        marked = getattr(event, _EVENT_MARK, None)
+        if marked is not None:
+            return marked
+
+        # Запись погашается и для событий с флагом is_injected, чтобы не задержать настоящее нажатие
+        injected = self.consume(event.name or '', event.event_type) or \
+            bool(getattr(event, 'is_injected', False))
+        try:
+            setattr(event, _EVENT_MARK, injected)
+        except AttributeError:
+            pass
+        return injected
+
+    def on_event(self, event: Any) -> bool:
+        """Хук журнала: отмечает событие и всегда пропускает его дальше."""
+        self.last_injected = self.is_injected(event)
+        return True
+
+    def clear(self) -> None:
+        """Удаляет все ожидающие записи."""
+        with self._lock:
+            self._pending.clear()
+        self.last_injected = False
@@ -0,0 +1,570 @@
+"""
+Бэкенды ввода: регистрация хуков, отправка клавиш, печать текста и буфер обмена.
+"""
+
+import itertools
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.injection_ledger import InjectionLedger, combo_key_names
+
+
+class InputBackend(ABC):
+    """Интерфейс бэкенда ввода.
+
+    Ядро приложения обращается к клавиатуре и буферу обмена только через
+    этот интерфейс, поэтому горячий путь можно выполнять и измерять без
+    реального рабочего стола.
+    """
+
+    clipboard_available = False
+
+    # Журнал отправленных событий, по которому хуки отбрасывают свои же события
+    ledger: Optional[InjectionLedger] = None
+
+    # Хуки и горячие клавиши
+    @abstractmethod
+    def add_hotkey(self, hotkey: str, callback: Callable[[], Any], suppress: bool = False) -> Any:
+        """Регистрирует горячую клавишу. Истинный результат callback пропускает событие."""
+
+    @abstractmethod
+    def remove_hotkey(self, handle: Any) -> None:
+        """Снимает горячую клавишу."""
+
+    @abstractmethod
+    def hook(self, callback: Callable[[Any], Any], suppress: bool = False) -> Any:
+        """Устанавливает хук всех событий клавиатуры. False из callback подавляет событие."""
+
+    @abstractmethod
+    def unhook(self, handle: Any) -> None:
+        """Снимает хук."""
+
+    @abstractmethod
+    def remap_hotkey(self, source: str, target: str) -> Any:
+        """Переназначает клавишу или комбинацию средствами библиотеки."""
+
+    @abstractmethod
+    def unremap_hotkey(self, handle: Any) -> None:
+        """Снимает переназначение."""
+
+    @abstractmethod
+    def key_to_scan_codes(self, key: str) -> Tuple[int, ...]:
+        """Скан-коды клавиши (ValueError для неизвестной клавиши)."""
+
+    @abstractmethod
+    def wait(self, hotkey: Optional[str] = None) -> None:
+        """Блокирует поток до остановки."""
+
+    # Отправка событий
+    @abstractmethod
+    def send(self, combo: str) -> None:
+        """Нажимает и отпускает комбинацию."""
+
+    @abstractmethod
+    def press(self, key: str) -> None:
+        """Нажимает клавишу."""
+
+    @abstractmethod
+    def release(self, key: str) -> None:
+        """Отпускает клавишу."""
+
+    @abstractmethod
+    def write(self, text: str, delay: float = 0) -> None:
+        """Печатает текст."""
+
+    # Буфер обмена
+    @abstractmethod
+    def paste_clipboard(self) -> str:
+        """Содержимое буфера обмена."""
+
+    @abstractmethod
+    def copy_clipboard(self, text: str) -> None:
+        """Записывает текст в буфер обмена."""
+
+    def copy_clipboard_tracked(self, text: str, on_read: Callable[[], None]) -> bool:
+        """Записывает текст так, что первое чтение буфера обмена вызывает on_read.
+
+        Возвращает False, если бэкенд не умеет отслеживать чтение (текст
+        тогда не записан, вызывающий использует copy_clipboard).
+        """
+        return False
+
+
+class KeyboardBackend(InputBackend):
+    """Реальный бэкенд на библиотеках keyboard и pyperclip."""
+
+    def __init__(self):
+        import keyboard
+        self._keyboard = keyboard
+        self.ledger = InjectionLedger()
+        self._clipboard_watcher = None
+
+        try:
+            import pyperclip
+            self._pyperclip = pyperclip
+            self.clipboard_available = True
+        except ImportError:
+            self._pyperclip = None
+            self.clipboard_available = False
+
+    def add_hotkey(self, hotkey: str, callback: Callable[[], Any], suppress: bool = False) -> Any:
+        return self._keyboard.add_hotkey(hotkey, callback, suppress=suppress)
+
+    def remove_hotkey(self, handle: Any) -> None:
+        self._keyboard.remove_hotkey(handle)
+
+    def hook(self, callback: Callable[[Any], Any], suppress: bool = False) -> Any:
+        return self._keyboard.hook(callback, suppress=suppress)
+
+    def unhook(self, handle: Any) -> None:
+        self._keyboard.unhook(handle)
+
+    def remap_hotkey(self, source: str, target: str) -> Any:
+        # Повторяет remap_key/remap_hotkey библиотеки, но отправляет события через
+        # press/release/send бэкенда: так они попадают в журнал ledger и не
+        # принимаются хуками приложения за ввод пользователя
+        keyboard = self._keyboard
+
+        # Клавиша в клавишу переназначается отдельно для нажатия и отпускания,
+        # поэтому удержание (caps lock → ctrl) работает как у настоящей клавиши
+        if '+' not in source and '+' not in target:
+            def on_key(event):
+                if event.event_type == keyboard.KEY_DOWN:
+                    self.press(target)
+                else:
+                    self.release(target)
+                return False
+
+            return keyboard.unhook_key, keyboard.hook_key(source, on_key, suppress=True)
+
+        # Удерживаемые модификаторы отпускаются на время отправки, как в keyboard.remap_hotkey.
+        # Какие из них пропущены в систему (а не подавлены хуком), keyboard 0.13.5 хранит
+        # только во внутреннем _listener.modifier_states, публичного аналога нет - поэтому
+        # версия закреплена в requirements.txt
+        listener = getattr(keyboard, '_listener', None)
+
+        def on_hotkey():
+            active = sorted(modifier for modifier, state in listener.modifier_states.items()
+                            if state == 'allowed')
+            for modifier in active:
+                self.release(modifier)
+            self.send(target)
+            for modifier in reversed(active):
+                self.press(modifier)
+            return False
+
+        # add_hotkey запускает слушатель, который и создает modifier_states
+        handle = keyboard.add_hotkey(source, on_hotkey, suppress=True)
+        if not isinstance(getattr(listener, 'modifier_states', None), dict):
+            # Другая версия библиотеки: переназначает она сама, без записи вывода в журнал
+            keyboard.remove_hotkey(handle)
+            handle = keyboard.remap_hotkey(source, target)
+        return keyboard.remove_hotkey, handle
+
+    def unremap_hotkey(self, handle: Any) -> None:
+        remove, native_handle = handle
+        remove(native_handle)
+
+    def key_to_scan_codes(self, key: str) -> Tuple[int, ...]:
+        return tuple(self._keyboard.key_to_scan_codes(key))
+
+    def wait(self, hotkey: Optional[str] = None) -> None:
+        self._keyboard.wait(hotkey)
+
+    def send(self, combo: str) -> None:
+        self.ledger.record(combo_key_names(combo))
+        self._keyboard.send(combo)
+
+    def press(self, key: str) -> None:
+        self.ledger.record(combo_key_names(key), ('down',))
+        self._keyboard.press(key)
+
+    def release(self, key: str) -> None:
+        self.ledger.record(combo_key_names(key), ('up',))
+        self._keyboard.release(key)
+
+    def write(self, text: str, delay: float = 0) -> None:
+        self.ledger.record_text(text)
+        self._keyboard.write(text, delay=delay)
+
+    def paste_clipboard(self) -> str:
+        return self._pyperclip.paste()
+
+    def copy_clipboard(self, text: str) -> None:
+        self._pyperclip.copy(text)
+
+    def copy_clipboard_tracked(self, text: str, on_read: Callable[[], None]) -> bool:
+        from core.clipboard_watcher import ClipboardReadWatcher
+
+        if not ClipboardReadWatcher.is_available():
+            return False
+        if self._clipboard_watcher is None:
+            self._clipboard_watcher = ClipboardReadWatcher()
+        return self._clipboard_watcher.offer(text, on_read)
+
+
+# Скан-коды симулятора (набор US, как у библиотеки keyboard в Windows)
+_SIMULATED_SCAN_CODES: Dict[str, Tuple[int, ...]] = {
+    'esc': (1,), 'escape': (1,), 'backspace': (14,), 'tab': (15,), 'enter': (28,),
+    'ctrl': (29, 3613), 'left ctrl': (29,), 'right ctrl': (3613,),
+    'shift': (42, 54), 'left shift': (42,), 'right shift': (54,),
+    'alt': (56, 3640), 'left alt': (56,), 'right alt': (3640,), 'alt gr': (3640,),
+    'windows': (91, 92), 'win': (91, 92), 'left windows': (91,), 'right windows': (92,),
+    'space': (57,), 'caps lock': (58,), 'num lock': (69,), 'scroll lock': (70,),
+    'home': (71,), 'up': (72,), 'page up': (73,), 'left': (75,), 'right': (77,),
+    'end': (79,), 'down': (80,), 'page down': (81,), 'insert': (82,), 'delete': (83,),
+    'print screen': (55,), 'pause': (69,), 'menu': (93,),
+}
+for _index, _char in enumerate('1234567890'):
+    _SIMULATED_SCAN_CODES[_char] = (2 + _index,)
+for _row, _start in (('qwertyuiop', 16), ('asdfghjkl', 30), ('zxcvbnm', 44)):
+    for _index, _char in enumerate(_row):
+        _SIMULATED_SCAN_CODES[_char] = (_start + _index,)
+for _index in range(1, 25):
+    _SIMULATED_SCAN_CODES[f'f{_index}'] = (58 + _index if _index <= 10 else 76 + _index,)
+
+_MODIFIER_ALIASES = {
+    'left ctrl': 'ctrl', 'right ctrl': 'ctrl',
+    'left shift': 'shift', 'right shift': 'shift',
+    'left alt': 'alt', 'right alt': 'alt', 'alt gr': 'alt',
+    'windows': 'win', 'left windows': 'win', 'right windows': 'win',
+}
+_MODIFIER_NAMES = frozenset(('ctrl', 'shift', 'alt', 'win'))
+
+# Таблица переходов модификаторов при горячих клавишах с подавлением (keyboard 0.13.5):
+# (состояние, событие, источник) → (повторить нажатие, пропустить событие, новое состояние).
+# Модификатор из подавляемой комбинации сначала задерживается ('pending'): другая
+# клавиша повторяет его нажатие, а сработавшая горячая клавиша подавляет его вовсе,
+# даже если обработчик пропустил саму клавишу.
+_MODIFIER_TRANSITIONS = {
+    ('free', 'up', 'modifier'): (False, True, 'free'),
+    ('free', 'down', 'modifier'): (False, False, 'pending'),
+    ('pending', 'up', 'modifier'): (True, True, 'free'),
+    ('pending', 'down', 'modifier'): (False, True, 'allowed'),
+    ('suppressed', 'up', 'modifier'): (False, False, 'free'),
+    ('suppressed', 'down', 'modifier'): (False, False, 'suppressed'),
+    ('allowed', 'up', 'modifier'): (False, True, 'free'),
+    ('allowed', 'down', 'modifier'): (False, True, 'allowed'),
+
+    ('free', 'up', 'hotkey'): (False, None, 'free'),
+    ('free', 'down', 'hotkey'): (False, None, 'free'),
+    ('pending', 'up', 'hotkey'): (False, None, 'suppressed'),
+    ('pending', 'down', 'hotkey'): (False, None, 'suppressed'),
+    ('suppressed', 'up', 'hotkey'): (False, None, 'suppressed'),
+    ('suppressed', 'down', 'hotkey'): (False, None, 'suppressed'),
+    ('allowed', 'up', 'hotkey'): (False, None, 'allowed'),
+    ('allowed', 'down', 'hotkey'): (False, None, 'allowed'),
+
+    ('free', 'up', 'other'): (False, True, 'free'),
+    ('free', 'down', 'other'): (False, True, 'free'),
+    ('pending', 'up', 'other'): (True, True, 'allowed'),
+    ('pending', 'down', 'other'): (True, True, 'allowed'),
+    ('suppressed', 'up', 'other'): (False, False, 'allowed'),
+    ('suppressed', 'down', 'other'): (False, True, 'allowed'),
+    ('allowed', 'up', 'other'): (False, True, 'allowed'),
+    ('allowed', 'down', 'other'): (False, True, 'allowed'),
+}
+
+
+@dataclass
+class SimulatedKeyEvent:
+    """Событие клавиатуры симулятора (совместимо по полям с keyboard.KeyboardEvent)."""
+
+    event_type: str
+    name: str
+    scan_code: int
+    is_injected: bool = False
+    time: float = 0.0
+
+
+@dataclass
+class InjectedEvent:
+    """Событие, отправленное приложением через бэкенд."""
+
+    kind: str
+    value: str
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+
+class SimulatedBackend(InputBackend):
+    """Детерминированный бэкенд в памяти для тестов и замеров без рабочего стола.
+
+    Все отправленные приложением события записываются в injected_events,
+    буфер обмена хранится в строке, а физические нажатия моделируются
+    методами simulate_key / simulate_hotkey. При echo_injected=True
+    отправленные клавиши, как и в реальной ОС, снова проходят через хуки
+    и записываются в журнал ledger; при tag_injected=False они приходят
+    без флага is_injected и распознаются только по журналу.
+
+    Подавление повторяет библиотеку keyboard 0.13.5, включая задержку
+    модификаторов горячих клавиш; события, дошедшие до приложения
+    (с повторенными библиотекой нажатиями модификаторов), записываются
+    в delivered.
+    """
+
+    def __init__(self, clipboard_available: bool = True, echo_injected: bool = False,
+                 tag_injected: bool = True):
+        self.clipboard_available = clipboard_available
+        self.echo_injected = echo_injected
+        self.tag_injected = tag_injected
+        self.ledger = InjectionLedger()
+        self.clipboard = ""
+        self._clipboard_reader: Optional[Callable[[], None]] = None
+        self.injected_events: List[InjectedEvent] = []
+        self.delivered: List[Tuple[str, str]] = []
+
+        self._hotkeys: Dict[int, Tuple[frozenset, Callable[[], Any], bool]] = {}
+        self._remaps: Dict[int, Tuple[frozenset, str, bool]] = {}
+        self._hooks: Dict[int, Tuple[Callable[[Any], Any], bool]] = {}
+        self._handles = itertools.count(1)
+        self._pressed: set = set()
+        self._logically_pressed: set = set()
+        self._modifier_states: Dict[str, str] = {}
+        self._wait_event = threading.Event()
+        self._lock = threading.Lock()
+
+    # Хуки и горячие клавиши
+    def add_hotkey(self, hotkey: str, callback: Callable[[], Any], suppress: bool = False) -> Any:
+        handle = next(self._handles)
+        self._hotkeys[handle] = (self._normalize_combo(hotkey), callback, suppress)
+        return handle
+
+    def remove_hotkey(self, handle: Any) -> None:
+        if handle not in self._hotkeys:
+            raise KeyError(handle)
+        del self._hotkeys[handle]
+
+    def hook(self, callback: Callable[[Any], Any], suppress: bool = False) -> Any:
+        handle = next(self._handles)
+        self._hooks[handle] = (callback, suppress)
+        return handle
+
+    def unhook(self, handle: Any) -> None:
+        if handle not in self._hooks:
+            raise KeyError(handle)
+        del self._hooks[handle]
+
+    def remap_hotkey(self, source: str, target: str) -> Any:
+        handle = next(self._handles)
+        is_key = '+' not in source and '+' not in target
+        self._remaps[handle] = (self._normalize_combo(source), target, is_key)
+        return handle
+
+    def unremap_hotkey(self, handle: Any) -> None:
+        if handle not in self._remaps:
+            raise KeyError(handle)
+        del self._remaps[handle]
+
+    def key_to_scan_codes(self, key: str) -> Tuple[int, ...]:
+        key = key.lower()
+        if key in _SIMULATED_SCAN_CODES:
+            return _SIMULATED_SCAN_CODES[key]
+        if len(key) == 1:
+            # Символы вне таблицы получают стабильный синтетический скан-код
+            return (1000 + ord(key),)
+        raise ValueError(f"Key {key!r} is not mapped to any known key.")
+
+    def wait(self, hotkey: Optional[str] = None) -> None:
+        """Блокирует до вызова stop_waiting()."""
+        self._wait_event.wait()
+        self._wait_event.clear()
+
+    def stop_waiting(self) -> None:
+        """Прерывает wait()."""
+        self._wait_event.set()
+
+    # Отправка событий
+    def send(self, combo: str) -> None:
+        self._record('send', combo)
+        if self.echo_injected:
+            self.ledger.record(combo_key_names(combo))
+            names = [part.strip() for part in combo.lower().split('+')]
+            for name in names:
+                self._dispatch(name, 'down', injected=True)
+            for name in reversed(names):
+                self._dispatch(name, 'up', injected=True)
+
+    def press(self, key: str) -> None:
+        self._record('press', key)
+        if self.echo_injected:
+            self.ledger.record(combo_key_names(key), ('down',))
+            self._dispatch(key.lower(), 'down', injected=True)
+
+    def release(self, key: str) -> None:
+        self._record('release', key)
+        if self.echo_injected:
+            self.ledger.record(combo_key_names(key), ('up',))
+            self._dispatch(key.lower(), 'up', injected=True)
+
+    def write(self, text: str, delay: float = 0) -> None:
+        self._record('write', text, delay=delay)
+        if self.echo_injected:
+            self.ledger.record_text(text)
+            for char in text:
+                name = 'enter' if char == '\n' else char.lower()
+                self._dispatch(name, 'down', injected=True)
+                self._dispatch(name, 'up', injected=True)
+
+    # Буфер обмена
+    def paste_clipboard(self) -> str:
+        if not self.clipboard_available:
+            raise RuntimeError("Clipboard is not available")
+        # Как и при отложенной отрисовке в Windows, о чтении сообщается и своему процессу
+        on_read, self._clipboard_reader = self._clipboard_reader, None
+        if on_read is not None:
+            on_read()
+        return self.clipboard
+
+    def copy_clipboard(self, text: str) -> None:
+        if not self.clipboard_available:
+            raise RuntimeError("Clipboard is not available")
+        self._clipboard_reader = None
+        self.clipboard = text
+        self._record('clipboard', text)
+
+    def copy_clipboard_tracked(self, text: str, on_read: Callable[[], None]) -> bool:
+        self.copy_clipboard(text)
+        self._clipboard_reader = on_read
+        return True
+
+    # Моделирование физического ввода
+    def simulate_key(self, name: str, event_type: str = 'down') -> bool:
+        """Моделирует физическое событие клавиши. Возвращает True, если событие подавлено."""
+        return self._dispatch(name.lower(), event_type, injected=False)
+
+    def simulate_tap(self, name: str) -> bool:
+        """Нажатие и отпускание клавиши. Возвращает True, если нажатие подавлено."""
+        suppressed = self.simulate_key(name, 'down')
+        self.simulate_key(name, 'up')
+        return suppressed
+
+    def simulate_hotkey(self, combo: str) -> bool:
+        """Нажимает комбинацию (модификаторы, затем клавиша) и отпускает ее."""
+        names = [part.strip() for part in combo.lower().split('+')]
+        suppressed = False
+        for name in names:
+            suppressed = self.simulate_key(name, 'down')
+        for name in reversed(names):
+            self.simulate_key(name, 'up')
+        return suppressed
+
+    def simulate_clipboard_read(self) -> str:
+        """Моделирует чтение буфера обмена целевым приложением (например, по Ctrl+V)."""
+        return self.paste_clipboard()
+
+    def clear_injected(self) -> None:
+        """Очищает журналы отправленных и доставленных событий."""
+        self.injected_events = []
+        self.delivered = []
+
+    def injected_text(self) -> str:
+        """Текст, вставленный через write и вставку из буфера обмена."""
+        parts = []
+        for event in self.injected_events:
+            if event.kind == 'write':
+                parts.append(event.value)
+            elif event.kind == 'send' and event.value == 'ctrl+v':
+                parts.append(event.meta.get('clipboard', ''))
+        return ''.join(parts)
+
+    def _record(self, kind: str, value: str, **meta) -> None:
+        if kind == 'send' and value == 'ctrl+v':
+            meta['clipboard'] = self.clipboard
+        with self._lock:
+            self.injected_events.append(InjectedEvent(kind, value, meta))
+
+    def _dispatch(self, name: str, event_type: str, injected: bool) -> bool:
+        """Прогоняет событие через хуки и горячие клавиши так же, как библиотека keyboard."""
+        try:
+            scan_code = self.key_to_scan_codes(name)[0]
+        except ValueError:
+            scan_code = 0
+
+        event = SimulatedKeyEvent(event_type=event_type, name=name, scan_code=scan_code,
+                                  is_injected=injected and self.tag_injected)
+        normalized = _MODIFIER_ALIASES.get(name, name)
+
+        # Подавленное хуком событие не доходит ни до переназначений, ни до горячих клавиш
+        for callback, suppress in list(self._hooks.values()):
+            if callback(event) is False and suppress:
+                return True
+
+        if event_type == 'down':
+            self._pressed.add(normalized)
+        pressed = frozenset(self._pressed)
+        if event_type == 'up':
+            self._pressed.discard(normalized)
+
+        # Клавиша в клавишу переназначается до горячих клавиш, без обработчиков приложения
+        for combo, target, is_key in list(self._remaps.values()):
+            if is_key and combo == frozenset((normalized,)):
+                if event_type == 'down':
+                    self.press(target)
+                else:
+                    self.release(target)
+                return True
+
+        accept = True
+        blocking = self._blocking_hotkeys()
+        if blocking:
+            filtered = {modifier for combo, _ in blocking for modifier in combo & _MODIFIER_NAMES}
+            if normalized in filtered:
+                origin = 'modifier'
+                to_update = {normalized}
+            else:
+                to_update = (self._pressed | {normalized}) & _MODIFIER_NAMES
+                results = [callback(event_type, normalized) for combo, callback in blocking if combo == pressed]
+                if results:
+                    accept = all(results)
+                    origin = 'hotkey'
+                else:
+                    origin = 'other'
+
+            for modifier in sorted(to_update):
+                state = self._modifier_states.get(modifier, 'free')
+                replay, new_accept, new_state = _MODIFIER_TRANSITIONS[(state, event_type, origin)]
+                if replay:
+                    self.delivered.append(('down', modifier))
+                if new_accept is not None:
+                    accept = new_accept
+                self._modifier_states[modifier] = new_state
+
+        if accept:
+            if event_type == 'down':
+                self._logically_pressed.add(normalized)
+            else:
+                self._logically_pressed.discard(normalized)
+            self.delivered.append((event_type, normalized))
+
+        if event_type == 'down':
+            for combo, callback, suppress in list(self._hotkeys.values()):
+                if not suppress and combo == pressed:
+                    callback()
+
+        return not accept
+
+    def _blocking_hotkeys(self) -> List[Tuple[frozenset, Callable[[str, str], Any]]]:
+        """Горячие клавиши с подавлением: (комбинация, обработчик по типу события)."""
+        blocking = []
+        for combo, callback, suppress in list(self._hotkeys.values()):
+            if suppress:
+                blocking.append((combo, self._step_handler(callback)))
+        for combo, target, is_key in list(self._remaps.values()):
+            if not is_key:
+                blocking.append((combo, self._step_handler(lambda target=target: self.send(target))))
+        return blocking
+
+    def _step_handler(self, callback: Callable[[], Any]) -> Callable[[str, str], Any]:
+        # Отпускание пропускается, только если нажатие этой клавиши дошло до приложения
+        def handler(event_type: str, name: str) -> Any:
+            if event_type == 'up':
+                return name in self._logically_pressed
+            return callback()
+        return handler
+
+    @staticmethod
+    def _normalize_combo(combo: str) -> frozenset:
+        names = [part.strip().lower() for part in combo.split('+')]
+        return frozenset(_MODIFIER_ALIASES.get(name, name) for name in names)
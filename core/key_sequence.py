@@ -0,0 +1,193 @@
+"""
+Последовательности клавиш (ctrl+k, ctrl+d) на детерминированном автомате.
+"""
+
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from core.scheduler import DEFAULT_SCHEDULER, Scheduler, TimerHandle
+
+# Разделитель шагов последовательности: 'ctrl+k, ctrl+d'
+SEQUENCE_SEPARATOR = ','
+
+# Сколько секунд автомат ждет следующий шаг последовательности
+DEFAULT_SEQUENCE_TIMEOUT = 1.0
+
+# Событие клавиатуры для автомата: (scan_code, маска модификаторов)
+Token = Tuple[int, int]
+
+# Шаг последовательности: маска модификаторов и все скан-коды основной клавиши
+Step = Tuple[int, Set[int]]
+
+
+def split_key_sequence(key: str) -> List[str]:
+    """Разбивает последовательность 'ctrl+k, ctrl+d' на шаги."""
+    return [step.strip() for step in key.split(SEQUENCE_SEPARATOR)]
+
+
+def is_key_sequence(key: str) -> bool:
+    """Является ли назначение последовательностью из нескольких шагов."""
+    return SEQUENCE_SEPARATOR in key
+
+
+class KeySequenceDFA:
+    """Автомат, в который скомпилированы все последовательности профиля.
+
+    Состояние - общий префикс последовательностей, переход ищется одним
+    обращением к словарю по (scan_code, маска). Состояние с обработчиком
+    и без переходов завершает последовательность сразу; если из него
+    есть переходы (назначение 'ctrl+k' рядом с 'ctrl+k, ctrl+d'),
+    обработчик срабатывает по таймауту или при несовпадении следующего шага.
+    """
+
+    ROOT = 0
+
+    def __init__(self, sequences: Iterable[Tuple[List[Step], Callable[[], Optional[bool]]]] = ()):
+        self.transitions: List[Dict[Token, int]] = [{}]
+        self.accept: List[Optional[Callable[[], Optional[bool]]]] = [None]
+        for steps, handler in sequences:
+            self.add(steps, handler)
+
+    def add(self, steps: List[Step], handler: Callable[[], Optional[bool]]) -> None:
+        """Добавляет последовательность в автомат."""
+        state = self.ROOT
+        for mask, scan_codes in steps:
+            transitions = self.transitions[state]
+            next_state = None
+            for scan_code in scan_codes:
+                next_state = transitions.get((scan_code, mask))
+                if next_state is not None:
+                    break
+
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions.append({})
+                self.accept.append(None)
+            for scan_code in scan_codes:
+                transitions[(scan_code, mask)] = next_state
+            state = next_state
+
+        self.accept[state] = handler
+
+    def step(self, state: int, token: Token) -> Optional[int]:
+        """Переход по событию или None, если такого шага нет."""
+        return self.transitions[state].get(token)
+
+    def is_final(self, state: int) -> bool:
+        """Нет ли из состояния дальнейших переходов."""
+        return not self.transitions[state]
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.transitions[self.ROOT]
+
+
+class SequenceMatcher:
+    """Текущее состояние автомата и таймаут ожидания следующего шага.
+
+    Каждое событие - один переход. Таймаут отсчитывает таймер
+    планировщика, а не ожидание в потоке хука: перезапущенный таймер
+    узнает об этом по номеру поколения и ничего не делает. Шаги начатой
+    последовательности подавляются; если она не завершилась, они
+    пропадают, как в редакторах с аккордами клавиш.
+
+    guard вызывается перед началом новой последовательности: если он
+    вернул False (например, целевой процесс не активен), событие не
+    поглощается автоматом.
+    """
+
+    def __init__(self, timeout: float = DEFAULT_SEQUENCE_TIMEOUT):
+        self.timeout = timeout
+        self.guard: Optional[Callable[[], bool]] = None
+        self.scheduler: Scheduler = DEFAULT_SCHEDULER
+        self.dfa = KeySequenceDFA()
+
+        self._lock = threading.Lock()
+        self._state = KeySequenceDFA.ROOT
+        self._timer: Optional[TimerHandle] = None
+        self._generation = 0
+
+    @property
+    def is_pending(self) -> bool:
+        """Начата ли последовательность."""
+        return self._state != KeySequenceDFA.ROOT
+
+    def load(self, dfa: KeySequenceDFA) -> None:
+        """Заменяет автомат и сбрасывает начатую последовательность."""
+        with self._lock:
+            self.dfa = dfa
+            self._reset_locked()
+
+    def reset(self) -> None:
+        """Сбрасывает начатую последовательность без срабатывания."""
+        with self._lock:
+            self._reset_locked()
+
+    def feed(self, token: Token) -> bool:
+        """Подает событие автомату. Возвращает True, если событие поглощено."""
+        fired: List[Callable[[], Optional[bool]]] = []
+        with self._lock:
+            consumed = self._feed_locked(token, fired)
+        for handler in fired:
+            handler()
+        return consumed
+
+    def _feed_locked(self, token: Token, fired: List[Callable[[], Optional[bool]]]) -> bool:
+        dfa = self.dfa
+        if self._state != KeySequenceDFA.ROOT:
+            self._cancel_timer()
+            next_state = dfa.step(self._state, token)
+            if next_state is not None:
+                self._enter(next_state, fired)
+                return True
+
+            # Следующий шаг не совпал: незавершенная последовательность
+            # срабатывает, если она сама назначена, а событие разбирается с начала
+            handler = dfa.accept[self._state]
+            if handler is not None:
+                fired.append(handler)
+            self._state = KeySequenceDFA.ROOT
+
+        next_state = dfa.step(KeySequenceDFA.ROOT, token)
+        if next_state is None:
+            return False
+        if self.guard is not None and not self.guard():
+            return False
+
+        self._enter(next_state, fired)
+        return True
+
+    def _enter(self, state: int, fired: List[Callable[[], Optional[bool]]]) -> None:
+        """Переходит в состояние и завершает последовательность или ждет следующий шаг."""
+        if self.dfa.is_final(state):
+            self._state = KeySequenceDFA.ROOT
+            handler = self.dfa.accept[state]
+            if handler is not None:
+                fired.append(handler)
+            return
+
+        self._state = state
+        self._generation += 1
+        self._timer = self.scheduler.call_later(self.timeout, self._on_timeout, self._generation,
+                                                name="KeySequenceTimeout")
+
+    def _on_timeout(self, generation: int) -> None:
+        with self._lock:
+            # Таймер, который успели перезапустить или отменить, ничего не делает
+            if generation != self._generation or self._state == KeySequenceDFA.ROOT:
+                return
+            handler = self.dfa.accept[self._state]
+            self._state = KeySequenceDFA.ROOT
+            self._timer = None
+        if handler is not None:
+            handler()
+
+    def _reset_locked(self) -> None:
+        self._cancel_timer()
+        self._generation += 1
+        self._state = KeySequenceDFA.ROOT
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
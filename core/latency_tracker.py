@@ -0,0 +1,197 @@
+"""
+Гистограммы задержек конвейера переназначения клавиш.
+"""
+
+import json
+import os
+import threading
+from bisect import bisect_left
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _build_bucket_bounds() -> Tuple[int, ...]:
+    """Границы корзин в наносекундах: шаги 1-1.5-2-3-5-7 от 1 мкс до 10 с."""
+    bounds = []
+    value = 1_000
+    while value <= 1_000_000_000:
+        for step in (10, 15, 20, 30, 50, 70):
+            bounds.append(value * step // 10)
+        value *= 10
+    bounds.append(10_000_000_000)
+    return tuple(bounds)
+
+
+LATENCY_BUCKET_BOUNDS_NS = _build_bucket_bounds()
+
+# Этапы конвейера в порядке прохождения нажатия
+LATENCY_STAGES = ('hook', 'process_check', 'queue_wait', 'execute', 'inject', 'end_to_end')
+
+STAGE_NAMES = {
+    'hook': 'Хук (вход → очередь)',
+    'process_check': 'Проверка процесса',
+    'queue_wait': 'Ожидание в очереди',
+    'execute': 'Выполнение действия',
+    'inject': 'Вставка текста',
+    'end_to_end': 'Полный путь',
+}
+
+
+class LatencyHistogram:
+    """Гистограмма с фиксированными корзинами: запись - один bisect и инкремент."""
+
+    __slots__ = ('counts', 'count', 'total_ns', 'max_ns')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKET_BOUNDS_NS) + 1)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, value_ns: int) -> None:
+        """Добавляет измерение."""
+        self.counts[bisect_left(LATENCY_BUCKET_BOUNDS_NS, value_ns)] += 1
+        self.count += 1
+        self.total_ns += value_ns
+        if value_ns > self.max_ns:
+            self.max_ns = value_ns
+
+    def copy(self) -> 'LatencyHistogram':
+        """Независимая копия для чтения вне блокировки."""
+        histogram = LatencyHistogram()
+        histogram.counts = list(self.counts)
+        histogram.count = self.count
+        histogram.total_ns = self.total_ns
+        histogram.max_ns = self.max_ns
+        return histogram
+
+    def percentile(self, percent: float) -> int:
+        """Оценка перцентиля сверху (граница корзины), в наносекундах."""
+        if not self.count:
+            return 0
+
+        threshold = self.count * percent / 100.0
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= threshold and bucket_count:
+                if index < len(LATENCY_BUCKET_BOUNDS_NS):
+                    return min(LATENCY_BUCKET_BOUNDS_NS[index], self.max_ns)
+                return self.max_ns
+        return self.max_ns
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Сериализует гистограмму со сводкой перцентилей."""
+        return {
+            'count': self.count,
+            'mean_ns': self.total_ns // self.count if self.count else 0,
+            'max_ns': self.max_ns,
+            'p50_ns': self.percentile(50),
+            'p95_ns': self.percentile(95),
+            'p99_ns': self.percentile(99),
+            'buckets': {
+                str(LATENCY_BUCKET_BOUNDS_NS[i]) if i < len(LATENCY_BUCKET_BOUNDS_NS) else 'inf': c
+                for i, c in enumerate(self.counts) if c
+            }
+        }
+
+
+class LatencyTracker:
+    """Сбор гистограмм задержек по этапам, клавишам и типам действий.
+
+    Этапы пишут несколько потоков (хук, рабочий поток очереди, хук
+    сокращений), поэтому запись идет под блокировкой, а сводка и экспорт
+    читают копию гистограмм, снятую под той же блокировкой.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.by_key: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.by_action_type: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.started_at = datetime.now()
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, value_ns: int, key: Optional[str] = None,
+               action_type: Optional[str] = None) -> None:
+        """Записывает длительность этапа для клавиши и/или типа действия."""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            if key is not None:
+                histogram = self.by_key.get((stage, key))
+                if histogram is None:
+                    histogram = self.by_key[(stage, key)] = LatencyHistogram()
+                histogram.record(value_ns)
+
+            if action_type is not None:
+                histogram = self.by_action_type.get((stage, action_type))
+                if histogram is None:
+                    histogram = self.by_action_type[(stage, action_type)] = LatencyHistogram()
+                histogram.record(value_ns)
+
+    def snapshot(self, group: str = 'action_type') -> Dict[Tuple[str, str], LatencyHistogram]:
+        """Копия гистограмм группы ('action_type' или 'key'), согласованная на момент вызова."""
+        with self._lock:
+            source = self.by_action_type if group == 'action_type' else self.by_key
+            return {name: histogram.copy() for name, histogram in source.items()}
+
+    def has_data(self) -> bool:
+        """Есть ли хотя бы одно измерение."""
+        return bool(self.by_key or self.by_action_type)
+
+    def summary(self, group: str = 'action_type', stage: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Сводка p50/p95/p99 по группам ('action_type' или 'key')."""
+        rows = []
+        for (row_stage, name), histogram in self.snapshot(group).items():
+            if stage is not None and row_stage != stage:
+                continue
+            rows.append({
+                'stage': row_stage,
+                'name': name,
+                'count': histogram.count,
+                'p50_ns': histogram.percentile(50),
+                'p95_ns': histogram.percentile(95),
+                'p99_ns': histogram.percentile(99),
+                'max_ns': histogram.max_ns,
+            })
+
+        stage_order = {name: index for index, name in enumerate(LATENCY_STAGES)}
+        rows.sort(key=lambda row: (stage_order.get(row['stage'], len(stage_order)), -row['count']))
+        return rows
+
+    def export(self, directory: str = "logs") -> Optional[str]:
+        """Экспортирует гистограммы в JSON-файл и возвращает путь к нему."""
+        try:
+            os.makedirs(directory, exist_ok=True)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = os.path.join(directory, f"latency_{timestamp}.json")
+
+            data = {
+                'started_at': self.started_at.isoformat(),
+                'exported_at': datetime.now().isoformat(),
+                'bucket_bounds_ns': list(LATENCY_BUCKET_BOUNDS_NS),
+                'by_action_type': {
+                    f"{stage}:{name}": histogram.to_dict()
+                    for (stage, name), histogram in self.snapshot('action_type').items()
+                },
+                'by_key': {
+                    f"{stage}:{name}": histogram.to_dict()
+                    for (stage, name), histogram in self.snapshot('key').items()
+                },
+            }
+
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+
+            return path
+        except Exception as e:
+            print(f"❌ Ошибка экспорта гистограмм задержек: {e}")
+            return None
+
+    def reset(self) -> None:
+        """Сбрасывает все измерения."""
+        with self._lock:
+            self.by_key = {}
+            self.by_action_type = {}
+            self.started_at = datetime.now()
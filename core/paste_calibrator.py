@@ -0,0 +1,78 @@
+"""
+Автокалибровка паузы после вставки из буфера обмена для каждого процесса.
+"""
+
+from collections import deque
+from typing import Deque, Dict, Optional
+
+# Число последних замеров на процесс и минимум замеров до сохранения паузы
+CALIBRATION_SAMPLES = 20
+CALIBRATION_MIN_SAMPLES = 5
+
+# Запас над максимальным замером и нижняя граница паузы (секунды)
+CALIBRATION_MARGIN = 1.5
+CALIBRATION_FLOOR = 0.005
+
+
+class PasteSettleCalibrator:
+    """Минимальная безопасная пауза после Ctrl+V для каждого целевого процесса.
+
+    Замер - время от Ctrl+V до момента, когда целевое приложение прочитало
+    буфер обмена (бэкенд сообщает об этом через отложенную отрисовку).
+    Пауза процесса - максимум последних замеров с запасом, но не больше
+    паузы по умолчанию (clipboard_timeout). Если приложение не прочитало
+    буфер обмена до его смены, выученная пауза процесса отбрасывается.
+    """
+
+    def __init__(self, delays: Optional[Dict[str, float]] = None, calibrating: bool = False):
+        self.delays: Dict[str, float] = dict(delays or {})
+        self.calibrating = calibrating
+        self.changed = False
+        self._samples: Dict[str, Deque[float]] = {}
+
+    @property
+    def is_used(self) -> bool:
+        """Нужно ли определять активный процесс при вставке."""
+        return self.calibrating or bool(self.delays)
+
+    def delay_for(self, process_name: Optional[str], default: float) -> float:
+        """Пауза после вставки для процесса (не больше паузы по умолчанию)."""
+        if not process_name:
+            return default
+        delay = self.delays.get(process_name.lower())
+        return default if delay is None else min(default, delay)
+
+    def record(self, process_name: Optional[str], elapsed: float) -> None:
+        """Учитывает время, за которое процесс прочитал буфер обмена."""
+        if not process_name:
+            return
+
+        name = process_name.lower()
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = self._samples[name] = deque(maxlen=CALIBRATION_SAMPLES)
+        samples.append(elapsed)
+
+        if len(samples) < CALIBRATION_MIN_SAMPLES:
+            return
+
+        delay = round(max(CALIBRATION_FLOOR, max(samples) * CALIBRATION_MARGIN), 4)
+        if self.delays.get(name) != delay:
+            self.delays[name] = delay
+            self.changed = True
+
+    def record_missed(self, process_name: Optional[str]) -> None:
+        """Процесс не прочитал буфер обмена до его смены: калибровка процесса начинается заново."""
+        if not process_name:
+            return
+
+        name = process_name.lower()
+        self._samples.pop(name, None)
+        if self.delays.pop(name, None) is not None:
+            self.changed = True
+
+    def reset(self) -> None:
+        """Сбрасывает все замеры и сохраненные паузы."""
+        self.delays = {}
+        self._samples = {}
+        self.changed = True
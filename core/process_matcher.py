@@ -0,0 +1,91 @@
+"""
+Скомпилированный матчер целевых процессов.
+"""
+
+import re
+import fnmatch
+from typing import Dict, List, Optional, Union
+
+# Префикс, которым в списке целевых процессов помечаются регулярные выражения
+REGEX_PREFIX = 're:'
+GLOB_CHARS = ('*', '?', '[')
+
+# Ограничение на количество запомненных результатов сопоставления
+MATCH_MEMO_SIZE = 256
+
+
+TargetProcess = Union[str, List[str], None]
+
+
+def normalize_target_patterns(target_process: TargetProcess) -> List[str]:
+    """Приводит целевой процесс профиля (строку или список) к списку шаблонов."""
+    if not target_process:
+        return []
+    if isinstance(target_process, str):
+        target_process = [target_process]
+    return [str(pattern).strip() for pattern in target_process if str(pattern).strip()]
+
+
+class ProcessMatcher:
+    """Сопоставление имени процесса со списком точных имен, glob-шаблонов и регулярных выражений.
+
+    Точные имена собираются во frozenset, glob-шаблоны и регулярные
+    выражения (с префиксом 're:') объединяются в одно регулярное выражение.
+    Имя без расширения совпадает с именем процесса без расширения
+    ('chrome' → 'chrome.exe'). Пустой список совпадает с любым процессом.
+    Результаты запоминаются для каждого имени активного процесса.
+    """
+
+    def __init__(self, target_process: TargetProcess):
+        self.patterns = tuple(normalize_target_patterns(target_process))
+        self.match_all = not self.patterns
+
+        exact_names = set()
+        regex_parts = []
+        for pattern in self.patterns:
+            if pattern.lower().startswith(REGEX_PREFIX):
+                expression = pattern[len(REGEX_PREFIX):]
+                try:
+                    re.compile(expression)
+                except re.error as e:
+                    print(f"⚠️  Неверное регулярное выражение '{expression}': {e}")
+                    continue
+                regex_parts.append(f"(?:{expression})")
+            elif any(char in pattern for char in GLOB_CHARS):
+                regex_parts.append(fnmatch.translate(pattern.lower()))
+            else:
+                exact_names.add(pattern.lower())
+
+        self._exact_names = frozenset(exact_names)
+        self._regex = re.compile('|'.join(regex_parts), re.IGNORECASE) if regex_parts else None
+        self._memo: Dict[str, bool] = {}
+
+    def matches(self, process_name: Optional[str]) -> bool:
+        """Совпадает ли имя процесса с одним из шаблонов."""
+        if self.match_all:
+            return True
+        if not process_name:
+            return False
+
+        result = self._memo.get(process_name)
+        if result is None:
+            result = self._match(process_name)
+            if len(self._memo) >= MATCH_MEMO_SIZE:
+                self._memo.clear()
+            self._memo[process_name] = result
+        return result
+
+    def _match(self, process_name: str) -> bool:
+        """Сопоставление без запоминания."""
+        name_lower = process_name.lower()
+        if name_lower in self._exact_names:
+            return True
+
+        stem = name_lower.rsplit('.', 1)[0]
+        if stem != name_lower and stem in self._exact_names:
+            return True
+
+        return self._regex is not None and self._regex.fullmatch(name_lower) is not None
+
+    def __repr__(self) -> str:
+        return f"ProcessMatcher({list(self.patterns)!r})"
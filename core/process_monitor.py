@@ -4,113 +4,329 @@
 
 import time
 import threading
-from typing import Optional
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Dict, Optional, Tuple, Union
 
-from constants import WINDOWS_API_AVAILABLE, PROCESS_MONITOR_INTERVAL
+from constants import (
+    WINDOWS_API_AVAILABLE, PROCESS_CHECK_INTERVAL, PROCESS_MONITOR_INTERVAL,
+    PROCESS_MONITOR_MAX_INTERVAL, PID_CACHE_SIZE, PID_CACHE_TTL
+)
+from core.event_bus import EventBus, Topic
+from core.foreground_source import ForegroundSource, PollingForegroundSource, WinEventForegroundSource
+from core.process_matcher import ProcessMatcher, TargetProcess, normalize_target_patterns
+from core.scheduler import Scheduler
+
+if WINDOWS_API_AVAILABLE:
+    import win32gui
+    import win32process
+    import psutil
+
+
+@dataclass(frozen=True)
+class ProcessState:
+    """Неизменяемая запись об активном процессе.
+
+    version растет только при смене процесса или результата сопоставления,
+    timestamp обновляется при каждой проверке.
+    """
+
+    pid: Optional[int] = None
+    name: Optional[str] = None
+    is_target: Optional[bool] = None
+    timestamp: float = 0.0
+    version: int = 0
+
+    @property
+    def display_name(self) -> str:
+        return self.name or "Не определен"
 
 
 class ProcessMonitor:
-    """Мониторинг активного процесса."""
+    """Мониторинг активного процесса.
+
+    О смене активного окна сообщает источник ForegroundSource. По
+    умолчанию в Windows это WinEvent-хук, который не просыпается между
+    сменами окна, иначе - опрос только с уведомлением об изменениях.
+    Пока работает источник с push-уведомлениями, проверка целевого
+    процесса берет последнее переданное им окно без обращения к системе.
+
+    Мониторинг работает, пока он кому-то нужен: start_monitoring и
+    stop_monitoring считают запросы (сеанс переназначения, окно
+    статуса), и источник останавливается, когда запросов не осталось.
+
+    Состояние публикуется записью ProcessState, которая заменяется
+    целиком одной ссылкой: читатели получают согласованные PID, имя и
+    результат без блокировок, а wait_for_change блокирует до смены версии.
+    is_target в записи считается для матчера, заданного watch().
+    """
+
+    def __init__(self, source: Optional[ForegroundSource] = None, event_bus: Optional[EventBus] = None):
+        # Опубликованное состояние - заменяется целиком одной ссылкой
+        self._state = ProcessState()
+        self._state_changed = threading.Condition()
+        self.watch_matcher: Optional[ProcessMatcher] = None
 
-    def __init__(self):
-        self._process_cache = None
-        self._last_process_check = 0
-        self.current_process_info = "Не определен"
-        self.process_match_status = "❌"
         self.last_active_process = None
         self.monitor_running = False
-        self.process_monitor_thread = None
+        self._demand = 0
+        self._demand_lock = threading.Lock()
+
+        # Источник смены активного окна; о смене процесса сообщается в шину (FOCUS_CHANGED)
+        self.source = source
+        self.event_bus = event_bus
+        # Планировщик для опроса (цикл сеанса asyncio); None - опрос в своем потоке
+        self.scheduler: Optional[Scheduler] = None
+
+        # Время жизни кэша проверки целевого процесса и период опроса монитора
+        self.check_interval = PROCESS_CHECK_INTERVAL
+        self.monitor_interval = PROCESS_MONITOR_INTERVAL
+
+        # LRU-кэш (окно, PID) → (время создания процесса, имя процесса, время проверки)
+        self._pid_cache: "OrderedDict[Tuple[int, int], Tuple[float, str, float]]" = OrderedDict()
+        self._pid_cache_lock = threading.Lock()
+        self.pid_cache_hits = 0
+        self.pid_cache_misses = 0
+
+        # Скомпилированные матчеры целевых процессов по набору шаблонов
+        self._matchers: Dict[Tuple[str, ...], ProcessMatcher] = {}
+
+    def configure(self, check_frequency: float) -> None:
+        """Применяет частоту проверки процессов из настроек.
+
+        Монитор опрашивает активное окно реже проверки в том же отношении,
+        что и значения по умолчанию.
+        """
+        self.check_interval = check_frequency
+        self.monitor_interval = check_frequency * PROCESS_MONITOR_INTERVAL / PROCESS_CHECK_INTERVAL
+        if isinstance(self.source, PollingForegroundSource):
+            self.source.interval = self.monitor_interval
+
+    @property
+    def state(self) -> ProcessState:
+        """Последнее опубликованное состояние."""
+        return self._state
+
+    def watch(self, target_process: Union[TargetProcess, ProcessMatcher]) -> ProcessState:
+        """Задает целевой процесс, для которого в состоянии считается is_target."""
+        self.watch_matcher = self.get_matcher(target_process)
+        state = self._state
+        return self._publish(state.pid, state.name, state.timestamp)
+
+    def refresh_state(self) -> ProcessState:
+        """Актуальное состояние: от push-источника или запросом к системе."""
+        if self._pushed_foreground() is not None:
+            return self._state
+        pid, name = self._query_foreground()
+        return self._publish(pid, name, time.time())
+
+    def wait_for_change(self, version: int, timeout: Optional[float] = None) -> ProcessState:
+        """Ждет состояния с версией, отличной от version (не дольше timeout)."""
+        with self._state_changed:
+            self._state_changed.wait_for(lambda: self._state.version != version, timeout)
+            return self._state
+
+    def _publish(self, pid: Optional[int], name: Optional[str], timestamp: float) -> ProcessState:
+        """Публикует новое состояние; версия растет, только если что-то изменилось."""
+        with self._state_changed:
+            old = self._state
+            matcher = self.watch_matcher
+            is_target = matcher.matches(name) if matcher is not None else None
+            if (pid, name, is_target) == (old.pid, old.name, old.is_target):
+                state = replace(old, timestamp=timestamp)
+            else:
+                state = ProcessState(pid, name, is_target, timestamp, old.version + 1)
+            self._state = state
+            if state.version != old.version:
+                self._state_changed.notify_all()
+            return state
 
     def get_active_window_process(self) -> Optional[str]:
         """Получить имя процесса активного окна."""
+        return self.get_foreground_process()[1]
+
+    def get_foreground_process(self) -> Tuple[Optional[int], Optional[str]]:
+        """PID и имя процесса активного окна."""
+        foreground = self._pushed_foreground()
+        if foreground is not None:
+            return foreground
+        return self._query_foreground()
+
+    @property
+    def is_push(self) -> bool:
+        """Сообщает ли работающий источник о смене окна сразу (а не опросом)."""
+        source = self.source
+        return self.monitor_running and source is not None and source.is_push
+
+    def _pushed_foreground(self) -> Optional[Tuple[Optional[int], Optional[str]]]:
+        """Активное окно от источника с push-уведомлениями, если он работает."""
+        if self.is_push:
+            state = self._state
+            return state.pid, state.name
+        return None
+
+    def _query_foreground(self) -> Tuple[Optional[int], Optional[str]]:
+        """Запрашивает активное окно у системы."""
         if not WINDOWS_API_AVAILABLE:
-            return None
+            return None, None
 
         try:
-            import win32gui
-            import win32process
-            import psutil
-
             hwnd = win32gui.GetForegroundWindow()
             if hwnd == 0:
-                return None
+                return None, None
 
             _, pid = win32process.GetWindowThreadProcessId(hwnd)
-            process = psutil.Process(pid)
-            return process.name()
-        except (psutil.NoSuchProcess, psutil.AccessDenied, Exception):
-            return None
+            return pid, self._get_process_name(pid, hwnd)
+        except Exception:
+            return None, None
+
+    def _get_process_name(self, pid: int, hwnd: int = 0) -> str:
+        """Имя процесса по PID с кэшированием и проверкой повторного использования PID.
+
+        Пока окно принадлежит процессу, его PID не может достаться другому
+        процессу, поэтому запись для той же пары (окно, PID) не старше
+        PID_CACHE_TTL возвращается без обращения к системе. Более старая
+        запись перепроверяется по времени создания процесса.
+        """
+        key = (hwnd, pid)
+        now = time.monotonic()
+        with self._pid_cache_lock:
+            cached = self._pid_cache.get(key)
+            if cached is not None and now - cached[2] < PID_CACHE_TTL:
+                self._pid_cache.move_to_end(key)
+                self.pid_cache_hits += 1
+                return cached[1]
+
+        process = psutil.Process(pid)
+        # Время создания уже получено psutil при создании объекта и отличает
+        # новый процесс, которому система выдала тот же PID
+        create_time = process.create_time()
+
+        with self._pid_cache_lock:
+            if cached is not None and cached[0] == create_time:
+                self._pid_cache[key] = (create_time, cached[1], now)
+                self._pid_cache.move_to_end(key)
+                self.pid_cache_hits += 1
+                return cached[1]
+            self.pid_cache_misses += 1
+
+        name = process.name()
+
+        with self._pid_cache_lock:
+            self._pid_cache[key] = (create_time, name, now)
+            self._pid_cache.move_to_end(key)
+            while len(self._pid_cache) > PID_CACHE_SIZE:
+                self._pid_cache.popitem(last=False)
+
+        return name
+
+    def get_pid_cache_stats(self) -> Dict[str, float]:
+        """Статистика кэша имен процессов."""
+        total = self.pid_cache_hits + self.pid_cache_misses
+        return {
+            'hits': self.pid_cache_hits,
+            'misses': self.pid_cache_misses,
+            'size': len(self._pid_cache),
+            'hit_rate': self.pid_cache_hits / total if total else 0.0
+        }
+
+    def clear_pid_cache(self) -> None:
+        """Очищает кэш имен процессов."""
+        with self._pid_cache_lock:
+            self._pid_cache.clear()
+
+    def get_matcher(self, target_process: Union[TargetProcess, ProcessMatcher]) -> ProcessMatcher:
+        """Возвращает скомпилированный матчер для целевого процесса профиля."""
+        if isinstance(target_process, ProcessMatcher):
+            return target_process
 
-    def is_target_process_active(self, target_process: str, use_cache: bool = True) -> bool:
+        patterns = tuple(normalize_target_patterns(target_process))
+        matcher = self._matchers.get(patterns)
+        if matcher is None:
+            matcher = ProcessMatcher(list(patterns))
+            self._matchers[patterns] = matcher
+        return matcher
+
+    def is_target_process_active(self, target_process: Union[TargetProcess, ProcessMatcher],
+                                 use_cache: bool = True) -> bool:
         """Проверка, является ли активное окно целевым процессом."""
+        foreground = self._pushed_foreground()
+        if foreground is not None:
+            return self.get_matcher(target_process).matches(foreground[1])
+
         if not WINDOWS_API_AVAILABLE:
             return True
 
+        # Нажатие - признак активности: опрос возвращается к быстрому периоду
+        self.notify_activity()
+
+        matcher = self.get_matcher(target_process)
         current_time = time.time()
-        if use_cache and self._process_cache is not None and \
-                (current_time - self._last_process_check) < 0.1:  # PROCESS_CHECK_INTERVAL
-            return self._process_cache
-
-        active_process = self.get_active_window_process()
-        if active_process is None:
-            self._process_cache = False
-            self._last_process_check = current_time
-            return False
-
-        active_lower = active_process.lower()
-        target_lower = target_process.lower()
-
-        result = (
-            active_lower == target_lower or
-            active_lower.startswith(target_lower) or
-            active_lower.endswith(target_lower) or
-            target_lower in active_lower or
-            active_lower in target_lower
-        )
-
-        self._process_cache = result
-        self._last_process_check = current_time
-        return result
+        state = self._state
+        if use_cache and (current_time - state.timestamp) < self.check_interval:
+            return matcher.matches(state.name)
+
+        pid, name = self._query_foreground()
+        self._publish(pid, name, current_time)
+        return matcher.matches(name)
+
+    def notify_activity(self) -> None:
+        """Сообщает источнику об активности пользователя."""
+        source = self.source
+        if self.monitor_running and source is not None:
+            source.poke()
 
     def start_monitoring(self) -> None:
-        """Запуск фонового мониторинга процессов."""
-        if self.monitor_running:
-            return
+        """Запрашивает отслеживание смены активного окна (запуск при первом запросе)."""
+        with self._demand_lock:
+            self._demand += 1
+            if self.monitor_running:
+                return
+
+            if self.source is None:
+                self.source = self._create_source()
+                if self.source is None:
+                    # Активное окно определить нечем - отслеживать нечего
+                    return
 
-        self.monitor_running = True
-        self.process_monitor_thread = threading.Thread(
-            target=self._monitor_worker,
-            daemon=True
-        )
-        self.process_monitor_thread.start()
+            self.monitor_running = True
+            self.source.scheduler = self.scheduler
+            if not self.source.start(self._on_foreground_change):
+                # Источник уведомлений не запустился - активное окно отслеживается опросом
+                print("🔁 Активное окно отслеживается опросом")
+                self.source = self._create_polling_source()
+                self.source.scheduler = self.scheduler
+                self.source.start(self._on_foreground_change)
 
     def stop_monitoring(self) -> None:
-        """Остановка мониторинга процессов."""
-        self.monitor_running = False
-        if self.process_monitor_thread:
-            self.process_monitor_thread.join(timeout=1.0)
-            self.process_monitor_thread = None
-
-    def _monitor_worker(self) -> None:
-        """Фоновый поток для мониторинга изменений процесса."""
-        while self.monitor_running:
-            try:
-                current_process = self.get_active_window_process()
-
-                if current_process:
-                    self.current_process_info = current_process
-                    # Note: target_process is passed from outside when checking
-                    # We update the display but the actual check is done in the remapper
-                    self.process_match_status = "❌"  # Default, will be updated by remapper
-                else:
-                    self.current_process_info = "Не определен"
-                    self.process_match_status = "❌"
-
-                if current_process != self.last_active_process:
-                    self.last_active_process = current_process
-                    self._process_cache = None  # Reset cache on process change
-
-                time.sleep(PROCESS_MONITOR_INTERVAL)
-            except Exception as e:
-                print(f"Process monitor error: {e}")
-                time.sleep(1.0)
\ No newline at end of file
+        """Снимает запрос отслеживания; источник останавливается после последнего."""
+        with self._demand_lock:
+            self._demand = max(0, self._demand - 1)
+            if self._demand or not self.monitor_running:
+                return
+
+            self.monitor_running = False
+            if self.source is not None:
+                self.source.stop()
+
+    def _create_source(self) -> Optional[ForegroundSource]:
+        """Источник по умолчанию: WinEvent в Windows, иначе опрос при наличии Windows API."""
+        if WINDOWS_API_AVAILABLE and WinEventForegroundSource.is_available():
+            return WinEventForegroundSource(self._query_foreground)
+        if WINDOWS_API_AVAILABLE:
+            return self._create_polling_source()
+        return None
+
+    def _create_polling_source(self) -> PollingForegroundSource:
+        """Адаптивный опрос активного окна с периодом монитора."""
+        return PollingForegroundSource(self._query_foreground, self.monitor_interval,
+                                       max_interval=PROCESS_MONITOR_MAX_INTERVAL)
+
+    def _on_foreground_change(self, pid: Optional[int], process_name: Optional[str]) -> None:
+        """Обработчик источника: вызывается только при смене активного окна."""
+        self._publish(pid, process_name, time.time())
+
+        if process_name != self.last_active_process:
+            self.last_active_process = process_name
+            if self.event_bus is not None:
+                self.event_bus.publish(Topic.FOCUS_CHANGED, pid=pid, process_name=process_name)
@@ -2,33 +2,102 @@
 Основной класс ремаппера для приложения переназначения клавиш.
 """
 
-import time
-import keyboard
-from typing import Dict, List, Optional
+import os
+import threading
+from time import perf_counter_ns
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+from constants import AUTOSAVE_INTERVAL, CONFIG_FILE, CONFIG_WATCH_INTERVAL
+from core.async_runtime import AsyncRuntime
 from core.config_manager import ConfigManager
+from core.event_bus import Event, EventBus, Topic
 from core.process_monitor import ProcessMonitor
-from core.action_executor import ActionExecutor
+from core.action_executor import ActionExecutor, CompiledAction
+from core.input_backend import InputBackend, KeyboardBackend
+from core.action_queue import ActionQueue
+from core.latency_tracker import LatencyTracker
+from core.paste_calibrator import PasteSettleCalibrator
+from core.hook_dispatcher import HookDispatcher, parse_key_combo
+from core.key_sequence import is_key_sequence, split_key_sequence
+from core.hotstring_engine import HotstringEngine
+from core.runtime_snapshot import RuntimeSnapshot
+from core.scheduler import DEFAULT_SCHEDULER, Scheduler
 from core.settings_manager import SettingsManager, AutoStartManager
+from models.mapping import ActionType
 from utils.macro_manager import MacroManager
+from utils.validators import validate_key
+
+# Настройки вставки текста, которые применяются к работающему сеансу без перезапуска
+_INJECTOR_SETTINGS = frozenset((
+    'injection_mode', 'direct_type_max_ascii', 'direct_type_learned_ascii',
+    'direct_type_max_glyphs', 'adaptive_injection',
+    'clipboard_restore_delay', 'typing_delay', 'clipboard_timeout',
+    'typing_chunk_size', 'typing_rate_limit',
+))
+
+# Способы регистрации клавиши: прямое переназначение библиотеки, автомат
+# последовательностей или таблица единого хука (горячая клавиша add_hotkey -
+# только запасной путь для клавиш без модификаторов, которых нет в таблице)
+KIND_NATIVE = 'native'
+KIND_SEQUENCE = 'sequence'
+KIND_HOOK = 'hook'
 
 
 class KeyboardRemapper:
     """Основной класс для переназначения клавиш."""
 
-    def __init__(self):
+    def __init__(self, backend: Optional[InputBackend] = None):
+        # Весь ввод с клавиатуры и буфер обмена идут через бэкенд
+        self.backend = backend if backend is not None else KeyboardBackend()
+
+        # Шина событий между ремаппером, монитором процессов, настройками и макросами
+        self.event_bus = EventBus()
+
         self.config_manager = ConfigManager()
-        self.process_monitor = ProcessMonitor()
-        self.action_executor = ActionExecutor()
+        self.process_monitor = ProcessMonitor(event_bus=self.event_bus)
+        self.action_executor = ActionExecutor(self.backend)
 
         self.mappings: Dict[str, str] = {}
         self.is_active = False
         self.hotkeys = []
 
+        # Снимок активного профиля, который читают обработчики клавиш
+        self._snapshot: Optional[RuntimeSnapshot] = None
+
+        # Состояние сеанса переназначения
+        self._snapshots: Dict[str, RuntimeSnapshot] = {}
+        self._registered_keys: Dict[str, Any] = {}
+        # Способ регистрации каждой клавиши сеанса, включая прямые переназначения
+        self._key_kinds: Dict[str, str] = {}
+        self._dispatcher: Optional[HookDispatcher] = None
+        self._ledger_hook = None
+        self._sequence_prefixes: set = set()
+        # Назначения клавиша → клавиша выполняет сама библиотека, без обработчика
+        self._native_keys: set = set()
+        self._native_remaps: Dict[str, Tuple[str, Any]] = {}
+        self._native_lock = threading.Lock()
+        self._hotstrings: Optional[HotstringEngine] = None
+        self._action_queue: Optional[ActionQueue] = None
+        self._auto_switch = False
+        self._focus_subscription: Optional[int] = None
+        # Цикл asyncio, которому принадлежит сеанс (настройка runtime = 'asyncio')
+        self._runtime: Optional[AsyncRuntime] = None
+        # Запрос остановки сеанса в режиме потоков (stop_remapping)
+        self._stop_requested = threading.Event()
+        self._config_mtime: Optional[float] = None
+        self._config_pending = False
+
         self.load_config()
 
-        self.settings_manager = SettingsManager()
-        self.macro_manager = MacroManager(self.config_manager)
+        self.settings_manager = SettingsManager(self.event_bus)
+        self.macro_manager = MacroManager(self.config_manager, self.event_bus)
+        self.event_bus.subscribe(Topic.SETTING_CHANGED, self._on_setting_changed)
+
+        # Гистограммы задержек накапливаются между сеансами до сброса
+        self.latency_tracker = LatencyTracker(enabled=bool(self.settings_manager.get_setting('latency_tracking')))
+        self.action_executor.latency_tracker = self.latency_tracker
+        self.action_executor.macro_resolver = self.macro_manager.get_macro
+        self._apply_runtime_settings()
         self.autostart_manager = AutoStartManager()
 
     def load_config(self) -> None:
@@ -60,7 +129,12 @@ class KeyboardRemapper:
 
     def start_remapping(self) -> None:
         """Запуск переназначения."""
-        if not self.mappings:
+        auto_switch = bool(self.settings_manager.get_setting('auto_switch_profiles'))
+        has_other_mappings = auto_switch and any(
+            profile.mappings or profile.hotstrings for profile in self.config_manager.profiles.values()
+        )
+        has_hotstrings = bool(self.config_manager.get_current_profile().hotstrings)
+        if not self.mappings and not has_hotstrings and not has_other_mappings:
             print("❌ Нет назначенных клавиш!")
             return
 
@@ -68,7 +142,7 @@ class KeyboardRemapper:
         print("📋 Активные назначения:")
 
         # Ленивый импорт для избежания циклических зависимостей
-        from utils.formatters import format_key_display, get_action_display
+        from utils.formatters import format_key_display, get_action_display, format_target_process
 
         for key, action in self.mappings.items():
             display_action = get_action_display(action)
@@ -79,71 +153,638 @@ class KeyboardRemapper:
         if not self.process_monitor.get_active_window_process():
             print("⚠️  Не удалось определить активный процесс. Переназначение будет работать для всех окон.")
 
+        self._stop_requested.clear()
+
+        # В режиме asyncio таймеры и фоновые задачи сеанса выполняет один цикл
+        if self.settings_manager.get_setting('runtime') == 'asyncio':
+            self._runtime = AsyncRuntime()
+            self._attach_scheduler(self._runtime)
+
         # Запускаем мониторинг процессов
         self.process_monitor.start_monitoring()
 
         current_profile = self.config_manager.get_current_profile()
-        print(f"\n🎯 Переназначение работает ТОЛЬКО для процесса: {current_profile.target_process}")
+
+        # Разбираем действия один раз и готовим неизменяемые снимки профилей
+        self._auto_switch = auto_switch
+        self._snapshots = self._build_snapshots(auto_switch)
+        self._publish_snapshot(self._snapshots[self.config_manager.current_profile_name])
+
+        if auto_switch:
+            print("\n🔀 Автопереключение профилей по активному процессу включено")
+            for profile_name in self._snapshots:
+                profile = self.config_manager.profiles[profile_name]
+                print(f"  {format_target_process(profile.target_process)} → {profile_name}")
+            self._switch_profile_for_process(self.process_monitor.get_active_window_process())
+        else:
+            print(f"\n🎯 Переназначение работает ТОЛЬКО для процесса: {format_target_process(current_profile.target_process)}")
         print("💡 Переключитесь на окно с целевым процессом и нажимайте клавиши")
         print("⏹️  Для остановки нажмите Ctrl+C в этом окне")
 
-        # Регистрируем горячие клавиши
-        hotkeys = []
-        registered_count = 0
-
-        for key, action in self.mappings.items():
-            def make_handler(a, k):
-                def handler():
-                    # Проверяем, активен ли целевой процесс
-                    current_profile = self.config_manager.get_current_profile()
-                    if not self.process_monitor.is_target_process_active(current_profile.target_process, use_cache=True):
-                        # Если процесс не активен, отправляем оригинальную клавишу
-                        try:
-                            keyboard.send(k)
-                        except:
-                            pass
-                        return
-
-                    # Выполняем действие
-                    try:
-                        self.action_executor.execute_action(a)
-                    except Exception as e:
-                        print(f"\n⚠️  Ошибка при выполнении действия для {k}: {e}")
-
-                return handler
-
-            handler = make_handler(action, key)
-            try:
-                hotkey = keyboard.add_hotkey(key, handler, suppress=True)
-                hotkeys.append(hotkey)
-                registered_count += 1
-
-                from utils.formatters import format_key_display
-                print(f"✅ Зарегистрировано: {format_key_display(key)}")
-            except Exception as e:
-                from utils.formatters import format_key_display
-                print(f"⚠️  Не удалось зарегистрировать {format_key_display(key)}: {e}")
-
-        if registered_count == 0:
+        # Все назначения и последовательности обслуживает один хук бэкенда
+        self._dispatcher = HookDispatcher(self.backend)
+        self.action_executor.modifier_guard = self._dispatcher.released_modifiers
+        self._dispatcher.sequences.timeout = self.settings_manager.get_setting('sequence_timeout')
+        self._dispatcher.sequences.guard = self._is_sequence_target_active
+        self._dispatcher.select_sequences(self._snapshot.dispatch)
+        if self._runtime is not None:
+            self._dispatcher.sequences.scheduler = self._runtime
+
+        # Действия выполняются в отдельном потоке, хук только ставит их в очередь
+        self._action_queue = ActionQueue(
+            maxsize=self.settings_manager.get_setting('action_queue_size'),
+            overflow_policy=self.settings_manager.get_setting('queue_overflow_policy'),
+            on_complete=self._record_action_latency
+        )
+        self.latency_tracker.enabled = bool(self.settings_manager.get_setting('latency_tracking'))
+        self._apply_runtime_settings()
+
+        # Регистрируем горячие клавиши (объединение клавиш всех участвующих профилей)
+        self._registered_keys = {}
+        self._sequence_prefixes = self._collect_sequence_prefixes(self._snapshots)
+        self._native_keys = self._collect_native_keys(self._snapshots)
+        if self.settings_manager.get_setting('native_remaps') and not self.process_monitor.is_push:
+            print("⚠️  Смена окна отслеживается опросом: прямые переназначения клавиш отключены")
+        self._key_kinds = {key: self._registration_kind(key) for key in self._collect_keys(self._snapshots)}
+        for key in self._key_kinds:
+            self._register_key(key)
+
+        # Смена активного процесса переключает профиль и прямые переназначения. Обработчик
+        # получает события через очередь шины, чтобы не задерживать поток источника окна
+        self._focus_subscription = self.event_bus.subscribe(Topic.FOCUS_CHANGED, self._on_focus_changed,
+                                                            queued=True)
+        self._sync_native_remaps()
+
+        self._sync_hotstrings()
+
+        if not self._registered_keys and not self._native_remaps and self._hotstrings is None:
             print("\n❌ Не удалось зарегистрировать ни одной клавиши!")
+            self.event_bus.unsubscribe(self._focus_subscription)
             self.process_monitor.stop_monitoring()
+            self.event_bus.flush()
+            if self._ledger_hook is not None:
+                self.backend.unhook(self._ledger_hook)
+                self._ledger_hook = None
+            self.action_executor.modifier_guard = None
+            self._attach_scheduler(None)
+            self._runtime = None
             return
 
+        self._action_queue.start()
+        if self._dispatcher.has_entries:
+            self._dispatcher.start()
+        self.is_active = True
+
         print("\n🎯 Переназначение активно!")
+        if self._runtime is not None:
+            print("⚙️  Среда выполнения сеанса: цикл asyncio")
+        if self.settings_manager.get_setting('live_reload'):
+            print("🔄 Изменения файла конфигурации применяются без перезапуска")
 
         try:
-            keyboard.wait()
+            self._wait_for_stop()
         except KeyboardInterrupt:
             print("\n🛑 Остановка...")
         finally:
+            self.is_active = False
+            self.event_bus.unsubscribe(self._focus_subscription)
             self.process_monitor.stop_monitoring()
-            for hotkey in hotkeys:
-                try:
-                    keyboard.remove_hotkey(hotkey)
-                except:
-                    pass
+            # Уже поставленные в очередь смены окна обрабатываются до снятия переназначений
+            self.event_bus.flush()
+            self._native_keys = set()
+            self._sync_native_remaps()
+            self._dispatcher.stop()
+            if self._ledger_hook is not None:
+                self.backend.unhook(self._ledger_hook)
+                self._ledger_hook = None
+            if self._hotstrings is not None:
+                self._hotstrings.stop()
+                self._hotstrings = None
+            for key in list(self._registered_keys):
+                self._unregister_key(key)
+            self._key_kinds = {}
+            if not self._action_queue.stop():
+                print("⚠️  Действие не завершилось за время остановки и продолжает выполняться")
+            self.action_executor.text_injector.clipboard_session.flush()
+            self.action_executor.modifier_guard = None
+            self._dispatcher = None
+            if self._action_queue.dropped_count:
+                print(f"⚠️  Отброшено действий из-за переполнения очереди: {self._action_queue.dropped_count}")
+            self._snapshots = {}
+            self._attach_scheduler(None)
+            self._runtime = None
+            self._save_learned_settings()
             print("✅ Переназначение остановлено")
 
+    def _apply_runtime_settings(self) -> None:
+        """Применяет настройки вставки текста, задержек и проверки процессов."""
+        self._configure_injector()
+        self._configure_calibrator()
+        self.process_monitor.configure(self.settings_manager.get_setting('process_check_frequency'))
+
+    def _configure_injector(self) -> None:
+        """Передает пороги и задержки вставки текста из настроек."""
+        settings = self.settings_manager
+        self.action_executor.text_injector.configure(
+            mode=settings.get_setting('injection_mode'),
+            direct_type_max_ascii=settings.get_setting('direct_type_max_ascii'),
+            learned_ascii=settings.get_setting('direct_type_learned_ascii'),
+            direct_type_max_glyphs=settings.get_setting('direct_type_max_glyphs'),
+            adaptive=settings.get_setting('adaptive_injection'),
+            clipboard_restore_delay=settings.get_setting('clipboard_restore_delay'),
+            typing_delay=settings.get_setting('typing_delay'),
+            clipboard_timeout=settings.get_setting('clipboard_timeout'),
+            typing_chunk_size=settings.get_setting('typing_chunk_size'),
+            typing_rate_limit=settings.get_setting('typing_rate_limit')
+        )
+
+    def _configure_calibrator(self) -> None:
+        """Передает сеансу буфера обмена калибровку пауз вставки по процессам."""
+        settings = self.settings_manager
+        session = self.action_executor.text_injector.clipboard_session
+        session.calibrator = PasteSettleCalibrator(
+            delays=settings.get_setting('paste_settle_delays'),
+            calibrating=bool(settings.get_setting('auto_calibrate_paste'))
+        )
+        session.foreground = self.process_monitor.get_active_window_process
+
+    def _on_setting_changed(self, event: Event) -> None:
+        """Применяет измененную настройку к работающему сеансу без перезапуска."""
+        if not self.is_active:
+            return
+
+        key, value = event['key'], event['value']
+        if key in _INJECTOR_SETTINGS:
+            self._configure_injector()
+        elif key == 'auto_calibrate_paste':
+            self.action_executor.text_injector.clipboard_session.calibrator.calibrating = bool(value)
+        elif key == 'paste_settle_delays':
+            # Автосохранение пишет те же паузы, сброс из диалога начинает калибровку заново
+            if value != self.action_executor.text_injector.clipboard_session.calibrator.delays:
+                self._configure_calibrator()
+        elif key == 'process_check_frequency':
+            self.process_monitor.configure(value)
+        elif key == 'latency_tracking':
+            self.latency_tracker.enabled = bool(value)
+        elif key == 'sequence_timeout' and self._dispatcher is not None:
+            self._dispatcher.sequences.timeout = value
+
+    def _save_learned_settings(self) -> None:
+        """Сохраняет выученный порог прямого ввода и паузы вставки для следующих запусков.
+
+        Порог пишется в отдельную настройку и не заменяет заданный пользователем.
+        """
+        injector = self.action_executor.text_injector
+        threshold = injector.learned_threshold
+        if threshold is not None and threshold != self.settings_manager.get_setting('direct_type_learned_ascii'):
+            self.settings_manager.set_setting('direct_type_learned_ascii', threshold)
+            print(f"📝 Выученный порог прямого ввода текста: {threshold} симв.")
+
+        calibrator = injector.clipboard_session.calibrator
+        if calibrator is not None and calibrator.changed:
+            calibrator.changed = False
+            self.settings_manager.set_setting('paste_settle_delays', dict(calibrator.delays))
+            print(f"📝 Откалиброваны паузы вставки: {len(calibrator.delays)} процесс(ов)")
+
+    def _make_key_handler(self, key: str) -> Callable[[], Optional[bool]]:
+        """Создает обработчик клавиши, читающий только опубликованный снимок.
+
+        Обработчик решает до подавления: истинный результат пропускает
+        исходное событие дальше нетронутым, поэтому вне целевого процесса
+        клавиша не подавляется и не отправляется повторно.
+        """
+        tracker = self.latency_tracker
+
+        def handler():
+            started_ns = perf_counter_ns()
+            snapshot = self._snapshot
+            action = snapshot.dispatch.get(key)
+
+            # Проверяем, активен ли целевой процесс
+            is_target = action is not None and \
+                self.process_monitor.is_target_process_active(snapshot.matcher, use_cache=True)
+            if action is not None:
+                tracker.record('process_check', perf_counter_ns() - started_ns, key=key)
+
+            if not is_target:
+                # Событие еще не подавлено - просто пропускаем его дальше
+                return True
+
+            # Передаем скомпилированное действие рабочему потоку
+            self._action_queue.submit(key, action, started_ns)
+            tracker.record('hook', perf_counter_ns() - started_ns, key=key, action_type=action.action_type.value)
+
+        return handler
+
+    def _make_hotkey_handler(self, key: str) -> Callable[[], Optional[bool]]:
+        """Обработчик для add_hotkey: свои синтетические события пропускаются без действия."""
+        handler = self._make_key_handler(key)
+        ledger = self.backend.ledger
+
+        def hotkey_handler():
+            if ledger is not None and ledger.last_injected:
+                return True
+            return handler()
+
+        return hotkey_handler
+
+    def _on_hotstring(self, abbreviation: str) -> bool:
+        """Обработчик распознанного сокращения. Возвращает True, если сокращение обработано."""
+        started_ns = perf_counter_ns()
+        snapshot = self._snapshot
+        action = snapshot.hotstrings.get(abbreviation)
+        if action is None or not self.process_monitor.is_target_process_active(snapshot.matcher, use_cache=True):
+            return False
+
+        self._action_queue.submit(abbreviation, action, started_ns)
+        self.latency_tracker.record('hook', perf_counter_ns() - started_ns,
+                                    key=abbreviation, action_type=action.action_type.value)
+        return True
+
+    def _sync_hotstrings(self) -> None:
+        """Запускает, обновляет или останавливает распознавание сокращений по снимкам."""
+        if not any(snapshot.hotstrings for snapshot in self._snapshots.values()):
+            if self._hotstrings is not None:
+                self._hotstrings.stop()
+                self._hotstrings = None
+            return
+
+        if self._hotstrings is None:
+            self._hotstrings = HotstringEngine(self.backend, self._on_hotstring)
+            self._hotstrings.update(self._snapshot.hotstrings)
+            self._hotstrings.start()
+            print(f"⌨️  Сокращений: {len(self._snapshot.hotstrings)}")
+        else:
+            self._hotstrings.update(self._snapshot.hotstrings)
+
+    def _record_action_latency(self, key: str, action: CompiledAction, enqueued_ns: int,
+                               started_ns: int, finished_ns: int) -> None:
+        """Записывает задержки этапов и сообщает в шину о действии, выполненном рабочим потоком."""
+        action_type = action.action_type.value
+        self.latency_tracker.record('queue_wait', started_ns - enqueued_ns, key=key, action_type=action_type)
+        self.latency_tracker.record('execute', finished_ns - started_ns, key=key, action_type=action_type)
+        self.latency_tracker.record('end_to_end', finished_ns - enqueued_ns, key=key, action_type=action_type)
+        self.event_bus.publish(Topic.ACTION_EXECUTED, key=key, action_type=action_type,
+                               duration_ns=finished_ns - started_ns)
+
+    def _registration_kind(self, key: str) -> str:
+        """Способ регистрации клавиши при текущих последовательностях и прямых переназначениях."""
+        if key in self._native_keys:
+            return KIND_NATIVE
+        # Последовательности и комбинации, с которых они начинаются, обслуживает автомат хука
+        combo = parse_key_combo(key)
+        if is_key_sequence(key) or combo in self._sequence_prefixes:
+            return KIND_SEQUENCE
+        return KIND_HOOK
+
+    def _register_key(self, key: str) -> bool:
+        """Регистрирует обработчик одной клавиши способом из _key_kinds."""
+        from utils.formatters import format_key_display
+
+        kind = self._key_kinds.get(key, KIND_HOOK)
+        if kind == KIND_NATIVE:
+            # Переназначение включает _sync_native_remaps, пока активен целевой процесс
+            print(f"⚡ Прямое переназначение: {format_key_display(key)}")
+            return True
+
+        if kind == KIND_SEQUENCE:
+            if self._dispatcher.add_sequence(key, self._make_key_handler(key)):
+                self._registered_keys[key] = None
+                print(f"✅ Зарегистрировано: {format_key_display(key)}")
+                return True
+            print(f"⚠️  Не удалось зарегистрировать {format_key_display(key)}: неизвестная клавиша")
+            return False
+
+        if self._dispatcher.add_mapping(key, self._make_key_handler(key)):
+            self._registered_keys[key] = None
+            print(f"✅ Зарегистрировано: {format_key_display(key)}")
+            return True
+
+        # keyboard 0.13.5 подавляет задержанные модификаторы сработавшей горячей клавиши
+        # независимо от результата обработчика, поэтому комбинация через add_hotkey дошла
+        # бы до приложения вне целевого процесса без модификаторов
+        combo = parse_key_combo(key)
+        if combo is not None and combo[0]:
+            print(f"⚠️  Не удалось зарегистрировать {format_key_display(key)}: неизвестная клавиша")
+            return False
+
+        if self._ledger_hook is None and self.backend.ledger is not None:
+            # Горячие клавиши узнают о своих же событиях из хука журнала
+            self._ledger_hook = self.backend.hook(self.backend.ledger.on_event, suppress=True)
+        try:
+            self._registered_keys[key] = self.backend.add_hotkey(key, self._make_hotkey_handler(key), suppress=True)
+            print(f"✅ Зарегистрировано: {format_key_display(key)}")
+            return True
+        except Exception as e:
+            print(f"⚠️  Не удалось зарегистрировать {format_key_display(key)}: {e}")
+            return False
+
+    def _unregister_key(self, key: str) -> None:
+        """Снимает обработчик одной клавиши."""
+        if key not in self._registered_keys:
+            return
+
+        hotkey = self._registered_keys.pop(key)
+        if hotkey is None:
+            if self._dispatcher is not None:
+                self._dispatcher.remove_mapping(key)
+                self._dispatcher.remove_sequence(key)
+            return
+
+        try:
+            self.backend.remove_hotkey(hotkey)
+        except:
+            pass
+
+    @staticmethod
+    def _collect_keys(snapshots: Dict[str, RuntimeSnapshot]) -> List[str]:
+        """Объединение клавиш всех снимков с сохранением порядка."""
+        keys = {}
+        for snapshot in snapshots.values():
+            for key in snapshot.dispatch:
+                keys[key] = None
+        return list(keys)
+
+    @staticmethod
+    def _collect_sequence_prefixes(snapshots: Dict[str, RuntimeSnapshot]) -> set:
+        """Первые шаги всех последовательностей в виде (маска, основная клавиша)."""
+        prefixes = set()
+        for snapshot in snapshots.values():
+            for key in snapshot.dispatch:
+                if is_key_sequence(key):
+                    prefixes.add(parse_key_combo(split_key_sequence(key)[0]))
+        prefixes.discard(None)
+        return prefixes
+
+    def _collect_native_keys(self, snapshots: Dict[str, RuntimeSnapshot]) -> set:
+        """Клавиши, которые во всех снимках переназначены на одну клавишу или комбинацию."""
+        if not self.settings_manager.get_setting('native_remaps'):
+            return set()
+        # Переназначение библиотеки работает во всех окнах и выключается только по смене
+        # окна: при опросе оно оставалось бы активным в чужом окне до следующей проверки
+        if not self.process_monitor.is_push:
+            return set()
+
+        native, hooked = set(), set()
+        for snapshot in snapshots.values():
+            for key, action in snapshot.dispatch.items():
+                if self._is_native_remap(key, action):
+                    native.add(key)
+                else:
+                    hooked.add(key)
+        return native - hooked
+
+    def _is_native_remap(self, key: str, action: CompiledAction) -> bool:
+        """Можно ли отдать назначение встроенному переназначению библиотеки."""
+        return action.action_type == ActionType.KEY_COMBO and \
+            not is_key_sequence(key) and not is_key_sequence(action.action) and \
+            validate_key(key) is not None and validate_key(action.action) is not None and \
+            parse_key_combo(key) not in self._sequence_prefixes
+
+    def _sync_native_remaps(self) -> None:
+        """Включает прямые переназначения активного профиля, только пока активен его процесс.
+
+        Встроенное переназначение библиотеки не проверяет процесс, поэтому
+        условие по целевому процессу выполняется включением и выключением
+        переназначений при смене активного окна.
+        """
+        with self._native_lock:
+            snapshot = self._snapshot
+            desired = {}
+            if self._native_keys and snapshot is not None and \
+                    self.process_monitor.is_target_process_active(snapshot.matcher, use_cache=False):
+                for key in self._native_keys:
+                    action = snapshot.dispatch.get(key)
+                    if action is not None:
+                        desired[key] = action.action
+
+            for key, (target, handle) in list(self._native_remaps.items()):
+                if desired.get(key) != target:
+                    del self._native_remaps[key]
+                    try:
+                        self.backend.unremap_hotkey(handle)
+                    except (KeyError, ValueError):
+                        pass
+
+            for key, target in desired.items():
+                if key not in self._native_remaps:
+                    try:
+                        self._native_remaps[key] = (target, self.backend.remap_hotkey(key, target))
+                    except Exception as e:
+                        print(f"⚠️  Не удалось переназначить {key} → {target}: {e}")
+
+    def stop_remapping(self) -> None:
+        """Завершает сеанс переназначения из другого потока."""
+        runtime = self._runtime
+        if runtime is not None:
+            runtime.stop()
+        else:
+            self._stop_requested.set()
+
+    def _attach_scheduler(self, scheduler: Optional[Scheduler]) -> None:
+        """Передает планировщик таймеров компонентам сеанса (None - таймеры в потоках)."""
+        self.action_executor.text_injector.clipboard_session.scheduler = scheduler or DEFAULT_SCHEDULER
+        self.process_monitor.scheduler = scheduler
+
+    def _on_focus_changed(self, event: Event) -> None:
+        """FOCUS_CHANGED: в режиме asyncio обработка передается в цикл сеанса."""
+        runtime = self._runtime
+        if runtime is None or not runtime.call_soon(self._on_process_change, event):
+            self._on_process_change(event)
+
+    def _on_process_change(self, event: Event) -> None:
+        """Смена активного процесса: профиль и прямые переназначения (поток источника или цикл сеанса)."""
+        if self._auto_switch:
+            self._switch_profile_for_process(event['process_name'])
+        self._sync_native_remaps()
+
+    def _is_sequence_target_active(self) -> bool:
+        """Можно ли начинать последовательность в активном окне."""
+        return self.process_monitor.is_target_process_active(self._snapshot.matcher, use_cache=True)
+
+    def update_mappings(self, mappings: Dict[str, str]) -> Dict[str, List[str]]:
+        """Заменяет назначения текущего профиля и применяет их к работающему переназначению."""
+        self.mappings = dict(mappings)
+        return self.reload_mappings()
+
+    def reload_mappings(self) -> Dict[str, List[str]]:
+        """Применяет изменения назначений на лету.
+
+        Для каждой клавиши старого и нового набора считается способ
+        регистрации (таблица хука, автомат последовательностей, прямое
+        переназначение). Снимаются удаленные
+        клавиши, регистрируются добавленные, а клавиши, у которых сменился
+        способ, регистрируются заново. Для остальных измененных назначений
+        достаточно опубликовать новый снимок.
+        """
+        if not self.is_active:
+            return {'added': [], 'removed': [], 'changed': []}
+
+        from utils.formatters import format_key_display, get_action_display
+
+        old_snapshots = self._snapshots
+        old_kinds = self._key_kinds
+        new_snapshots = self._build_snapshots(self._auto_switch)
+        self._sequence_prefixes = self._collect_sequence_prefixes(new_snapshots)
+        self._native_keys = self._collect_native_keys(new_snapshots)
+        new_kinds = {key: self._registration_kind(key) for key in self._collect_keys(new_snapshots)}
+
+        added = [key for key in new_kinds if key not in old_kinds]
+        removed = [key for key in old_kinds if key not in new_kinds]
+        rekinded = [key for key in new_kinds if key in old_kinds and old_kinds[key] != new_kinds[key]]
+        changed = []
+        for profile_name, snapshot in new_snapshots.items():
+            old_snapshot = old_snapshots.get(profile_name)
+            if old_snapshot is None:
+                continue
+            for key, action in snapshot.dispatch.items():
+                old_action = old_snapshot.dispatch.get(key)
+                if old_action is not None and old_action.action != action.action and key not in changed:
+                    changed.append(key)
+
+        # Сначала публикуем новый снимок, затем меняем только отличающиеся регистрации
+        self._snapshots = new_snapshots
+        self._key_kinds = new_kinds
+        active_name = self.get_active_profile_name()
+        if active_name not in new_snapshots:
+            active_name = self.config_manager.current_profile_name
+        self._publish_snapshot(new_snapshots[active_name])
+
+        self._sync_hotstrings()
+
+        for key in removed:
+            self._unregister_key(key)
+            print(f"➖ Снято: {format_key_display(key)}")
+        for key in rekinded:
+            self._unregister_key(key)
+        for key in added + rekinded:
+            self._register_key(key)
+        if self._dispatcher.has_entries:
+            self._dispatcher.start()
+        for key in changed:
+            action = self._snapshot.dispatch.get(key)
+            if action is not None:
+                print(f"✏️  Обновлено: {format_key_display(key)} → {get_action_display(action.action)}")
+
+        if added or removed or changed or rekinded:
+            print(f"🔄 Назначения обновлены: +{len(added)} -{len(removed)} ~{len(changed)}")
+            self.event_bus.publish(Topic.MAPPING_CHANGED, added=added, removed=removed, changed=changed)
+
+        return {'added': added, 'removed': removed, 'changed': changed}
+
+    def _wait_for_stop(self) -> None:
+        """Ожидает остановки, отслеживая изменения файла конфигурации."""
+        live_reload = self.settings_manager.get_setting('live_reload')
+        self._config_mtime = self._get_config_mtime()
+        self._config_pending = False
+
+        if self._runtime is not None:
+            # Отслеживание конфигурации и автосохранение - задачи цикла сеанса
+            if live_reload:
+                self._runtime.add_periodic('ConfigWatch', CONFIG_WATCH_INTERVAL, self._check_config_changed)
+            self._runtime.add_periodic('Autosave', AUTOSAVE_INTERVAL, self._save_learned_settings, blocking=True)
+            self._runtime.run()
+            return
+
+        # Ожидание с периодом, а не бесконечное: так Ctrl+C прерывает его и в Windows
+        while not self._stop_requested.wait(CONFIG_WATCH_INTERVAL):
+            if live_reload:
+                self._check_config_changed()
+
+    def _check_config_changed(self) -> None:
+        """Применяет назначения, когда файл конфигурации изменился и перестал меняться.
+
+        Изменение применяется на следующей проверке, если время изменения
+        файла за период не сдвинулось: запись по частям не читается
+        наполовину. Ошибочный файл не трогает назначения сеанса.
+        """
+        mtime = self._get_config_mtime()
+        if mtime != self._config_mtime:
+            self._config_mtime = mtime
+            self._config_pending = True
+            return
+        if not self._config_pending:
+            return
+
+        self._config_pending = False
+        print("\n📝 Файл конфигурации изменен, применяем назначения...")
+        if self.config_manager.reload_config():
+            self.mappings = self.config_manager.get_current_profile().mappings.copy()
+            self.reload_mappings()
+
+    @staticmethod
+    def _get_config_mtime() -> Optional[float]:
+        """Время изменения файла конфигурации."""
+        try:
+            return os.path.getmtime(CONFIG_FILE)
+        except OSError:
+            return None
+
+    def _build_snapshots(self, auto_switch: bool) -> Dict[str, RuntimeSnapshot]:
+        """Компилирует снимки текущего профиля (и остальных при автопереключении)."""
+        options = {
+            'auto_switch_profiles': auto_switch,
+        }
+
+        current_name = self.config_manager.current_profile_name
+        profiles_mappings = {current_name: self.mappings}
+        if auto_switch:
+            self.config_manager.build_process_index()
+            for profile_name, profile in self.config_manager.profiles.items():
+                if profile_name != current_name and (profile.mappings or profile.hotstrings):
+                    profiles_mappings[profile_name] = profile.mappings
+
+        executor = self.action_executor
+        snapshots = {}
+        for profile_name, mappings in profiles_mappings.items():
+            profile = self.config_manager.profiles[profile_name]
+            snapshots[profile_name] = RuntimeSnapshot.build(
+                profile_name=profile_name,
+                dispatch=executor.compile_mappings(mappings),
+                matcher=self.process_monitor.get_matcher(profile.target_process),
+                options=options,
+                hotstrings={
+                    abbreviation: executor.compile_hotstring(abbreviation, action)
+                    for abbreviation, action in profile.hotstrings.items()
+                }
+            )
+        return snapshots
+
+    def _publish_snapshot(self, snapshot: RuntimeSnapshot) -> None:
+        """Публикует снимок для обработчиков одной заменой ссылки."""
+        previous = self._snapshot
+        self._snapshot = snapshot
+        self.process_monitor.watch(snapshot.matcher)
+        if self._dispatcher is not None:
+            # Автомат последовательностей меняется вместе со снимком профиля
+            self._dispatcher.select_sequences(snapshot.dispatch)
+        if self._hotstrings is not None:
+            self._hotstrings.update(snapshot.hotstrings)
+        self._sync_native_remaps()
+
+        previous_name = previous.profile_name if previous is not None else None
+        if snapshot.profile_name != previous_name:
+            self.event_bus.publish(Topic.PROFILE_SWITCHED, profile_name=snapshot.profile_name,
+                                   previous=previous_name)
+
+    def _switch_profile_for_process(self, process_name: Optional[str]) -> None:
+        """Выбирает профиль для активного процесса без перерегистрации горячих клавиш."""
+        snapshots = self._snapshots
+        profile_name = self.config_manager.find_profile_for_process(process_name)
+        if profile_name is None or profile_name not in snapshots:
+            return
+
+        if profile_name != self._snapshot.profile_name:
+            self._publish_snapshot(snapshots[profile_name])
+            print(f"\n🔀 Активный профиль: {profile_name} ({process_name})")
+
+    def get_active_profile_name(self) -> str:
+        """Имя профиля, назначения которого сейчас обслуживаются."""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot.profile_name
+        return self.config_manager.current_profile_name
+
     def show_mappings(self) -> None:
         """Показать текущие назначения."""
         if not self.mappings:
@@ -0,0 +1,39 @@
+"""
+Неизменяемый снимок состояния для горячего пути обработки нажатий.
+"""
+
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
+
+from core.action_executor import CompiledAction
+from core.process_matcher import ProcessMatcher
+
+
+@dataclass(frozen=True)
+class RuntimeSnapshot:
+    """Снимок активного профиля: таблицы диспетчеризации, матчер процесса и опции.
+
+    Обработчики клавиш читают только текущий снимок, а смена профиля или
+    назначений публикует новый снимок одной заменой ссылки, поэтому
+    обработчик всегда видит согласованные таблицу, матчер и опции.
+    """
+
+    profile_name: str
+    dispatch: Mapping[str, CompiledAction]
+    matcher: ProcessMatcher
+    options: Mapping[str, Any]
+    hotstrings: Mapping[str, CompiledAction] = field(default_factory=lambda: MappingProxyType({}))
+
+    @classmethod
+    def build(cls, profile_name: str, dispatch: Dict[str, CompiledAction],
+              matcher: ProcessMatcher, options: Dict[str, Any],
+              hotstrings: Optional[Dict[str, CompiledAction]] = None) -> 'RuntimeSnapshot':
+        """Создает снимок из копий переданных словарей."""
+        return cls(
+            profile_name=profile_name,
+            dispatch=MappingProxyType(dict(dispatch)),
+            matcher=matcher,
+            options=MappingProxyType(dict(options)),
+            hotstrings=MappingProxyType(dict(hotstrings or {}))
+        )
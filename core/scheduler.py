@@ -0,0 +1,59 @@
+"""
+Планировщики отложенных вызовов: потоковые таймеры или цикл asyncio.
+"""
+
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional
+
+
+class TimerHandle(ABC):
+    """Отложенный вызов, который можно отменить."""
+
+    @abstractmethod
+    def cancel(self) -> None:
+        """Отменяет вызов, если он еще не выполнен."""
+
+
+# threading.Timer уже отвечает интерфейсу отменяемого вызова
+TimerHandle.register(threading.Timer)
+
+
+class Scheduler(ABC):
+    """Откладывает вызовы для таймаутов, восстановления буфера обмена и опроса.
+
+    Компоненты не создают таймеры сами, а получают планировщик: по
+    умолчанию каждый вызов ждет в своем потоке threading.Timer, а сеанс
+    asyncio подставляет свой цикл, где все таймеры обслуживает один поток.
+    Обратный вызов с отмененным или перезапущенным таймером должен сам
+    проверять, актуален ли он (отмена из другого потока может опоздать).
+    """
+
+    @abstractmethod
+    def call_later(self, delay: float, callback: Callable[..., Any], *args: Any,
+                   name: Optional[str] = None, daemon: bool = True,
+                   blocking: bool = False) -> TimerHandle:
+        """Вызывает callback(*args) через delay секунд.
+
+        blocking - вызов может надолго заблокировать поток (буфер обмена,
+        блокировки других потоков) и не должен выполняться в цикле сеанса.
+        """
+
+
+class ThreadScheduler(Scheduler):
+    """Планировщик на threading.Timer: поток на каждый ожидающий вызов."""
+
+    def call_later(self, delay: float, callback: Callable[..., Any], *args: Any,
+                   name: Optional[str] = None, daemon: bool = True,
+                   blocking: bool = False) -> TimerHandle:
+        # Каждый вызов и так ждет в своем потоке
+        timer = threading.Timer(delay, callback, args=args)
+        if name is not None:
+            timer.name = name
+        timer.daemon = daemon
+        timer.start()
+        return timer
+
+
+# Планировщик по умолчанию (без состояния, общий для всех компонентов)
+DEFAULT_SCHEDULER = ThreadScheduler()
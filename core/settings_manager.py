@@ -7,15 +7,21 @@ import os
 from typing import Dict, Any, Optional
 from pathlib import Path
 
+from core.event_bus import EventBus, Topic
 from models.settings import AppSettings
 
 
 class SettingsManager:
-    """Управление настройками приложения."""
+    """Управление настройками приложения.
 
-    def __init__(self):
+    Изменение настройки публикуется в шину событий (SETTING_CHANGED),
+    чтобы работающие компоненты применили его без перезапуска.
+    """
+
+    def __init__(self, event_bus: Optional[EventBus] = None):
         self.settings_file = Path("app_settings.json")
         self.settings = AppSettings()
+        self.event_bus = event_bus
         self.load_settings()
 
     def load_settings(self) -> bool:
@@ -55,14 +61,28 @@ class SettingsManager:
     def set_setting(self, key: str, value: Any) -> bool:
         """Устанавливает значение настройки."""
         if hasattr(self.settings, key):
+            old_value = getattr(self.settings, key)
             setattr(self.settings, key, value)
-            return self.save_settings()
+            saved = self.save_settings()
+            if old_value != value:
+                self._publish_change(key, value, old_value)
+            return saved
         return False
 
     def reset_settings(self) -> bool:
         """Сбрасывает настройки к значениям по умолчанию."""
+        old_settings = dict(self.settings.to_dict())
         self.settings = AppSettings()
-        return self.save_settings()
+        saved = self.save_settings()
+        for key, value in self.settings.to_dict().items():
+            if old_settings.get(key) != value:
+                self._publish_change(key, value, old_settings.get(key))
+        return saved
+
+    def _publish_change(self, key: str, value: Any, old_value: Any) -> None:
+        """Сообщает об изменении настройки подписчикам шины."""
+        if self.event_bus is not None:
+            self.event_bus.publish(Topic.SETTING_CHANGED, key=key, value=value, old_value=old_value)
 
     def get_all_settings(self) -> Dict[str, Any]:
         """Возвращает все настройки."""
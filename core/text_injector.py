@@ -0,0 +1,161 @@
+"""
+Адаптивная вставка текста: прямой ввод или вставка через буфер обмена.
+"""
+
+import unicodedata
+from time import perf_counter_ns
+from typing import Any, Dict, Optional
+
+from core.clipboard_session import ClipboardSession
+from core.input_backend import InputBackend
+from core.typing_engine import TypingEngine
+
+INJECTION_MODES = ('auto', 'paste', 'type')
+
+# Порог прямого ввода ASCII, пока он не задан пользователем и не выучен
+DEFAULT_DIRECT_TYPE_MAX_ASCII = 32
+
+# Верхняя граница выученного порога прямого ввода ASCII
+DIRECT_TYPE_HARD_LIMIT = 64
+
+# Коэффициент сглаживания и минимальное число замеров для обучения
+EWMA_ALPHA = 0.2
+LEARN_MIN_SAMPLES = 5
+
+
+class TextInjector:
+    """Выбирает самый дешевый способ вставки для каждого текста.
+
+    Один символ (например '°') и короткий однострочный ASCII-текст
+    печатаются напрямую, длинный, многострочный и кириллический текст
+    вставляется через буфер обмена. Пороги задаются настройками. Если
+    порог для ASCII не задан пользователем, в адаптивном режиме он
+    пересчитывается по скользящим средним стоимости вставки и стоимости
+    ввода одного символа, а до набора замеров берется выученный в
+    прошлых запусках (learned_ascii).
+    """
+
+    def __init__(self, backend: InputBackend):
+        self.backend = backend
+        self.clipboard_session = ClipboardSession(backend)
+        self.typing_engine = TypingEngine(backend)
+        self.mode = 'auto'
+        self.direct_type_max_ascii: Optional[int] = None
+        self.learned_ascii = 0
+        self.direct_type_max_glyphs = 1
+        self.adaptive = True
+
+        # Скользящие средние: стоимость вставки целиком и ввода одного символа (нс)
+        self._paste_cost_ns: Optional[float] = None
+        self._type_char_cost_ns: Optional[float] = None
+        self._paste_samples = 0
+        self._type_samples = 0
+
+    def configure(self, mode: str = 'auto', direct_type_max_ascii: Optional[int] = None,
+                  learned_ascii: int = 0, direct_type_max_glyphs: int = 1, adaptive: bool = True,
+                  clipboard_restore_delay: float = 0.5, typing_delay: float = 0.0,
+                  clipboard_timeout: float = 0.05, typing_chunk_size: int = 32,
+                  typing_rate_limit: float = 0) -> None:
+        """Применяет пороги из настроек."""
+        self.mode = mode if mode in INJECTION_MODES else 'auto'
+        self.direct_type_max_ascii = max(0, int(direct_type_max_ascii)) \
+            if direct_type_max_ascii is not None else None
+        self.learned_ascii = max(0, min(int(learned_ascii or 0), DIRECT_TYPE_HARD_LIMIT))
+        self.direct_type_max_glyphs = max(0, int(direct_type_max_glyphs))
+        self.adaptive = bool(adaptive)
+        self.typing_engine.configure(chunk_size=typing_chunk_size, rate_limit=typing_rate_limit,
+                                     chunk_delay=typing_delay)
+        self.clipboard_session.restore_delay = max(0.0, float(clipboard_restore_delay))
+        self.clipboard_session.settle_delay = max(0.0, float(clipboard_timeout))
+
+    @property
+    def learned_threshold(self) -> Optional[int]:
+        """Порог, выученный в этом запуске, или None, пока замеров недостаточно."""
+        if self.adaptive and self._paste_samples >= LEARN_MIN_SAMPLES \
+                and self._type_samples >= LEARN_MIN_SAMPLES and self._type_char_cost_ns:
+            learned = int(self._paste_cost_ns / self._type_char_cost_ns)
+            return max(1, min(learned, DIRECT_TYPE_HARD_LIMIT))
+        return None
+
+    @property
+    def ascii_threshold(self) -> int:
+        """Действующий порог прямого ввода ASCII: заданный пользователем, выученный или по умолчанию."""
+        if self.direct_type_max_ascii is not None:
+            return self.direct_type_max_ascii
+        learned = self.learned_threshold
+        if learned is not None:
+            return learned
+        if self.adaptive and self.learned_ascii:
+            return self.learned_ascii
+        return DEFAULT_DIRECT_TYPE_MAX_ASCII
+
+    def choose_method(self, text: str) -> str:
+        """Возвращает 'type' или 'paste' для текста."""
+        if self.mode == 'type' or not self.backend.clipboard_available:
+            return 'type'
+        if self.mode == 'paste':
+            return 'paste'
+
+        glyphs = unicodedata.normalize('NFC', text)
+        if len(glyphs) <= self.direct_type_max_glyphs and '\n' not in glyphs:
+            return 'type'
+        if '\n' not in text and text.isascii() and text.isprintable() \
+                and len(text) <= self.ascii_threshold:
+            return 'type'
+        return 'paste'
+
+    def inject(self, text: str) -> str:
+        """Вставляет текст выбранным способом и возвращает его название."""
+        if not text:
+            return 'type'
+
+        method = self.choose_method(text)
+        started_ns = perf_counter_ns()
+        if method == 'paste':
+            try:
+                self._paste(text)
+            except Exception:
+                # Буфер обмена занят другим приложением или недоступен - печатаем напрямую
+                method = 'type'
+                started_ns = perf_counter_ns()
+                self._type(text)
+        else:
+            self._type(text)
+
+        self._learn(method, len(text), perf_counter_ns() - started_ns)
+        return method
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Выученные оценки стоимости способов вставки."""
+        return {
+            'paste_cost_ns': int(self._paste_cost_ns or 0),
+            'type_char_cost_ns': int(self._type_char_cost_ns or 0),
+            'paste_samples': self._paste_samples,
+            'type_samples': self._type_samples,
+            'ascii_threshold': self.ascii_threshold,
+            **self.clipboard_session.get_stats(),
+            'typing': self.typing_engine.get_stats(),
+        }
+
+    def _paste(self, text: str) -> None:
+        """Вставка через буфер обмена; исходное содержимое восстанавливает сеанс."""
+        self.clipboard_session.paste(text)
+
+    def _type(self, text: str) -> None:
+        """Прямой ввод текста порциями."""
+        self.typing_engine.type_text(text)
+
+    def _learn(self, method: str, length: int, elapsed_ns: int) -> None:
+        """Обновляет скользящие средние стоимости способов вставки."""
+        if method == 'paste':
+            self._paste_cost_ns = self._ewma(self._paste_cost_ns, elapsed_ns)
+            self._paste_samples += 1
+        elif length:
+            self._type_char_cost_ns = self._ewma(self._type_char_cost_ns, elapsed_ns / length)
+            self._type_samples += 1
+
+    @staticmethod
+    def _ewma(current: Optional[float], value: float) -> float:
+        if current is None:
+            return float(value)
+        return current + EWMA_ALPHA * (value - current)
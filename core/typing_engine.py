@@ -0,0 +1,111 @@
+"""
+Потоковый ввод текста порциями с ограничением скорости.
+"""
+
+import threading
+import time
+from typing import Any, Dict
+
+from core.input_backend import InputBackend
+
+
+class TokenBucket:
+    """Ограничитель скорости: rate токенов в секунду, не больше capacity за раз.
+
+    При rate <= 0 ограничения нет.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+
+    def acquire(self, count: int) -> float:
+        """Забирает count токенов, при нехватке ждет. Возвращает время ожидания."""
+        if self.rate <= 0:
+            return 0.0
+
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+        self._tokens -= count
+        if self._tokens >= 0:
+            return 0.0
+
+        wait = -self._tokens / self.rate
+        time.sleep(wait)
+        return wait
+
+
+class TypingEngine:
+    """Печатает текст порциями по chunk_size символов без фиксированных пауз.
+
+    Перевод строки отправляется как Enter сразу, без ожидания. Скорость
+    ограничивается корзиной токенов (rate_limit символов в секунду, 0 -
+    без ограничения), между порциями текста выдерживается chunk_delay,
+    чтобы целевое окно успевало обрабатывать ввод. Пропускная способность
+    в символах в секунду накапливается в статистике.
+    """
+
+    def __init__(self, backend: InputBackend, chunk_size: int = 32,
+                 rate_limit: float = 0, chunk_delay: float = 0.0):
+        self.backend = backend
+        self.chunk_size = max(1, chunk_size)
+        self.chunk_delay = chunk_delay
+        self._bucket = TokenBucket(rate_limit, self.chunk_size)
+        self._lock = threading.Lock()
+
+        self.total_chars = 0
+        self.total_seconds = 0.0
+        self.last_chars_per_second = 0.0
+
+    def configure(self, chunk_size: int = 32, rate_limit: float = 0, chunk_delay: float = 0.0) -> None:
+        """Применяет размер порции, ограничение скорости и паузу между порциями."""
+        self.chunk_size = max(1, int(chunk_size))
+        self.chunk_delay = max(0.0, float(chunk_delay))
+        self._bucket = TokenBucket(float(rate_limit), self.chunk_size)
+
+    def type_text(self, text: str) -> float:
+        """Печатает текст и возвращает скорость ввода в символах в секунду."""
+        if not text:
+            return 0.0
+
+        with self._lock:
+            started = time.perf_counter()
+            wrote_chunk = False
+            for chunk in self._iter_chunks(text):
+                self._bucket.acquire(len(chunk))
+                if chunk == '\n':
+                    self.backend.send('enter')
+                    continue
+
+                if wrote_chunk and self.chunk_delay:
+                    time.sleep(self.chunk_delay)
+                self.backend.write(chunk)
+                wrote_chunk = True
+
+            elapsed = time.perf_counter() - started
+            self.total_chars += len(text)
+            self.total_seconds += elapsed
+            self.last_chars_per_second = len(text) / elapsed if elapsed > 0 else 0.0
+            return self.last_chars_per_second
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Накопленная статистика ввода."""
+        return {
+            'chars': self.total_chars,
+            'seconds': self.total_seconds,
+            'chars_per_second': self.total_chars / self.total_seconds if self.total_seconds > 0 else 0.0,
+            'last_chars_per_second': self.last_chars_per_second,
+        }
+
+    def _iter_chunks(self, text: str):
+        """Делит текст на порции не длиннее chunk_size; перевод строки - отдельная порция."""
+        size = self.chunk_size
+        for index, line in enumerate(text.split('\n')):
+            if index:
+                yield '\n'
+            for start in range(0, len(line), size):
+                yield line[start:start + size]
@@ -15,6 +15,7 @@ class ActionType(Enum):
     DATE_SHORT = "date_short"
     DATETIME = "datetime"
     TIME = "time"
+    DATE_FORMAT = "date_format"
     CURRENCY = "currency"
     SYMBOL = "symbol"
     KEY_COMBO = "key_combo"
@@ -50,7 +51,7 @@ class Macro:
         if self.action_type == "text":
             executor.insert_text(self.value)
         elif self.action_type == "action":
-            executor.execute_action(self.value)
+            # Задержку записывает тот, кто выполняет сам макрос: шаг отдельно не учитывается
+            executor.compile_action(self.value)()
         elif self.action_type == "key_combo":
-            import keyboard
-            keyboard.send(self.value)
\ No newline at end of file
+            executor.backend.send(self.value)
\ No newline at end of file
@@ -2,7 +2,7 @@
 Модель профиля настроек.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Union
 from dataclasses import dataclass, field
 
 
@@ -12,7 +12,8 @@ class Profile:
 
     name: str
     mappings: Dict[str, str] = field(default_factory=dict)
-    target_process: str = "Yandex"
+    target_process: Union[str, List[str]] = "Yandex"  # имя, glob, 're:' регулярное выражение или их список
+    hotstrings: Dict[str, str] = field(default_factory=dict)  # сокращение → действие
 
     def add_mapping(self, key: str, action: str) -> None:
         """Добавляет назначение клавиши."""
@@ -35,7 +36,8 @@ class Profile:
         """Сериализует профиль в словарь."""
         return {
             'mappings': self.mappings,
-            'target_process': self.target_process
+            'target_process': self.target_process,
+            'hotstrings': self.hotstrings
         }
 
     @classmethod
@@ -48,5 +50,6 @@ class Profile:
         return cls(
             name=name,
             mappings=data.get('mappings', {}),
-            target_process=data.get('target_process', 'Yandex')
+            target_process=data.get('target_process', 'Yandex'),
+            hotstrings=data.get('hotstrings', {})
         )
\ No newline at end of file
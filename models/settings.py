@@ -3,7 +3,7 @@
 """
 
 from dataclasses import dataclass, field
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 
 @dataclass
@@ -17,8 +17,26 @@ class AppSettings:
 
     # Настройки производительности
     typing_delay: float = 0.01
+    typing_chunk_size: int = 32
+    typing_rate_limit: int = 0  # символов в секунду, 0 - без ограничения
     clipboard_timeout: float = 0.05
     process_check_frequency: float = 0.1
+    native_remaps: bool = True  # клавиша → клавиша средствами библиотеки, без обработчика
+    sequence_timeout: float = 1.0  # секунд ожидания следующего шага последовательности
+    action_queue_size: int = 64
+    queue_overflow_policy: str = "drop_oldest"  # drop_oldest | drop_newest
+    auto_switch_profiles: bool = False
+    live_reload: bool = False
+    runtime: str = "threads"  # threads | asyncio
+    latency_tracking: bool = True
+    injection_mode: str = "auto"  # auto | paste | type
+    direct_type_max_ascii: Optional[int] = None  # None - порог выбирается автоматически
+    direct_type_learned_ascii: int = 0  # выученный порог прямого ввода, 0 - еще не выучен
+    direct_type_max_glyphs: int = 1
+    adaptive_injection: bool = True
+    clipboard_restore_delay: float = 0.5
+    auto_calibrate_paste: bool = False
+    paste_settle_delays: Dict[str, float] = field(default_factory=dict)  # процесс → пауза после Ctrl+V
 
     # Настройки резервного копирования
     auto_backup: bool = True
@@ -0,0 +1,138 @@
+"""
+Общие фикстуры тестов: изолированные файлы настроек и сеанс на SimulatedBackend.
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.input_backend import SimulatedBackend  # noqa: E402
+from core.scheduler import Scheduler, TimerHandle  # noqa: E402
+
+
+def wait_until(predicate, timeout: float = 2.0, interval: float = 0.005) -> bool:
+    """Ждет выполнения условия, не дольше timeout секунд."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(interval)
+    return predicate()
+
+
+class ManualTimer(TimerHandle):
+    def __init__(self, due: float, callback, args):
+        self.due = due
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class ManualScheduler(Scheduler):
+    """Планировщик с виртуальным временем: таймеры срабатывают только в advance()."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.timers = []
+
+    def call_later(self, delay, callback, *args, name=None, daemon=True, blocking=False) -> ManualTimer:
+        timer = ManualTimer(self.now + delay, callback, args)
+        self.timers.append(timer)
+        return timer
+
+    @property
+    def pending(self) -> list:
+        return [timer for timer in self.timers if not timer.cancelled]
+
+    def advance(self, seconds: float) -> None:
+        """Сдвигает время и выполняет наступившие таймеры по порядку."""
+        target = self.now + seconds
+        while True:
+            due = [timer for timer in self.pending if timer.due <= target]
+            if not due:
+                break
+            timer = min(due, key=lambda t: t.due)
+            self.timers.remove(timer)
+            self.now = max(self.now, timer.due)
+            timer.callback(*timer.args)
+        self.now = target
+
+
+@pytest.fixture
+def scheduler():
+    return ManualScheduler()
+
+
+@pytest.fixture(autouse=True)
+def isolated_files(tmp_path, monkeypatch):
+    """Настройки, макросы и конфигурация пишутся во временный каталог."""
+    monkeypatch.chdir(tmp_path)
+    config_file = str(tmp_path / "key_config.json")
+    backup_dir = str(tmp_path / "backups")
+    monkeypatch.setattr('core.config_manager.CONFIG_FILE', config_file)
+    monkeypatch.setattr('core.config_manager.BACKUP_DIR', backup_dir)
+    monkeypatch.setattr('core.remapper.CONFIG_FILE', config_file)
+    return tmp_path
+
+
+@pytest.fixture
+def backend():
+    return SimulatedBackend()
+
+
+class Session:
+    """Сеанс переназначения в отдельном потоке."""
+
+    def __init__(self, remapper):
+        self.remapper = remapper
+        self.thread = threading.Thread(target=remapper.start_remapping, daemon=True)
+
+    def start(self) -> 'Session':
+        self.thread.start()
+        assert wait_until(lambda: self.remapper.is_active or not self.thread.is_alive())
+        return self
+
+    def focus(self, pid, name) -> None:
+        """Делает активным окно процесса и ждет, пока сеанс обработает смену."""
+        self.remapper.process_monitor.source.emit(pid, name)
+        self.remapper.event_bus.flush()
+
+    def stop(self) -> None:
+        self.remapper.stop_remapping()
+        self.thread.join(timeout=2.0)
+        assert not self.thread.is_alive()
+
+
+@pytest.fixture
+def make_session(backend):
+    """Создает ремаппер на SimulatedBackend; сеансы останавливаются после теста."""
+    from core.foreground_source import ScriptedForegroundSource
+    from core.remapper import KeyboardRemapper
+
+    sessions = []
+
+    def factory(mappings, target_process='notepad.exe', foreground=(1, 'notepad.exe'),
+                input_backend=None, **settings):
+        remapper = KeyboardRemapper(input_backend or backend)
+        for key, value in settings.items():
+            remapper.settings_manager.set_setting(key, value)
+        remapper.process_monitor.source = ScriptedForegroundSource(foreground)
+        remapper.config_manager.get_current_profile().target_process = target_process
+        remapper.mappings = dict(mappings)
+        session = Session(remapper)
+        sessions.append(session)
+        return session
+
+    yield factory
+
+    for session in sessions:
+        if session.thread.is_alive():
+            session.stop()
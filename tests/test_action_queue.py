@@ -0,0 +1,110 @@
+"""
+Тесты очереди выполнения действий.
+"""
+
+import threading
+
+from core.action_queue import ActionQueue
+
+from tests.conftest import wait_until
+
+
+def test_actions_run_in_order():
+    done = []
+    queue = ActionQueue()
+    queue.start()
+    for index in range(20):
+        queue.submit(str(index), lambda index=index: done.append(index))
+    queue.stop()
+
+    assert done == list(range(20))
+    assert queue.executed_count == 20
+
+
+def test_on_complete_reports_timings():
+    reports = []
+    queue = ActionQueue(on_complete=lambda key, action, enqueued, started, finished:
+                        reports.append((key, enqueued <= started <= finished)))
+    queue.start()
+    queue.submit('a', lambda: None)
+    queue.stop()
+
+    assert reports == [('a', True)]
+
+
+def test_drop_oldest_and_drop_newest():
+    for policy, expected in (('drop_oldest', ['2', '3']), ('drop_newest', ['0', '1'])):
+        queue = ActionQueue(maxsize=2, overflow_policy=policy)
+        done = []
+        for index in range(4):
+            queue.submit(str(index), lambda index=index: done.append(str(index)))
+        queue.start()
+        queue.stop()
+
+        assert done == expected
+        assert queue.dropped_count == 2
+
+
+def test_failing_action_does_not_stop_worker():
+    done = []
+    queue = ActionQueue()
+    queue.start()
+    queue.submit('bad', lambda: 1 / 0)
+    queue.submit('good', lambda: done.append('good'))
+    queue.stop()
+
+    assert done == ['good']
+
+
+def test_failing_on_complete_does_not_stop_worker():
+    done = []
+
+    def on_complete(key, action, enqueued, started, finished):
+        raise RuntimeError("subscriber failed")
+
+    queue = ActionQueue(on_complete=on_complete)
+    queue.start()
+    queue.submit('a', lambda: done.append('a'))
+    queue.submit('b', lambda: done.append('b'))
+    assert queue.stop()
+
+    assert done == ['a', 'b']
+
+
+def test_submit_does_not_block_while_action_runs():
+    release = threading.Event()
+    queue = ActionQueue(maxsize=1, overflow_policy='drop_newest')
+    queue.start()
+    queue.submit('slow', release.wait)
+    assert wait_until(lambda: queue.pending_count() == 0)
+
+    assert queue.submit('a', lambda: None) is True
+    assert queue.submit('b', lambda: None) is False
+    release.set()
+    queue.stop()
+
+
+def test_stop_with_full_queue_forces_sentinel_in():
+    queue = ActionQueue(maxsize=2)
+    for index in range(2):
+        queue.submit(str(index), lambda: None)
+    queue.start()
+
+    assert queue.stop() is True
+    assert not queue.is_running
+    assert queue.submit('late', lambda: None) is False
+
+
+def test_stop_reports_hung_action_and_discards_pending():
+    release = threading.Event()
+    done = []
+    queue = ActionQueue(maxsize=4)
+    queue.start()
+    queue.submit('hung', release.wait)
+    queue.submit('stale', lambda: done.append('stale'))
+
+    assert queue.stop(timeout=0.05) is False
+    release.set()
+    assert wait_until(lambda: queue._worker_thread is not None and not queue._worker_thread.is_alive())
+    assert done == []
+    assert queue.dropped_count == 1
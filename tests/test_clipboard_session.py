@@ -0,0 +1,170 @@
+"""
+Тесты сеанса буфера обмена.
+"""
+
+import threading
+import time
+
+import pytest
+
+from core.clipboard_session import ClipboardSession
+from core.paste_calibrator import CALIBRATION_MIN_SAMPLES, PasteSettleCalibrator
+
+from tests.conftest import wait_until
+
+
+def make_session(backend, scheduler, restore_delay=0.5):
+    session = ClipboardSession(backend, restore_delay=restore_delay, settle_delay=0)
+    session.scheduler = scheduler
+    return session
+
+
+def test_burst_captures_once_and_restores_once(backend, scheduler):
+    backend.clipboard = 'user data'
+    session = make_session(backend, scheduler)
+
+    session.paste('one')
+    scheduler.advance(0.3)
+    session.paste('two')
+    assert backend.injected_text() == 'onetwo'
+    assert session.captures == 1
+
+    # Вторая вставка перезапустила таймер: через 0.5 с после первой восстановления еще нет
+    scheduler.advance(0.3)
+    assert backend.clipboard == 'two'
+    scheduler.advance(0.3)
+    assert backend.clipboard == 'user data'
+    assert session.get_stats() == {'captures': 1, 'pastes': 2, 'restores': 1}
+    assert not session.is_active
+
+
+def test_user_copy_is_not_overwritten(backend, scheduler):
+    backend.clipboard = 'old'
+    session = make_session(backend, scheduler)
+
+    session.paste('text')
+    backend.clipboard = 'copied by user'
+    scheduler.advance(1.0)
+    assert backend.clipboard == 'copied by user'
+    assert session.restores == 0
+
+
+def test_flush_restores_immediately(backend, scheduler):
+    backend.clipboard = 'old'
+    session = make_session(backend, scheduler)
+
+    session.paste('text')
+    session.flush()
+    assert backend.clipboard == 'old'
+    assert scheduler.pending == []
+
+
+def test_failed_copy_releases_capture(backend, scheduler):
+    session = make_session(backend, scheduler)
+
+    def busy(text):
+        raise RuntimeError("Clipboard is busy")
+
+    backend.copy_clipboard = busy
+    with pytest.raises(RuntimeError):
+        session.paste('text')
+    assert not session.is_active
+    assert backend.injected_events == []
+
+
+def test_next_paste_waits_for_settle_delay(backend, scheduler):
+    session = make_session(backend, scheduler, restore_delay=0)
+    session.settle_delay = 0.05
+
+    started = time.monotonic()
+    session.paste('one')
+    session.paste('two')
+    assert time.monotonic() - started >= 0.05
+
+    # Восстановление не раньше паузы после последней вставки
+    assert [timer.due for timer in scheduler.pending] == [0.05]
+
+
+def calibrated_session(backend, scheduler, calibrator):
+    session = make_session(backend, scheduler, restore_delay=0)
+    session.settle_delay = 0.2
+    session.calibrator = calibrator
+    session.foreground = lambda: 'notepad.exe'
+    return session
+
+
+def test_observed_read_ends_wait_and_calibrates(backend, scheduler):
+    calibrator = PasteSettleCalibrator(calibrating=True)
+    session = calibrated_session(backend, scheduler, calibrator)
+
+    started = time.monotonic()
+    for index in range(CALIBRATION_MIN_SAMPLES):
+        session.paste(str(index))
+        assert backend.simulate_clipboard_read() == str(index)
+    # Пауза после каждой вставки закончилась на чтении, а не через settle_delay
+    assert time.monotonic() - started < 0.2
+    assert backend.injected_text() == '01234'
+
+    learned = calibrator.delays['notepad.exe']
+    assert learned < 0.2
+    # Следующая вставка ждет выученную паузу, и восстановление ставится по ней
+    session.paste('x')
+    assert [timer.due for timer in scheduler.pending] == [learned]
+
+
+def test_unread_paste_discards_calibration(backend, scheduler):
+    backend.clipboard = 'user data'
+    calibrator = PasteSettleCalibrator(delays={'notepad.exe': 0.01}, calibrating=True)
+    session = calibrated_session(backend, scheduler, calibrator)
+
+    session.paste('one')
+    # Собственное чтение буфера обмена при восстановлении не считается замером
+    session.flush()
+    assert backend.clipboard == 'user data'
+    assert calibrator.delays == {}
+
+
+def test_restore_timer_does_not_wait_for_settling_paste(backend, scheduler):
+    backend.clipboard = 'user data'
+    session = make_session(backend, scheduler, restore_delay=0)
+    session.settle_delay = 0.3
+    session.paste('one')
+
+    second = threading.Thread(target=session.paste, args=('two',))
+    second.start()
+    # Пока вторая вставка выжидает паузу, таймер восстанавливает буфер обмена сразу
+    started = time.monotonic()
+    scheduler.advance(0.3)
+    assert time.monotonic() - started < 0.2
+    assert backend.clipboard == 'user data'
+
+    second.join()
+    assert backend.injected_text() == 'onetwo'
+    assert session.get_stats() == {'captures': 2, 'pastes': 2, 'restores': 1}
+
+
+def test_asyncio_restore_runs_off_the_loop_thread(backend):
+    from core.async_runtime import AsyncRuntime
+
+    runtime = AsyncRuntime()
+    loop_thread = threading.Thread(target=runtime.run, daemon=True)
+    loop_thread.start()
+    assert wait_until(lambda: runtime.is_running)
+
+    restore_threads = []
+    copy_clipboard = backend.copy_clipboard
+
+    def recording_copy(text):
+        restore_threads.append(threading.current_thread())
+        copy_clipboard(text)
+
+    backend.clipboard = 'user data'
+    session = ClipboardSession(backend, restore_delay=0, settle_delay=0)
+    session.scheduler = runtime
+    session.paste('text')
+    backend.copy_clipboard = recording_copy
+    assert wait_until(lambda: backend.clipboard == 'user data')
+
+    runtime.stop()
+    loop_thread.join(timeout=2.0)
+    assert restore_threads and restore_threads[0] is not loop_thread
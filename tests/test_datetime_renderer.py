@@ -0,0 +1,64 @@
+"""
+Тесты шаблонов даты и кэша по интервалам.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from core.datetime_renderer import (
+    GRANULARITY_DAY, GRANULARITY_MINUTE, GRANULARITY_NONE, DateTemplateError, DateTimeRenderer,
+    DateTimeTemplate, parse_date_action
+)
+
+NOON = datetime(2026, 10, 7, 12, 34, 10).timestamp()
+
+
+def test_builtin_and_locale_templates():
+    renderer = DateTimeRenderer()
+    assert renderer.compile_action('date_long').render(NOON) == '7 октября 2026'
+    assert renderer.compile_action('date_short').render(NOON) == '07.10.2026'
+    assert renderer.compile_action('date:en:%A, %B %-d').render(NOON) == 'Wednesday, October 7'
+    assert renderer.compile_action('date:%Y-%m-%d %H:%M %%').render(NOON) == '2026-10-07 12:34 %'
+    assert parse_date_action('date:en:%Y') == ('%Y', 'en')
+
+
+def test_unsupported_directive_rejected_when_compiled():
+    for template in ('%Q', '%Y-%E', '%-k'):
+        with pytest.raises(DateTemplateError, match='%'):
+            DateTimeTemplate(template)
+
+
+def test_cache_lasts_until_end_of_bucket():
+    template = DateTimeTemplate('%H:%M')
+    assert template.granularity == GRANULARITY_MINUTE
+
+    assert template.render(NOON) == '12:34'
+    cache = template._cache
+    assert template.render(NOON + 40) == '12:34'
+    assert template._cache is cache
+    assert template.render(NOON + 50) == '12:35'
+
+
+def test_granularity_follows_finest_field():
+    assert DateTimeTemplate('%d.%m.%Y').granularity == GRANULARITY_DAY
+    template = DateTimeTemplate('%S.%f')
+    assert template.granularity == GRANULARITY_NONE
+    template.render(NOON)
+    assert template._cache is None
+
+
+def test_executor_skips_bad_saved_template(backend):
+    from core.action_executor import ActionExecutor
+
+    compiled = ActionExecutor(backend).compile_action('date:%Q')
+    compiled()
+    assert backend.injected_events == []
+
+
+def test_date_dialog_asks_again_after_bad_template(monkeypatch):
+    from ui.dialogs import get_date_format_action
+
+    answers = iter(['%Y-%Q', '%Y'])
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(answers))
+    assert get_date_format_action() == 'date:%Y'
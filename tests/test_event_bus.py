@@ -0,0 +1,91 @@
+"""
+Тесты шины событий.
+"""
+
+import threading
+
+from core.event_bus import EventBus, Topic
+
+
+def test_publish_delivers_to_topic_subscribers_in_order():
+    bus = EventBus()
+    received = []
+    bus.subscribe(Topic.FOCUS_CHANGED, lambda event: received.append(('first', event['process_name'])))
+    bus.subscribe(Topic.FOCUS_CHANGED, lambda event: received.append(('second', event.get('pid'))))
+    bus.subscribe(Topic.PROFILE_SWITCHED, lambda event: received.append(('other', event['profile_name'])))
+
+    bus.publish(Topic.FOCUS_CHANGED, pid=1, process_name='notepad.exe')
+    assert received == [('first', 'notepad.exe'), ('second', 1)]
+
+
+def test_queued_handler_runs_off_the_publishing_thread():
+    bus = EventBus()
+    release = threading.Event()
+    received = []
+
+    def slow(event):
+        release.wait(2.0)
+        received.append((event['process_name'], threading.current_thread().name))
+
+    bus.subscribe(Topic.FOCUS_CHANGED, slow, queued=True)
+
+    # Публикующий не ждет медленного подписчика, порядок событий сохраняется
+    bus.publish(Topic.FOCUS_CHANGED, pid=1, process_name='notepad.exe')
+    bus.publish(Topic.FOCUS_CHANGED, pid=2, process_name='code.exe')
+    assert received == []
+
+    release.set()
+    bus.flush()
+    assert received == [('notepad.exe', 'EventBus'), ('code.exe', 'EventBus')]
+
+
+def test_full_queue_drops_events():
+    bus = EventBus(queue_size=1)
+    started = threading.Event()
+    release = threading.Event()
+    received = []
+
+    def slow(event):
+        started.set()
+        release.wait(2.0)
+        received.append(event['pid'])
+
+    bus.subscribe(Topic.FOCUS_CHANGED, slow, queued=True)
+    bus.publish(Topic.FOCUS_CHANGED, pid=1, process_name='a.exe')
+    assert started.wait(2.0)
+    bus.publish(Topic.FOCUS_CHANGED, pid=2, process_name='b.exe')
+    bus.publish(Topic.FOCUS_CHANGED, pid=3, process_name='c.exe')
+
+    release.set()
+    bus.flush()
+    assert received == [1, 2]
+    assert bus.dropped == 1
+
+
+def test_unsubscribe_removes_only_that_handler():
+    bus = EventBus()
+    received = []
+    first = bus.subscribe(Topic.MAPPING_CHANGED, lambda event: received.append('first'))
+    bus.subscribe(Topic.MAPPING_CHANGED, lambda event: received.append('second'))
+
+    bus.unsubscribe(first)
+    bus.publish(Topic.MAPPING_CHANGED, added=[], removed=[], changed=[])
+    assert received == ['second']
+
+    # Повторная отписка ничего не ломает
+    bus.unsubscribe(first)
+
+
+def test_failing_handler_does_not_stop_delivery(capsys):
+    bus = EventBus()
+    received = []
+
+    def failing(event):
+        raise RuntimeError('boom')
+
+    bus.subscribe(Topic.ACTION_EXECUTED, failing)
+    bus.subscribe(Topic.ACTION_EXECUTED, lambda event: received.append(event['key']))
+
+    bus.publish(Topic.ACTION_EXECUTED, key='f1', action_type='text', duration_ns=0)
+    assert received == ['f1']
+    assert 'boom' in capsys.readouterr().out
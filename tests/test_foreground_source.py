@@ -0,0 +1,164 @@
+"""
+Тесты источников смены активного окна.
+"""
+
+import ctypes
+import threading
+from types import SimpleNamespace
+
+from core.foreground_source import ForegroundSource, PollingForegroundSource, WinEventForegroundSource
+from core.process_monitor import ProcessMonitor
+
+from tests.conftest import wait_until
+
+
+class FailingSource(ForegroundSource):
+    """Источник уведомлений, который не удалось запустить."""
+
+    is_push = True
+
+    def start(self, on_change) -> bool:
+        return False
+
+    def stop(self) -> None:
+        pass
+
+
+def test_win_event_start_reports_failed_hook(monkeypatch):
+    monkeypatch.setattr(WinEventForegroundSource, '_run', lambda self: self._report_failure())
+    source = WinEventForegroundSource(lambda: (1, 'notepad.exe'))
+
+    assert source.start(lambda pid, name: None) is False
+    assert not source.is_running
+
+
+class FakeUser32:
+    """user32 для WinEvent-источника: цикл сообщений сообщает одну смену окна и ждет stop()."""
+
+    def __init__(self):
+        self.quit = threading.Event()
+        self.callback = None
+
+    def SetWinEventHook(self, event_min, event_max, module, callback, pid, thread_id, flags):
+        self.callback = callback
+        return 1
+
+    def UnhookWinEvent(self, hook):
+        return True
+
+    def GetMessageW(self, msg, hwnd, first, last):
+        self.callback(1, 3, 0, 0, 0, 0, 0)
+        self.quit.wait()
+        return 0
+
+    def PostThreadMessageW(self, thread_id, message, wparam, lparam):
+        self.quit.set()
+
+
+def test_win_event_survives_failed_initial_window(monkeypatch):
+    user32 = FakeUser32()
+    kernel32 = SimpleNamespace(GetCurrentThreadId=lambda: 1)
+    monkeypatch.setattr(ctypes, 'windll', SimpleNamespace(user32=user32, kernel32=kernel32), raising=False)
+    monkeypatch.setattr(ctypes, 'WINFUNCTYPE', lambda *types: (lambda function: function), raising=False)
+
+    windows = [RuntimeError("Access denied"), (7, 'code.exe')]
+
+    def resolve():
+        window = windows.pop(0)
+        if isinstance(window, Exception):
+            raise window
+        return window
+
+    changes = []
+    source = WinEventForegroundSource(resolve)
+    assert source.start(lambda pid, name: changes.append(name)) is True
+
+    # Хук остался установлен: следующая смена окна доходит до подписчика
+    assert wait_until(lambda: changes == ['code.exe'], timeout=0.5)
+    source.stop()
+    assert not source.is_running
+
+
+def test_monitor_falls_back_to_polling(scheduler, monkeypatch):
+    monitor = ProcessMonitor(source=FailingSource(lambda: (None, None)))
+    monitor.scheduler = scheduler
+    monkeypatch.setattr(monitor, '_query_foreground', lambda: (7, 'code.exe'))
+
+    monitor.start_monitoring()
+    assert isinstance(monitor.source, PollingForegroundSource)
+    assert monitor.source.scheduler is scheduler
+
+    scheduler.advance(0)
+    assert (monitor.state.pid, monitor.state.name) == (7, 'code.exe')
+    assert monitor.last_active_process == 'code.exe'
+
+    monitor.stop_monitoring()
+    assert not monitor.source.is_running
+    assert scheduler.pending == []
+
+
+def test_polling_backs_off_while_nothing_changes(scheduler):
+    current = [(1, 'notepad.exe')]
+    changes = []
+    source = PollingForegroundSource(lambda: current[0], interval=0.1, max_interval=0.4)
+    source.scheduler = scheduler
+    source.start(lambda pid, name: changes.append(name))
+
+    scheduler.advance(0)
+    assert changes == ['notepad.exe']
+    assert source.current_interval == 0.1
+
+    intervals = []
+    for _ in range(3):
+        scheduler.advance(source.current_interval)
+        intervals.append(source.current_interval)
+    assert intervals == [0.2, 0.4, 0.4]
+    assert source.polls == 4
+
+    # Смена окна возвращает быстрый опрос
+    current[0] = (2, 'code.exe')
+    scheduler.advance(0.4)
+    assert changes == ['notepad.exe', 'code.exe']
+    assert source.current_interval == 0.1
+    source.stop()
+    assert scheduler.pending == []
+
+
+def test_poke_replaces_slow_timer_with_immediate_check(scheduler):
+    current = [(1, 'notepad.exe')]
+    changes = []
+    source = PollingForegroundSource(lambda: current[0], interval=0.1, max_interval=1.0)
+    source.scheduler = scheduler
+    source.start(lambda pid, name: changes.append(name))
+    scheduler.advance(0)
+    scheduler.advance(0.1)
+    scheduler.advance(0.2)
+    assert source.current_interval == 0.4
+
+    current[0] = (2, 'code.exe')
+    source.poke()
+    assert [timer.due - scheduler.now for timer in scheduler.pending] == [0]
+    scheduler.advance(0)
+    assert changes == ['notepad.exe', 'code.exe']
+
+    # На быстром периоде poke ничего не перезапускает
+    polls = source.polls
+    source.poke()
+    assert len(scheduler.pending) == 1
+    assert source.polls == polls
+    source.stop()
+
+
+def test_polling_thread_wakes_on_poke():
+    current = [(1, 'notepad.exe')]
+    changes = []
+    source = PollingForegroundSource(lambda: current[0], interval=0.01, max_interval=60.0)
+    source.start(lambda pid, name: changes.append(name))
+    assert wait_until(lambda: source.current_interval > 0.3)
+
+    # Без poke смена была бы замечена не раньше чем через период опроса
+    current[0] = (2, 'code.exe')
+    source.poke()
+    assert wait_until(lambda: changes == ['notepad.exe', 'code.exe'], timeout=0.1)
+    source.stop()
+    assert not source.is_running
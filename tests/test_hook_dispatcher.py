@@ -0,0 +1,127 @@
+"""
+Тесты единого хука и автомата последовательностей.
+"""
+
+from core.hook_dispatcher import HookDispatcher, parse_key_combo
+from core.key_sequence import KeySequenceDFA, SequenceMatcher
+
+from tests.conftest import wait_until
+
+
+def test_parse_key_combo():
+    assert parse_key_combo('ctrl+shift+a') == (1 | 4, 'a')
+    assert parse_key_combo('f1') == (0, 'f1')
+    assert parse_key_combo('ctrl') is None
+    assert parse_key_combo('hyper+a') is None
+
+
+def test_mapping_matches_only_exact_modifiers(backend):
+    dispatcher = HookDispatcher(backend)
+    fired = []
+    dispatcher.add_mapping('ctrl+a', lambda: fired.append('ctrl+a'))
+    dispatcher.start()
+
+    assert backend.simulate_hotkey('ctrl+a') is True
+    assert backend.simulate_tap('a') is False
+    assert backend.simulate_hotkey('ctrl+shift+a') is False
+    assert fired == ['ctrl+a']
+
+    dispatcher.stop()
+    assert backend.simulate_hotkey('ctrl+a') is False
+
+
+def test_truthy_handler_passes_event_through(backend):
+    dispatcher = HookDispatcher(backend)
+    dispatcher.add_mapping('f1', lambda: True)
+    dispatcher.start()
+
+    assert backend.simulate_tap('f1') is False
+
+
+def test_sequence_fires_after_last_step(backend):
+    dispatcher = HookDispatcher(backend)
+    fired = []
+    dispatcher.add_sequence('ctrl+k, ctrl+d', lambda: fired.append('kd'))
+    dispatcher.start()
+
+    assert backend.simulate_hotkey('ctrl+k') is True
+    assert fired == []
+    assert backend.simulate_hotkey('ctrl+d') is True
+    assert fired == ['kd']
+
+
+def test_sequence_prefix_fires_on_timeout_and_mismatch():
+    matcher = SequenceMatcher(timeout=0.05)
+    fired = []
+    dfa = KeySequenceDFA()
+    dfa.add([(1, {37})], lambda: fired.append('k'))
+    dfa.add([(1, {37}), (1, {32})], lambda: fired.append('kd'))
+    matcher.load(dfa)
+
+    assert matcher.feed((37, 1)) is True
+    assert wait_until(lambda: fired == ['k'])
+
+    # Несовпавший шаг: сначала срабатывает префикс, событие разбирается с начала
+    assert matcher.feed((37, 1)) is True
+    assert matcher.feed((99, 0)) is False
+    assert fired == ['k', 'k']
+    assert not matcher.is_pending
+
+
+def test_sequence_guard_blocks_start():
+    matcher = SequenceMatcher()
+    matcher.load(KeySequenceDFA([([(0, {59}), (0, {60})], lambda: None)]))
+    matcher.guard = lambda: False
+
+    assert matcher.feed((59, 0)) is False
+    assert not matcher.is_pending
+
+
+def injected(backend):
+    return [(event.kind, event.value) for event in backend.injected_events]
+
+
+def test_alt_release_is_masked_after_fired_combo(backend):
+    dispatcher = HookDispatcher(backend)
+    dispatcher.add_mapping('alt+x', lambda: None)
+    dispatcher.start()
+
+    backend.simulate_key('alt', 'down')
+    assert backend.simulate_tap('x') is True
+    # Физическое отпускание Alt подавляется и отправляется после маскирующей клавиши
+    assert backend.simulate_key('alt', 'up') is True
+    assert injected(backend) == [('send', 'ctrl'), ('release', 'alt')]
+
+    # Без сработавшей комбинации Alt не маскируется
+    backend.clear_injected()
+    backend.simulate_key('alt', 'down')
+    backend.simulate_tap('y')
+    assert backend.simulate_key('alt', 'up') is False
+    assert injected(backend) == []
+
+
+def test_alt_release_not_masked_while_ctrl_held(backend):
+    dispatcher = HookDispatcher(backend)
+    dispatcher.add_mapping('ctrl+alt+x', lambda: None)
+    dispatcher.start()
+
+    assert backend.simulate_hotkey('ctrl+alt+x') is True
+    assert ('send', 'ctrl') not in injected(backend)
+
+
+def test_released_modifiers_around_injection(backend):
+    dispatcher = HookDispatcher(backend)
+    dispatcher.add_mapping('alt+x', lambda: None)
+    dispatcher.start()
+
+    backend.simulate_key('alt', 'down')
+    backend.simulate_tap('x')
+    with dispatcher.released_modifiers():
+        backend.send('ctrl+v')
+    assert injected(backend) == [('send', 'ctrl'), ('release', 'alt'), ('send', 'ctrl+v'), ('press', 'alt')]
+
+    # Отпущенный во время вставки модификатор обратно не нажимается
+    backend.clear_injected()
+    with dispatcher.released_modifiers():
+        backend.simulate_key('alt', 'up')
+    assert ('press', 'alt') not in injected(backend)
@@ -0,0 +1,85 @@
+"""
+Тесты распознавания сокращений.
+"""
+
+from core.hotstring_engine import AhoCorasickAutomaton, HotstringEngine
+
+
+def feed_text(automaton, text):
+    state = AhoCorasickAutomaton.ROOT
+    matches = []
+    for char in text:
+        state = automaton.step(state, char)
+        match = automaton.match(state)
+        if match:
+            matches.append(match)
+    return matches
+
+
+def test_automaton_finds_overlapping_patterns():
+    automaton = AhoCorasickAutomaton(['he', 'she', 'hers'])
+    assert feed_text(automaton, 'ushers') == ['she', 'hers']
+
+
+def test_automaton_remove_pattern():
+    automaton = AhoCorasickAutomaton(['btw', 'tw'])
+    automaton.remove('btw')
+    assert feed_text(automaton, 'btw') == ['tw']
+
+
+def test_engine_suppresses_last_char_and_resets(backend):
+    matched = []
+    engine = HotstringEngine(backend, lambda abbreviation: matched.append(abbreviation) or True)
+    engine.update(['btw'])
+    engine.start()
+
+    assert backend.simulate_tap('b') is False
+    assert backend.simulate_tap('t') is False
+    assert backend.simulate_tap('w') is True
+    assert matched == ['btw']
+
+
+def test_engine_backspace_and_shortcuts(backend):
+    matched = []
+    engine = HotstringEngine(backend, lambda abbreviation: matched.append(abbreviation) or True)
+    engine.update(['ab'])
+    engine.start()
+
+    # Backspace откатывает 'x', сокращение продолжается
+    for name in ('a', 'x', 'backspace', 'b'):
+        backend.simulate_tap(name)
+    assert matched == ['ab']
+
+    # Сочетание с Ctrl сбрасывает буфер
+    backend.simulate_tap('a')
+    backend.simulate_hotkey('ctrl+c')
+    backend.simulate_tap('b')
+    assert matched == ['ab']
+
+
+def test_engine_ignores_injected_text():
+    from core.input_backend import SimulatedBackend
+
+    backend = SimulatedBackend(echo_injected=True)
+    matched = []
+    engine = HotstringEngine(backend, lambda abbreviation: matched.append(abbreviation) or True)
+    engine.update(['ab'])
+    engine.start()
+
+    backend.write('ab')
+    assert matched == []
+
+
+def test_update_publishes_prebuilt_automaton(backend):
+    engine = HotstringEngine(backend, lambda abbreviation: True)
+    engine.update(['btw', 'omw'])
+    first = engine.automaton
+    assert not first._dirty
+
+    # Тот же набор не перестраивается, новый набор - новый готовый автомат
+    engine.update(['omw', 'btw'])
+    assert engine.automaton is first
+    engine.update(['btw'])
+    assert engine.automaton is not first
+    assert not engine.automaton._dirty
+    assert engine.automaton.patterns == {'btw'}
@@ -0,0 +1,51 @@
+"""
+Тесты журнала собственных синтетических событий.
+"""
+
+from types import SimpleNamespace
+
+from core.injection_ledger import InjectionLedger
+from core.input_backend import SimulatedBackend
+
+
+def key_event(name, event_type='down', scan_code=0, is_injected=False):
+    return SimpleNamespace(name=name, event_type=event_type, scan_code=scan_code, is_injected=is_injected)
+
+
+def test_recorded_event_is_consumed_once():
+    ledger = InjectionLedger()
+    ledger.record(['ctrl', 'v'])
+
+    assert ledger.is_injected(key_event('ctrl')) is True
+    assert ledger.is_injected(key_event('v')) is True
+    assert ledger.is_injected(key_event('v')) is False
+    assert ledger.filtered == 2
+
+
+def test_expired_entry_is_not_matched():
+    ledger = InjectionLedger(ttl=0)
+    ledger.record(['a'])
+    assert ledger.is_injected(key_event('a')) is False
+
+
+def test_result_is_cached_on_event():
+    ledger = InjectionLedger()
+    ledger.record(['a'], ('down',))
+    event = key_event('a')
+
+    assert ledger.is_injected(event) is True
+    # Второй хук получает тот же объект и не погашает запись заново
+    assert ledger.is_injected(event) is True
+    assert ledger.filtered == 1
+
+
+def test_untagged_echo_is_filtered_by_ledger():
+    backend = SimulatedBackend(echo_injected=True, tag_injected=False)
+    seen = []
+    backend.hook(lambda event: seen.append(backend.ledger.is_injected(event)) or True)
+
+    backend.send('ctrl+v')
+    assert seen == [True, True, True, True]
+
+    backend.simulate_tap('v')
+    assert seen[-2:] == [False, False]
@@ -0,0 +1,48 @@
+"""
+Тесты модели подавления SimulatedBackend (поведение библиотеки keyboard 0.13.5).
+"""
+
+from core.input_backend import SimulatedBackend
+
+
+def test_passed_through_hotkey_loses_pending_modifier():
+    backend = SimulatedBackend()
+    backend.add_hotkey('ctrl+1', lambda: True, suppress=True)
+
+    assert backend.simulate_hotkey('ctrl+1') is False
+    assert backend.delivered == [('down', '1'), ('up', '1')]
+
+
+def test_other_key_replays_pending_modifier():
+    backend = SimulatedBackend()
+    backend.add_hotkey('ctrl+1', lambda: None, suppress=True)
+
+    assert backend.simulate_hotkey('ctrl+2') is False
+    assert backend.delivered == [('down', 'ctrl'), ('down', '2'), ('up', '2'), ('up', 'ctrl')]
+
+
+def test_handled_hotkey_suppresses_modifier_and_key():
+    backend = SimulatedBackend()
+    calls = []
+    backend.add_hotkey('ctrl+1', lambda: calls.append('ctrl+1'), suppress=True)
+
+    assert backend.simulate_hotkey('ctrl+1') is True
+    assert calls == ['ctrl+1']
+    assert backend.delivered == []
+
+
+def test_lone_modifier_tap_is_replayed_on_release():
+    backend = SimulatedBackend()
+    backend.add_hotkey('ctrl+1', lambda: None, suppress=True)
+
+    backend.simulate_tap('ctrl')
+    assert backend.delivered == [('down', 'ctrl'), ('up', 'ctrl')]
+
+
+def test_key_remap_presses_and_releases_target():
+    backend = SimulatedBackend()
+    backend.remap_hotkey('caps lock', 'ctrl')
+
+    assert backend.simulate_key('caps lock', 'down') is True
+    assert backend.simulate_key('caps lock', 'up') is True
+    assert [(event.kind, event.value) for event in backend.injected_events] == [('press', 'ctrl'), ('release', 'ctrl')]
@@ -0,0 +1,64 @@
+"""
+Тесты гистограмм задержек.
+"""
+
+import threading
+
+from core.latency_tracker import LatencyHistogram, LatencyTracker
+
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for value_ns in range(1_000, 101_000, 1_000):
+        histogram.record(value_ns)
+
+    assert histogram.count == 100
+    assert histogram.max_ns == 100_000
+    assert 50_000 <= histogram.percentile(50) <= 70_000
+    assert histogram.percentile(100) == 100_000
+
+
+def test_summary_while_other_threads_record():
+    tracker = LatencyTracker()
+    stop = threading.Event()
+    errors = []
+
+    def writer(prefix):
+        index = 0
+        while not stop.is_set():
+            tracker.record('execute', 1_000, key=f'{prefix}{index % 500}', action_type=f'{prefix}{index % 50}')
+            index += 1
+
+    def reader():
+        try:
+            for _ in range(50):
+                tracker.summary('key')
+                tracker.summary('action_type')
+        except Exception as e:
+            errors.append(e)
+
+    writers = [threading.Thread(target=writer, args=(prefix,)) for prefix in 'abc']
+    for thread in writers:
+        thread.start()
+    reader()
+    stop.set()
+    for thread in writers:
+        thread.join()
+
+    assert errors == []
+    rows = tracker.summary('action_type', stage='execute')
+    assert sum(row['count'] for row in rows) == sum(h.count for h in tracker.snapshot('key').values())
+
+
+def test_macro_step_latency_is_recorded_once(backend):
+    from core.action_executor import ActionExecutor
+    from models.mapping import Macro
+
+    executor = ActionExecutor(backend)
+    executor.latency_tracker = LatencyTracker()
+    executor.macro_resolver = lambda name: Macro(name=name, action_type='action', value='ctrl+c')
+
+    executor.execute_action('macro:copy')
+    assert backend.injected_events[-1].value == 'ctrl+c'
+    assert [(row['name'], row['count']) for row in executor.latency_tracker.summary(stage='execute')] == [
+        ('macro', 1)]
@@ -0,0 +1,45 @@
+"""
+Тесты автокалибровки паузы после вставки.
+"""
+
+from core.paste_calibrator import CALIBRATION_FLOOR, CALIBRATION_MIN_SAMPLES, PasteSettleCalibrator
+
+
+def test_delay_learned_after_enough_samples_with_margin():
+    calibrator = PasteSettleCalibrator(calibrating=True)
+
+    for _ in range(CALIBRATION_MIN_SAMPLES - 1):
+        calibrator.record('Notepad.exe', 0.01)
+    assert calibrator.delay_for('notepad.exe', 0.05) == 0.05
+    assert not calibrator.changed
+
+    calibrator.record('Notepad.exe', 0.02)
+    assert calibrator.delay_for('notepad.exe', 0.05) == 0.03
+    assert calibrator.changed
+    assert calibrator.delay_for('code.exe', 0.05) == 0.05
+    assert calibrator.delay_for(None, 0.05) == 0.05
+
+
+def test_delay_is_bounded_by_floor_and_default():
+    calibrator = PasteSettleCalibrator(delays={'slow.exe': 0.3})
+    assert calibrator.is_used
+    assert calibrator.delay_for('slow.exe', 0.05) == 0.05
+
+    for _ in range(CALIBRATION_MIN_SAMPLES):
+        calibrator.record('fast.exe', 0.0)
+    assert calibrator.delays['fast.exe'] == CALIBRATION_FLOOR
+
+
+def test_missed_read_discards_learned_delay():
+    calibrator = PasteSettleCalibrator(delays={'notepad.exe': 0.01}, calibrating=True)
+
+    calibrator.record_missed('Notepad.exe')
+    assert calibrator.delays == {}
+    assert calibrator.changed
+
+    # Замеры до промаха не учитываются
+    for _ in range(CALIBRATION_MIN_SAMPLES - 1):
+        calibrator.record('notepad.exe', 0.01)
+    calibrator.record_missed('notepad.exe')
+    calibrator.record('notepad.exe', 0.01)
+    assert calibrator.delays == {}
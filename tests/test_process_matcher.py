@@ -0,0 +1,37 @@
+"""
+Тесты матчера целевых процессов.
+"""
+
+from core.process_matcher import ProcessMatcher
+
+
+def test_exact_name_and_stem():
+    matcher = ProcessMatcher('Notepad.exe')
+    assert matcher.matches('notepad.exe')
+    assert not matcher.matches('notepad++.exe')
+
+    matcher = ProcessMatcher('chrome')
+    assert matcher.matches('chrome.exe')
+    assert not matcher.matches('chromedriver.exe')
+
+
+def test_globs_and_regex():
+    matcher = ProcessMatcher(['code*.exe', 're:(msedge|firefox)\\.exe', 'word?.exe'])
+    assert matcher.matches('Code - Insiders.exe')
+    assert matcher.matches('FIREFOX.EXE')
+    assert matcher.matches('word1.exe')
+    assert not matcher.matches('word10.exe')
+    assert not matcher.matches('explorer.exe')
+
+
+def test_invalid_regex_is_skipped():
+    matcher = ProcessMatcher(['re:(', 'notepad.exe'])
+    assert matcher.matches('notepad.exe')
+    assert not matcher.matches('(')
+
+
+def test_empty_target_matches_any_process():
+    matcher = ProcessMatcher([])
+    assert matcher.match_all
+    assert matcher.matches(None)
+    assert not ProcessMatcher('notepad.exe').matches(None)
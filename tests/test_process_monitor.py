@@ -0,0 +1,152 @@
+"""
+Тесты монитора процессов.
+"""
+
+import pytest
+
+from core.process_monitor import ProcessMonitor
+
+
+class FakeProcess:
+    """Заменяет psutil.Process: таблица PID → (время создания, имя)."""
+
+    table = {}
+    name_calls = 0
+    lookups = 0
+
+    def __init__(self, pid):
+        FakeProcess.lookups += 1
+        if pid not in self.table:
+            raise LookupError(pid)
+        self._create_time, self._name = self.table[pid]
+
+    def create_time(self):
+        return self._create_time
+
+    def name(self):
+        FakeProcess.name_calls += 1
+        return self._name
+
+
+@pytest.fixture
+def fake_psutil(monkeypatch):
+    FakeProcess.table = {}
+    FakeProcess.name_calls = 0
+    FakeProcess.lookups = 0
+    monkeypatch.setattr('core.process_monitor.psutil', type('psutil', (), {'Process': FakeProcess}),
+                        raising=False)
+    return FakeProcess
+
+
+def test_pid_cache_hits_skip_system_within_ttl(fake_psutil):
+    monitor = ProcessMonitor()
+    fake_psutil.table[100] = (1.0, 'notepad.exe')
+
+    for _ in range(3):
+        assert monitor._get_process_name(100, hwnd=5) == 'notepad.exe'
+    assert fake_psutil.lookups == 1
+    assert monitor.get_pid_cache_stats()['hits'] == 2
+
+    # Другое окно того же PID проверяется отдельно
+    assert monitor._get_process_name(100, hwnd=6) == 'notepad.exe'
+    assert fake_psutil.lookups == 2
+
+
+def test_pid_cache_hits_and_pid_reuse(fake_psutil, monkeypatch):
+    # Без TTL каждое обращение сверяет время создания процесса
+    monkeypatch.setattr('core.process_monitor.PID_CACHE_TTL', 0)
+    monitor = ProcessMonitor()
+    fake_psutil.table[100] = (1.0, 'notepad.exe')
+
+    assert monitor._get_process_name(100) == 'notepad.exe'
+    assert monitor._get_process_name(100) == 'notepad.exe'
+    assert fake_psutil.name_calls == 1
+    assert monitor.get_pid_cache_stats()['hits'] == 1
+
+    # Тот же PID у нового процесса: другое время создания, имя запрашивается заново
+    fake_psutil.table[100] = (2.0, 'chrome.exe')
+    assert monitor._get_process_name(100) == 'chrome.exe'
+    assert fake_psutil.name_calls == 2
+
+
+def test_pid_cache_evicts_least_recently_used(fake_psutil, monkeypatch):
+    monkeypatch.setattr('core.process_monitor.PID_CACHE_SIZE', 2)
+    monitor = ProcessMonitor()
+    for pid in (1, 2, 3):
+        fake_psutil.table[pid] = (0.0, f'p{pid}.exe')
+
+    monitor._get_process_name(1)
+    monitor._get_process_name(2)
+    monitor._get_process_name(1)
+    monitor._get_process_name(3)
+    assert fake_psutil.name_calls == 3
+
+    # PID 1 использовался недавно и остался в кэше, PID 2 вытеснен
+    monitor._get_process_name(1)
+    assert fake_psutil.name_calls == 3
+    monitor._get_process_name(2)
+    assert fake_psutil.name_calls == 4
+
+
+def test_state_version_changes_only_with_process_or_match():
+    from core.foreground_source import ScriptedForegroundSource
+
+    source = ScriptedForegroundSource((1, 'notepad.exe'))
+    monitor = ProcessMonitor(source=source)
+    monitor.start_monitoring()
+    first = monitor.state
+    assert (first.pid, first.name, first.is_target, first.version) == (1, 'notepad.exe', None, 1)
+
+    watched = monitor.watch('notepad.exe')
+    assert (watched.is_target, watched.version) == (True, 2)
+    assert monitor.watch('notepad.exe').version == 2
+
+    source.emit(2, 'code.exe')
+    state = monitor.state
+    assert (state.pid, state.name, state.is_target, state.version) == (2, 'code.exe', False, 3)
+    assert first.name == 'notepad.exe'
+
+    with pytest.raises(AttributeError):
+        state.name = 'other.exe'
+    monitor.stop_monitoring()
+
+
+def test_refresh_state_uses_push_source_without_query(monkeypatch):
+    from core.foreground_source import ScriptedForegroundSource
+
+    monitor = ProcessMonitor(source=ScriptedForegroundSource((1, 'notepad.exe')))
+    monkeypatch.setattr(monitor, '_query_foreground', lambda: pytest.fail('queried the system'))
+    monitor.start_monitoring()
+    assert monitor.refresh_state().name == 'notepad.exe'
+    monitor.stop_monitoring()
+
+    # Проверка без смены окна обновляет только время
+    monkeypatch.setattr(monitor, '_query_foreground', lambda: (3, 'explorer.exe'))
+    monkeypatch.setattr('core.process_monitor.time.time', lambda: 50.0)
+    state = monitor.refresh_state()
+    assert (state.name, state.timestamp) == ('explorer.exe', 50.0)
+    monkeypatch.setattr('core.process_monitor.time.time', lambda: 60.0)
+    assert monitor.refresh_state().timestamp == 60.0
+    assert monitor.state.version == state.version
+
+
+def test_wait_for_change_blocks_until_new_version():
+    import threading
+
+    from core.foreground_source import ScriptedForegroundSource
+
+    source = ScriptedForegroundSource((1, 'notepad.exe'))
+    monitor = ProcessMonitor(source=source)
+    monitor.start_monitoring()
+    version = monitor.state.version
+
+    assert monitor.wait_for_change(version, timeout=0.01).version == version
+
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(monitor.wait_for_change(version, timeout=2.0)))
+    waiter.start()
+    source.emit(2, 'code.exe')
+    waiter.join(timeout=2.0)
+    assert [state.name for state in results] == ['code.exe']
+    assert results[0].version == version + 1
+    monitor.stop_monitoring()
@@ -0,0 +1,313 @@
+"""
+Сквозные тесты сеанса переназначения на SimulatedBackend.
+"""
+
+import time
+
+from core.event_bus import Topic
+from models.profile import Profile
+
+from tests.conftest import wait_until
+
+
+def injected(backend):
+    """Отправленные бэкендом события как пары (вид, значение)."""
+    return [(event.kind, event.value) for event in backend.injected_events]
+
+
+def test_mapping_types_text_only_in_target_process(backend, make_session):
+    session = make_session({'f1': '"hello"'}, injection_mode='type').start()
+
+    assert backend.simulate_tap('f1') is True
+    assert wait_until(lambda: backend.injected_text() == 'hello')
+
+    session.focus(2, 'explorer.exe')
+    assert backend.simulate_tap('f1') is False
+    session.stop()
+    assert backend.injected_text() == 'hello'
+
+
+def test_global_hook_dispatch(backend, make_session):
+    session = make_session({'ctrl+j': '"x"'}, injection_mode='type').start()
+
+    assert backend.simulate_hotkey('ctrl+j') is True
+    assert wait_until(lambda: backend.injected_text() == 'x')
+    session.stop()
+
+
+def test_key_sequence_through_session(backend, make_session):
+    session = make_session({'ctrl+k, ctrl+d': '"kd"', 'ctrl+k': '"k"'},
+                           injection_mode='type', sequence_timeout=0.1).start()
+
+    backend.simulate_hotkey('ctrl+k')
+    backend.simulate_hotkey('ctrl+d')
+    assert wait_until(lambda: backend.injected_text() == 'kd')
+    backend.simulate_hotkey('ctrl+k')
+    assert wait_until(lambda: backend.injected_text() == 'kdk')
+    session.stop()
+
+
+def test_hotstring_through_session(backend, make_session):
+    session = make_session({}, injection_mode='type')
+    session.remapper.config_manager.get_current_profile().hotstrings = {'btw': '"by the way"'}
+    session.start()
+
+    for char in 'btw':
+        backend.simulate_tap(char)
+    assert wait_until(lambda: backend.injected_text() == 'by the way')
+    assert sum(1 for event in backend.injected_events if event.value == 'backspace') == 2
+    session.stop()
+
+
+def test_injected_combo_does_not_retrigger_mapping(make_session):
+    from core.input_backend import SimulatedBackend
+
+    backend = SimulatedBackend(echo_injected=True)
+    session = make_session({'f1': 'ctrl+v', 'ctrl+v': '"pasted"'}, input_backend=backend,
+                           injection_mode='type', native_remaps=False).start()
+
+    backend.simulate_tap('f1')
+    assert wait_until(lambda: any(event.value == 'ctrl+v' for event in backend.injected_events))
+    session.stop()
+    assert backend.injected_text() == ''
+
+
+def test_profile_switches_with_focus(backend, make_session):
+    session = make_session({'f1': '"default"'}, injection_mode='type', auto_switch_profiles=True)
+    config = session.remapper.config_manager
+    config.profiles['code'] = Profile(name='code', mappings={'f1': '"code"'}, target_process='code.exe')
+    switches = []
+    session.remapper.event_bus.subscribe(Topic.PROFILE_SWITCHED, lambda event: switches.append(event['profile_name']))
+    session.start()
+
+    session.focus(2, 'code.exe')
+    assert session.remapper.get_active_profile_name() == 'code'
+    backend.simulate_tap('f1')
+    assert wait_until(lambda: backend.injected_text() == 'code')
+
+    session.focus(1, 'notepad.exe')
+    backend.simulate_tap('f1')
+    assert wait_until(lambda: backend.injected_text() == 'codedefault')
+    assert switches[-2:] == ['code', 'default']
+    session.stop()
+
+
+def test_update_mappings_while_running(backend, make_session):
+    session = make_session({'f1': '"a"'}, injection_mode='type').start()
+
+    result = session.remapper.update_mappings({'f2': '"b"'})
+    assert result == {'added': ['f2'], 'removed': ['f1'], 'changed': []}
+    assert backend.simulate_tap('f1') is False
+    backend.simulate_tap('f2')
+    assert wait_until(lambda: backend.injected_text() == 'b')
+    session.stop()
+
+
+def test_asyncio_runtime_session(backend, make_session):
+    session = make_session({'f1': '"a"'}, injection_mode='type', runtime='asyncio').start()
+
+    backend.simulate_tap('f1')
+    assert wait_until(lambda: backend.injected_text() == 'a')
+    session.stop()
+    assert backend.simulate_tap('f1') is False
+
+
+def test_reload_reregisters_key_that_becomes_sequence_prefix(backend, make_session):
+    session = make_session({'f5': '"k"'}, injection_mode='type', sequence_timeout=0.05).start()
+    remapper = session.remapper
+
+    remapper.update_mappings({'f5': '"k"', 'f5, f6': '"kd"'})
+    backend.simulate_tap('f5')
+    assert backend.simulate_tap('f6') is True
+    assert wait_until(lambda: backend.injected_text() == 'kd')
+    backend.simulate_tap('f5')
+    assert wait_until(lambda: backend.injected_text() == 'kdk')
+
+    # Без последовательности f5 срабатывает сам, а f6 доходит до приложения
+    remapper.update_mappings({'f5': '"k"'})
+    backend.simulate_tap('f5')
+    assert backend.simulate_tap('f6') is False
+    assert wait_until(lambda: backend.injected_text() == 'kdkk')
+    session.stop()
+
+
+def test_reload_switches_between_native_remap_and_handler(backend, make_session):
+    session = make_session({'f1': 'f2'}, injection_mode='type').start()
+    remapper = session.remapper
+    # Прямое переназначение отправляет нажатие и отпускание сразу, в потоке хука
+    assert backend.simulate_tap('f1') is True
+    assert injected(backend) == [('press', 'f2'), ('release', 'f2')]
+
+    remapper.update_mappings({'f1': '"x"'})
+    backend.clear_injected()
+    backend.simulate_tap('f1')
+    assert wait_until(lambda: backend.injected_text() == 'x')
+    assert injected(backend) == [('write', 'x')]
+
+    remapper.update_mappings({'f1': 'f3'})
+    backend.clear_injected()
+    assert backend.simulate_tap('f1') is True
+    assert injected(backend) == [('press', 'f3'), ('release', 'f3')]
+    session.stop()
+
+
+def test_native_remaps_follow_target_focus(backend, make_session):
+    session = make_session({'f1': 'f2', 'ctrl+j': 'ctrl+c'}, injection_mode='type').start()
+
+    assert backend.simulate_tap('f1') is True
+    assert backend.simulate_hotkey('ctrl+j') is True
+    assert injected(backend) == [('press', 'f2'), ('release', 'f2'), ('send', 'ctrl+c')]
+
+    session.focus(2, 'explorer.exe')
+    backend.clear_injected()
+    assert backend.simulate_tap('f1') is False
+    assert backend.simulate_hotkey('ctrl+j') is False
+    assert backend.injected_events == []
+
+    session.focus(1, 'notepad.exe')
+    assert backend.simulate_tap('f1') is True
+    session.stop()
+
+    # После остановки переназначения сняты
+    backend.clear_injected()
+    assert backend.simulate_tap('f1') is False
+    assert backend.injected_events == []
+
+
+def test_native_remaps_disabled_under_polling(backend, make_session, monkeypatch):
+    from core.foreground_source import PollingForegroundSource
+
+    current = [(1, 'notepad.exe')]
+    session = make_session({'f1': 'f2'}, injection_mode='type')
+    monitor = session.remapper.process_monitor
+    monkeypatch.setattr('core.process_monitor.WINDOWS_API_AVAILABLE', True)
+    monkeypatch.setattr(monitor, '_query_foreground', lambda: current[0])
+    # Опрос еще не дошел до смены окна: источник по-прежнему видит notepad.exe
+    monitor.source = PollingForegroundSource(lambda: (1, 'notepad.exe'), interval=0.2)
+    session.start()
+
+    assert backend.simulate_tap('f1') is True
+    assert wait_until(lambda: [event.value for event in backend.injected_events] == ['f2'])
+
+    # Переназначение библиотеки подавляло бы f1 в чужом окне до следующего опроса
+    current[0] = (2, 'explorer.exe')
+    time.sleep(monitor.check_interval)
+    backend.clear_injected()
+    assert backend.simulate_tap('f1') is False
+    session.stop()
+    assert backend.injected_events == []
+
+
+def test_native_remap_output_is_recorded_in_ledger(make_session):
+    from core.input_backend import SimulatedBackend
+
+    # Без флага is_injected отправленное переназначением f2 распознается только по журналу
+    backend = SimulatedBackend(echo_injected=True, tag_injected=False)
+    session = make_session({'f1': 'f2', 'f2': '"x"'}, input_backend=backend, injection_mode='type').start()
+
+    assert backend.simulate_tap('f1') is True
+    session.stop()
+    assert injected(backend) == [('press', 'f2'), ('release', 'f2')]
+    assert backend.injected_text() == ''
+
+
+def test_modifier_combo_outside_target_reaches_app_with_modifier(backend, make_session):
+    session = make_session({'ctrl+1': '"x"', 'f1': '"y"'}, injection_mode='type').start()
+    session.focus(2, 'explorer.exe')
+
+    assert backend.simulate_hotkey('ctrl+1') is False
+    assert backend.delivered == [('down', 'ctrl'), ('down', '1'), ('up', '1'), ('up', 'ctrl')]
+
+    session.focus(1, 'notepad.exe')
+    assert backend.simulate_hotkey('ctrl+1') is True
+    assert wait_until(lambda: backend.injected_text() == 'x')
+    session.stop()
+
+
+def test_fallback_hotkey_only_for_keys_without_modifiers(backend, make_session):
+    # Клавиши без скан-кода не попадают в единый хук: без модификаторов их берет add_hotkey
+    session = make_session({'numpad 1': '"x"', 'ctrl+numpad 2': '"y"'}, foreground=(2, 'explorer.exe'),
+                           injection_mode='type').start()
+
+    assert backend.simulate_tap('numpad 1') is False
+    assert backend.delivered == [('down', 'numpad 1'), ('up', 'numpad 1')]
+
+    # Комбинацию add_hotkey пропустил бы без ctrl, поэтому она не регистрируется
+    backend.clear_injected()
+    assert backend.simulate_hotkey('ctrl+numpad 2') is False
+    assert backend.delivered == [('down', 'ctrl'), ('down', 'numpad 2'), ('up', 'numpad 2'), ('up', 'ctrl')]
+
+    session.focus(1, 'notepad.exe')
+    assert backend.simulate_tap('numpad 1') is True
+    assert wait_until(lambda: backend.injected_text() == 'x')
+    session.stop()
+
+
+def write_config(path, mappings):
+    import json
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'current_profile': 'default',
+                   'profiles': {'default': {'mappings': mappings, 'target_process': 'notepad.exe'}}}, f)
+
+
+def test_config_change_applied_after_it_settles(backend, make_session, isolated_files):
+    session = make_session({'f1': '"a"'}, injection_mode='type').start()
+    remapper = session.remapper
+    config_file = isolated_files / 'key_config.json'
+
+    write_config(config_file, {'f2': '"b"'})
+    remapper._check_config_changed()
+    assert remapper.mappings == {'f1': '"a"'}
+
+    # Файл не менялся одну проверку - изменение применяется
+    remapper._check_config_changed()
+    assert remapper.mappings == {'f2': '"b"'}
+    assert backend.simulate_tap('f1') is False
+    assert backend.simulate_tap('f2') is True
+
+    # Ошибочный файл не трогает назначения сеанса
+    config_file.write_text('{"profiles": ', encoding='utf-8')
+    remapper._check_config_changed()
+    remapper._check_config_changed()
+    assert remapper.mappings == {'f2': '"b"'}
+    assert backend.simulate_tap('f1') is False
+    assert backend.simulate_tap('f2') is True
+    session.stop()
+    assert wait_until(lambda: backend.injected_text() == 'bb')
+
+
+def test_learned_threshold_does_not_replace_user_setting(backend):
+    from core.remapper import KeyboardRemapper
+    from tests.test_text_injector import teach
+
+    remapper = KeyboardRemapper(backend)
+    settings = remapper.settings_manager
+    settings.set_setting('direct_type_max_ascii', 8)
+    remapper._configure_injector()
+    teach(remapper.action_executor.text_injector, paste_ns=1000, type_char_ns=100)
+
+    remapper._save_learned_settings()
+    assert settings.get_setting('direct_type_max_ascii') == 8
+    assert settings.get_setting('direct_type_learned_ascii') == 10
+    assert remapper.action_executor.text_injector.ascii_threshold == 8
+
+
+def test_sequences_of_other_profile_do_not_consume_keys(backend, make_session):
+    session = make_session({'ctrl+k': '"k"'}, injection_mode='type', auto_switch_profiles=True,
+                           sequence_timeout=5.0)
+    config = session.remapper.config_manager
+    config.profiles['code'] = Profile(name='code', mappings={'ctrl+k, ctrl+d': '"kd"'},
+                                      target_process='code.exe')
+    session.start()
+
+    # В профиле default Ctrl+K срабатывает сразу, а Ctrl+D не поглощается
+    assert backend.simulate_hotkey('ctrl+k') is True
+    assert wait_until(lambda: backend.injected_text() == 'k', timeout=0.5)
+    assert backend.simulate_hotkey('ctrl+d') is False
+
+    session.focus(2, 'code.exe')
+    backend.simulate_hotkey('ctrl+k')
+    backend.simulate_hotkey('ctrl+d')
+    assert wait_until(lambda: backend.injected_text() == 'kkd')
+    session.stop()
@@ -0,0 +1,55 @@
+"""
+Тесты выбора способа вставки текста.
+"""
+
+from core.text_injector import DEFAULT_DIRECT_TYPE_MAX_ASCII, LEARN_MIN_SAMPLES, TextInjector
+
+
+def teach(injector, paste_ns, type_char_ns):
+    for _ in range(LEARN_MIN_SAMPLES):
+        injector._learn('paste', 100, paste_ns)
+        injector._learn('type', 1, type_char_ns)
+
+
+def test_choose_method_by_length_and_content(backend):
+    injector = TextInjector(backend)
+
+    assert injector.choose_method('°') == 'type'
+    assert injector.choose_method('hello') == 'type'
+    assert injector.choose_method('x' * (DEFAULT_DIRECT_TYPE_MAX_ASCII + 1)) == 'paste'
+    assert injector.choose_method('line\nline') == 'paste'
+    assert injector.choose_method('привет') == 'paste'
+
+    backend.clipboard_available = False
+    assert injector.choose_method('привет') == 'type'
+
+
+def test_paste_and_type_inject_same_text(backend):
+    injector = TextInjector(backend)
+    injector.configure(clipboard_restore_delay=0, clipboard_timeout=0)
+
+    assert injector.inject('привет') == 'paste'
+    assert injector.inject('hi') == 'type'
+    assert backend.injected_text() == 'приветhi'
+    injector.clipboard_session.flush()
+
+
+def test_threshold_prefers_user_value_over_learned(backend):
+    injector = TextInjector(backend)
+    teach(injector, paste_ns=1000, type_char_ns=100)
+    assert injector.learned_threshold == 10
+    assert injector.ascii_threshold == 10
+
+    injector.configure(direct_type_max_ascii=4)
+    assert injector.ascii_threshold == 4
+    assert injector.choose_method('hello') == 'paste'
+
+
+def test_threshold_from_previous_run_until_relearned(backend):
+    injector = TextInjector(backend)
+    injector.configure(learned_ascii=20)
+    assert injector.learned_threshold is None
+    assert injector.ascii_threshold == 20
+
+    injector.configure(learned_ascii=20, adaptive=False)
+    assert injector.ascii_threshold == DEFAULT_DIRECT_TYPE_MAX_ASCII
@@ -0,0 +1,69 @@
+"""
+Тесты порционного ввода текста и корзины токенов.
+"""
+
+import pytest
+
+from core.typing_engine import TokenBucket, TypingEngine
+
+
+class FakeClock:
+    """Замена модуля time: sleep сдвигает время, а не ждет."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    perf_counter = monotonic
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr('core.typing_engine.time', clock)
+    return clock
+
+
+def test_token_bucket_burst_then_rate(clock):
+    bucket = TokenBucket(rate=10, capacity=5)
+
+    assert bucket.acquire(5) == 0.0
+    assert bucket.acquire(5) == pytest.approx(0.5)
+
+    # За секунду простоя корзина наполняется не больше capacity
+    clock.now += 1.0
+    assert bucket.acquire(5) == 0.0
+    assert bucket.acquire(1) == pytest.approx(0.1)
+
+
+def test_token_bucket_without_limit(clock):
+    bucket = TokenBucket(rate=0, capacity=1)
+    assert bucket.acquire(1000) == 0.0
+    assert clock.slept == []
+
+
+def test_text_typed_in_chunks_with_enter(backend, clock):
+    engine = TypingEngine(backend, chunk_size=3)
+    engine.type_text('abcdefg\nhi')
+
+    assert [(event.kind, event.value) for event in backend.injected_events] == [
+        ('write', 'abc'), ('write', 'def'), ('write', 'g'), ('send', 'enter'), ('write', 'hi'),
+    ]
+    assert engine.total_chars == 10
+
+
+def test_rate_limit_and_chunk_delay(backend, clock):
+    engine = TypingEngine(backend)
+    engine.configure(chunk_size=4, rate_limit=8, chunk_delay=0.01)
+    engine.type_text('x' * 12)
+
+    # Первая порция из запаса корзины, следующие ждут токены (пауза между порциями тоже их копит)
+    assert clock.slept == pytest.approx([0.5, 0.01, 0.49, 0.01])
+    assert backend.injected_text() == 'x' * 12
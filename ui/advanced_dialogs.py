@@ -221,8 +221,8 @@ def backup_info_dialog(backup_manager: BackupManager) -> None:
 
 def macro_recording_dialog(remapper) -> None:
     """Диалог записи макросов."""
-    recorder = MacroRecorder()
-    macro_manager = MacroManager(remapper.config_manager)
+    recorder = MacroRecorder(remapper.backend)
+    macro_manager = MacroManager(remapper.config_manager, remapper.event_bus)
 
     while True:
         clear_screen()
@@ -266,15 +266,14 @@ def start_macro_recording(recorder: MacroRecorder, macro_manager: MacroManager)
 
         # Ждем завершения записи
         try:
-            import keyboard
-            keyboard.wait('f12')
+            recorder.backend.wait(recorder.STOP_KEY)
         except KeyboardInterrupt:
             pass
 
         events = recorder.stop_recording()
         if events:
             print(f"✅ Записано {len(events)} событий")
-            save_recorded_macro_dialog(events, macro_manager)
+            save_recorded_macro_dialog(recorder, events, macro_manager)
         else:
             print("❌ Не было записано ни одного события")
     else:
@@ -283,7 +282,7 @@ def start_macro_recording(recorder: MacroRecorder, macro_manager: MacroManager)
     input("Нажмите Enter для продолжения...")
 
 
-def save_recorded_macro_dialog(events: List[Dict], macro_manager: MacroManager) -> None:
+def save_recorded_macro_dialog(recorder: MacroRecorder, events: List[Dict], macro_manager: MacroManager) -> None:
     """Диалог сохранения записанного макроса."""
     if not events:
         return
@@ -388,7 +387,7 @@ def create_manual_macro_dialog(macro_manager: MacroManager) -> None:
         value = input("Введите текст: ").strip()
     elif choice == '2':
         action_type = "action"
-        print("Доступные действия: date_long, date_short, datetime, time")
+        print("Доступные действия: date_long, date_short, datetime, time, date:%Y-%m-%d")
         print("Или символы: symbol:plus, symbol:arrow_left, etc.")
         value = input("Введите действие: ").strip()
     elif choice == '3':
@@ -457,6 +456,106 @@ def import_macros_dialog(macro_manager: MacroManager, mappings: Dict[str, str])
     input("Нажмите Enter для продолжения...")
 
 
+def hotstrings_dialog(remapper) -> None:
+    """Диалог управления сокращениями (автозамена при наборе)."""
+    from utils.formatters import get_action_display
+
+    while True:
+        clear_screen()
+        profile = remapper.config_manager.get_current_profile()
+        print("\n⌨️  СОКРАЩЕНИЯ")
+        print("=" * 30)
+        print(f"Профиль: {profile.name}")
+        print("💡 Сокращение заменяется сразу после ввода последнего символа")
+
+        if profile.hotstrings:
+            print("\n📋 Текущие сокращения:")
+            for abbreviation, action in sorted(profile.hotstrings.items()):
+                print(f"  {abbreviation} → {get_action_display(action)}")
+        else:
+            print("\n📝 Сокращений нет")
+
+        print("\n1. ➕ Добавить сокращение")
+        print("2. ❌ Удалить сокращение")
+        print("0. 🔙 Назад")
+
+        choice = input("\n🎯 Выберите действие: ").strip()
+
+        if choice == '1':
+            add_hotstring_dialog(remapper)
+        elif choice == '2':
+            remove_hotstring_dialog(remapper)
+        elif choice == '0':
+            break
+        else:
+            print("❌ Неверный выбор")
+        input("Нажмите Enter для продолжения...")
+
+
+def add_hotstring_dialog(remapper) -> None:
+    """Диалог добавления сокращения."""
+    abbreviation = input("Введите сокращение (например, ;sig): ")
+    if not abbreviation.strip() or abbreviation != abbreviation.strip():
+        print("❌ Сокращение не может быть пустым или начинаться/заканчиваться пробелом")
+        return
+
+    print("\n1. Текст")
+    print("2. Макрос")
+    print("3. Другое действие (date:%Y-%m-%d, symbol:degree, ...)")
+    choice = input("Что вставлять: ").strip()
+
+    if choice == '1':
+        text = input("Введите текст: ").strip()
+        action = f'"{text}"' if text else None
+    elif choice == '2':
+        macros = remapper.get_macro_manager().list_macros()
+        if not macros:
+            print("📝 Макросы не найдены")
+            return
+        for i, macro in enumerate(macros, 1):
+            print(f"{i}. {macro.name} - {macro.description}")
+        try:
+            index = int(input("Выберите макрос: ").strip())
+        except ValueError:
+            print("❌ Введите число")
+            return
+        if not 1 <= index <= len(macros):
+            print("❌ Неверный номер")
+            return
+        action = f"macro:{macros[index - 1].name}"
+    elif choice == '3':
+        action = input("Введите действие: ").strip() or None
+    else:
+        print("❌ Неверный выбор")
+        return
+
+    if not action:
+        print("❌ Действие не может быть пустым")
+        return
+
+    profile = remapper.config_manager.get_current_profile()
+    profile.hotstrings[abbreviation] = action
+    if remapper.save_config(show_message=False):
+        print(f"✅ Сокращение {abbreviation} добавлено")
+    else:
+        print("❌ Ошибка сохранения")
+
+
+def remove_hotstring_dialog(remapper) -> None:
+    """Диалог удаления сокращения."""
+    profile = remapper.config_manager.get_current_profile()
+    abbreviation = input("Введите сокращение для удаления: ")
+    if abbreviation not in profile.hotstrings:
+        print("❌ Сокращение не найдено")
+        return
+
+    del profile.hotstrings[abbreviation]
+    if remapper.save_config(show_message=False):
+        print(f"✅ Сокращение {abbreviation} удалено")
+    else:
+        print("❌ Ошибка сохранения")
+
+
 def quick_profile_dialog(remapper) -> None:
     """Диалог быстрых профилей."""
     templates = list_quick_profile_templates()
@@ -540,7 +639,7 @@ def create_quick_profile_from_template(remapper, template: Dict[str, Any]) -> No
 
 def settings_dialog(remapper) -> None:
     """Диалог настроек приложения."""
-    settings_manager = SettingsManager()
+    settings_manager = remapper.get_settings_manager()
     autostart_manager = AutoStartManager()
 
     while True:
@@ -623,17 +722,43 @@ def delay_settings_dialog(settings_manager: SettingsManager) -> None:
     current_delay = settings_manager.get_setting('typing_delay')
     current_clipboard_timeout = settings_manager.get_setting('clipboard_timeout')
     current_process_check = settings_manager.get_setting('process_check_frequency')
+    injection_mode = settings_manager.get_setting('injection_mode')
+    direct_type_max_ascii = settings_manager.get_setting('direct_type_max_ascii')
+    direct_type_learned_ascii = settings_manager.get_setting('direct_type_learned_ascii')
+    adaptive_injection = settings_manager.get_setting('adaptive_injection')
+    auto_calibrate_paste = settings_manager.get_setting('auto_calibrate_paste')
+    paste_settle_delays = settings_manager.get_setting('paste_settle_delays') or {}
+    typing_rate_limit = settings_manager.get_setting('typing_rate_limit')
+
+    injection_names = {'auto': 'Автовыбор', 'paste': 'Буфер обмена', 'type': 'Прямой ввод'}
 
     print(f"\n⏱️  ТЕКУЩИЕ ЗАДЕРЖКИ")
     print("=" * 30)
     print(f"Задержка печати: {current_delay} сек")
+    print(f"Ограничение скорости печати: {f'{typing_rate_limit} симв/с' if typing_rate_limit else 'нет'}")
     print(f"Таймаут буфера обмена: {current_clipboard_timeout} сек")
     print(f"Частота проверки процессов: {current_process_check} сек")
+    print(f"Способ вставки текста: {injection_names.get(injection_mode, injection_mode)}")
+    if direct_type_max_ascii is not None:
+        print(f"Прямой ввод ASCII до: {direct_type_max_ascii} симв.")
+    else:
+        auto_limit = direct_type_learned_ascii if adaptive_injection and direct_type_learned_ascii else 32
+        print(f"Прямой ввод ASCII до: {auto_limit} симв. "
+              f"({'автоматически, обучается' if adaptive_injection else 'автоматически'})")
+    print(f"Автокалибровка паузы вставки: {'Включена' if auto_calibrate_paste else 'Выключена'}")
+    for process_name, delay in sorted(paste_settle_delays.items()):
+        print(f"  {process_name}: {delay * 1000:.0f} мс")
 
     print("\n1. ✏️  Изменить задержку печати")
     print("2. ✏️  Изменить таймаут буфера обмена")
     print("3. ✏️  Изменить частоту проверки процессов")
-    print("4. 🔙 Назад")
+    print("4. 📝 Изменить способ вставки текста")
+    print("5. ✏️  Изменить порог прямого ввода ASCII")
+    print("6. 🔄 Переключить обучение порога")
+    print("7. ⌨️  Изменить ограничение скорости печати")
+    print("8. 🔄 Переключить автокалибровку паузы вставки")
+    print("9. 🗑️  Сбросить откалиброванные паузы")
+    print("10. 🔙 Назад")
 
     choice = input("\nВыберите действие: ").strip()
 
@@ -679,6 +804,83 @@ def delay_settings_dialog(settings_manager: SettingsManager) -> None:
         except ValueError:
             print("❌ Введите число")
 
+    elif choice == '4':
+        print("\nСпособы вставки текста:")
+        print("1. Автовыбор - короткий текст печатается, длинный вставляется (рекомендуется)")
+        print("2. Буфер обмена - всегда через Ctrl+V")
+        print("3. Прямой ввод - всегда печатать посимвольно")
+
+        mode_choice = input("Выберите способ: ").strip()
+        modes = {'1': 'auto', '2': 'paste', '3': 'type'}
+
+        if mode_choice in modes:
+            if settings_manager.set_setting('injection_mode', modes[mode_choice]):
+                print(f"✅ Способ вставки: {injection_names[modes[mode_choice]]}")
+            else:
+                print("❌ Ошибка изменения настройки")
+        else:
+            print("❌ Неверный выбор")
+
+    elif choice == '5':
+        current_limit = direct_type_max_ascii if direct_type_max_ascii is not None else 'авто'
+        new_limit = input(f"Введите максимальную длину ASCII для прямого ввода "
+                          f"(текущая: {current_limit}, пусто - автоматически): ").strip()
+        if not new_limit:
+            if settings_manager.set_setting('direct_type_max_ascii', None):
+                print("✅ Порог прямого ввода выбирается автоматически")
+            else:
+                print("❌ Ошибка изменения настройки")
+        else:
+            try:
+                new_limit_int = int(new_limit)
+                if 0 <= new_limit_int <= 64:
+                    if settings_manager.set_setting('direct_type_max_ascii', new_limit_int):
+                        print("✅ Порог прямого ввода изменен")
+                    else:
+                        print("❌ Ошибка изменения настройки")
+                else:
+                    print("❌ Порог должен быть между 0 и 64 символами")
+            except ValueError:
+                print("❌ Введите число")
+
+    elif choice == '6':
+        new_value = not adaptive_injection
+        if settings_manager.set_setting('adaptive_injection', new_value):
+            status = "включено" if new_value else "выключено"
+            print(f"✅ Обучение порога {status}")
+        else:
+            print("❌ Ошибка изменения настройки")
+
+    elif choice == '7':
+        new_rate = input(f"Введите скорость печати в символах в секунду, 0 - без ограничения (текущая: {typing_rate_limit}): ").strip()
+        try:
+            new_rate_int = int(new_rate)
+            if 0 <= new_rate_int <= 10000:
+                if settings_manager.set_setting('typing_rate_limit', new_rate_int):
+                    print("✅ Ограничение скорости печати изменено")
+                else:
+                    print("❌ Ошибка изменения настройки")
+            else:
+                print("❌ Скорость должна быть между 0 и 10000 символов в секунду")
+        except ValueError:
+            print("❌ Введите число")
+
+    elif choice == '8':
+        new_value = not auto_calibrate_paste
+        if settings_manager.set_setting('auto_calibrate_paste', new_value):
+            status = "включена" if new_value else "выключена"
+            print(f"✅ Автокалибровка паузы вставки {status}")
+            if new_value:
+                print("💡 Паузы измеряются по чтению буфера обмена во время переназначения")
+        else:
+            print("❌ Ошибка изменения настройки")
+
+    elif choice == '9':
+        if settings_manager.set_setting('paste_settle_delays', {}):
+            print("✅ Откалиброванные паузы сброшены")
+        else:
+            print("❌ Ошибка изменения настройки")
+
     input("Нажмите Enter для продолжения...")
 
 
@@ -795,17 +997,26 @@ def advanced_settings_dialog(settings_manager: SettingsManager) -> None:
     debug_mode = settings_manager.get_setting('debug_mode')
     log_level = settings_manager.get_setting('log_level')
     start_minimized = settings_manager.get_setting('start_minimized')
+    auto_switch_profiles = settings_manager.get_setting('auto_switch_profiles')
+    live_reload = settings_manager.get_setting('live_reload')
+    runtime = settings_manager.get_setting('runtime')
 
     print(f"\n🔧 РАСШИРЕННЫЕ НАСТРОЙКИ")
     print("=" * 30)
     print(f"Режим отладки: {'Включен' if debug_mode else 'Выключен'}")
     print(f"Уровень логирования: {log_level}")
     print(f"Запуск свернутым: {'Да' if start_minimized else 'Нет'}")
+    print(f"Автопереключение профилей по процессу: {'Да' if auto_switch_profiles else 'Нет'}")
+    print(f"Применение изменений конфигурации на лету: {'Да' if live_reload else 'Нет'}")
+    print(f"Среда выполнения сеанса: {'Цикл asyncio' if runtime == 'asyncio' else 'Потоки'}")
 
     print("\n1. 🔄 Переключить режим отладки")
     print("2. 📊 Изменить уровень логирования")
     print("3. 🔄 Переключить запуск свернутым")
-    print("4. 🔙 Назад")
+    print("4. 🔀 Переключить автопереключение профилей")
+    print("5. 🔄 Переключить применение изменений на лету")
+    print("6. ⚙️  Переключить среду выполнения сеанса")
+    print("7. 🔙 Назад")
 
     choice = input("\nВыберите действие: ").strip()
 
@@ -844,6 +1055,30 @@ def advanced_settings_dialog(settings_manager: SettingsManager) -> None:
         else:
             print("❌ Ошибка изменения настройки")
 
+    elif choice == '4':
+        new_value = not auto_switch_profiles
+        if settings_manager.set_setting('auto_switch_profiles', new_value):
+            status = "включено" if new_value else "выключено"
+            print(f"✅ Автопереключение профилей {status}")
+        else:
+            print("❌ Ошибка изменения настройки")
+
+    elif choice == '5':
+        new_value = not live_reload
+        if settings_manager.set_setting('live_reload', new_value):
+            status = "включено" if new_value else "выключено"
+            print(f"✅ Применение изменений на лету {status}")
+        else:
+            print("❌ Ошибка изменения настройки")
+
+    elif choice == '6':
+        new_runtime = 'threads' if runtime == 'asyncio' else 'asyncio'
+        if settings_manager.set_setting('runtime', new_runtime):
+            runtime_name = "цикл asyncio" if new_runtime == 'asyncio' else "потоки"
+            print(f"✅ Среда выполнения сеанса: {runtime_name}")
+        else:
+            print("❌ Ошибка изменения настройки")
+
     input("Нажмите Enter для продолжения...")
 
 
@@ -8,7 +8,7 @@ from typing import Optional, List
 
 from utils.validators import validate_key, safe_input
 from utils.helpers import input_multiline_text, select_symbol_from_category, select_currency
-from utils.formatters import format_key_display, get_action_display
+from utils.formatters import format_key_display, get_action_display, format_target_process
 
 
 def add_mapping_dialog(remapper) -> None:
@@ -19,7 +19,8 @@ def add_mapping_dialog(remapper) -> None:
     print("  • Цифры: 0-9")
     print("  • Специальные: space, enter, tab, backspace, delete, esc, up, down, left, right, etc.")
     print("  • Комбинации: ctrl+a, alt+f4, shift+f1, win+r, ctrl+shift+a, etc.")
-    print("\n💡 Примеры: F1, a, 5, space, ctrl+c, alt+tab, shift+f1, ctrl+shift+s")
+    print("  • Последовательности через запятую: ctrl+k, ctrl+d")
+    print("\n💡 Примеры: F1, a, 5, space, ctrl+c, alt+tab, shift+f1, ctrl+shift+s, ctrl+k, ctrl+d")
 
     key = input("\nВведите клавишу или комбинацию: ").strip()
     validated_key = validate_key(key)
@@ -55,8 +56,9 @@ def select_action_dialog() -> Optional[str]:
     print("7. Символ валюты")
     print("8. ASCII символ")
     print("9. Комбинация клавиш")
+    print("10. Дата по шаблону")
 
-    choice = input("Ваш выбор (1-9): ").strip()
+    choice = input("Ваш выбор (1-10): ").strip()
 
     action_handlers = {
         '1': get_text_action,
@@ -67,7 +69,8 @@ def select_action_dialog() -> Optional[str]:
         '6': lambda: "time",
         '7': get_currency_action,
         '8': get_symbol_action,
-        '9': get_key_combo_action
+        '9': get_key_combo_action,
+        '10': get_date_format_action
     }
 
     handler = action_handlers.get(choice)
@@ -103,6 +106,29 @@ def get_key_combo_action() -> str:
     return input("Введите комбинацию (например, ctrl+c): ").strip()
 
 
+def get_date_format_action() -> Optional[str]:
+    """Получить действие для даты по шаблону."""
+    from core.datetime_renderer import DateTemplateError, DateTimeRenderer, parse_date_action
+
+    print("\n📅 Поля шаблона: %d день, %-d день без нуля, %m месяц, %B месяц словом,")
+    print("   %b месяц кратко, %Y год, %A день недели, %H:%M:%S время")
+    print("💡 Для английских названий начните шаблон с en: (например, en:%B %d, %Y)")
+    while True:
+        template = input("Введите шаблон (например, %Y-%m-%d): ").strip()
+        if not template:
+            return None
+
+        action = f"date:{template}"
+        pattern, locale = parse_date_action(action)
+        try:
+            preview = DateTimeRenderer().compile(pattern, locale).render()
+        except DateTemplateError as e:
+            print(f"❌ {e}")
+            continue
+        print(f"👀 Пример: {preview}")
+        return action
+
+
 def confirm_overwrite_dialog(key: str, old_action: str, new_action: str) -> bool:
     """Диалог подтверждения перезаписи."""
     display_key = format_key_display(key)
@@ -516,14 +542,17 @@ def change_target_process_dialog(remapper) -> None:
     """Диалог изменения целевого процесса."""
     current_profile = remapper.config_manager.get_current_profile()
     print(f"\n⚙️  Изменение целевого процесса")
-    print(f"Текущий процесс: {current_profile.target_process}")
+    print(f"Текущий процесс: {format_target_process(current_profile.target_process)}")
     print(f"Текущий профиль: {current_profile.name}")
+    print("💡 Можно указать несколько процессов через запятую: точные имена (chrome.exe),")
+    print("   шаблоны (*code*.exe) или регулярные выражения с префиксом re: (re:(firefox|chrome)\\.exe)")
 
     new_process = input("Введите имя процесса (или Enter для отмены): ").strip()
     if new_process:
-        current_profile.target_process = new_process
+        patterns = [p.strip() for p in new_process.split(',') if p.strip()]
+        current_profile.target_process = patterns[0] if len(patterns) == 1 else patterns
         remapper.config_manager.save_config()
-        print(f"✅ Целевой процесс изменен на: {new_process}")
+        print(f"✅ Целевой процесс изменен на: {format_target_process(current_profile.target_process)}")
     else:
         print("❌ Отменено")
 
@@ -578,7 +607,7 @@ def show_statistics_dialog(remapper) -> None:
     # Статистика по типам действий
     action_types = {}
     for action in remapper.mappings.values():
-        if action in ["date_long", "date_short", "datetime", "time"]:
+        if action in ["date_long", "date_short", "datetime", "time"] or action.startswith('date:'):
             action_types['Дата/Время'] = action_types.get('Дата/Время', 0) + 1
         elif action.startswith('currency:'):
             action_types['Валюты'] = action_types.get('Валюты', 0) + 1
@@ -596,10 +625,58 @@ def show_statistics_dialog(remapper) -> None:
         for action_type, count in sorted(action_types.items(), key=lambda x: x[1], reverse=True):
             print(f"  • {action_type}: {count}")
 
+    cache_stats = remapper.process_monitor.get_pid_cache_stats()
+    if cache_stats['hits'] or cache_stats['misses']:
+        print(f"\n🗂️  Кэш имен процессов: {cache_stats['size']} записей, "
+              f"попаданий {cache_stats['hits']}, промахов {cache_stats['misses']} "
+              f"({cache_stats['hit_rate']:.0%})")
+
+    typing_stats = remapper.action_executor.text_injector.typing_engine.get_stats()
+    if typing_stats['chars']:
+        print(f"⌨️  Прямой ввод: {typing_stats['chars']} символов, "
+              f"{typing_stats['chars_per_second']:.0f} симв/с")
+
     print("\n📋 Детали по профилям:")
     for profile_name, profile in remapper.config_manager.profiles.items():
         marker = "👉" if profile_name == remapper.config_manager.current_profile_name else "  "
-        print(f"{marker} {profile_name}: {len(profile.mappings)} назначений, процесс: {profile.target_process}")
+        print(f"{marker} {profile_name}: {len(profile.mappings)} назначений, процесс: {format_target_process(profile.target_process)}")
+
+    show_latency_statistics(remapper.latency_tracker)
+
+
+def _format_latency(value_ns: int) -> str:
+    """Форматирует задержку в миллисекундах."""
+    return f"{value_ns / 1_000_000:.2f}"
+
+
+def show_latency_statistics(tracker) -> None:
+    """Показать перцентили задержек конвейера и предложить экспорт."""
+    from core.latency_tracker import STAGE_NAMES
+
+    if not tracker.has_data():
+        print("\n⏱️  Задержки: нет измерений (запустите переназначение)")
+        return
+
+    print("\n⏱️  Задержки по этапам и типам действий (p50 / p95 / p99, мс):")
+    current_stage = None
+    for row in tracker.summary('action_type'):
+        if row['stage'] != current_stage:
+            current_stage = row['stage']
+            print(f"  {STAGE_NAMES.get(current_stage, current_stage)}:")
+        print(f"    • {row['name']}: {_format_latency(row['p50_ns'])} / "
+              f"{_format_latency(row['p95_ns'])} / {_format_latency(row['p99_ns'])} (n={row['count']})")
+
+    key_rows = tracker.summary('key', stage='end_to_end')
+    if key_rows:
+        print("\n⏱️  Полный путь по клавишам (p50 / p95 / p99, мс):")
+        for row in key_rows[:10]:
+            print(f"  • {format_key_display(row['name'])}: {_format_latency(row['p50_ns'])} / "
+                  f"{_format_latency(row['p95_ns'])} / {_format_latency(row['p99_ns'])} (n={row['count']})")
+
+    if input("\nЭкспортировать гистограммы задержек в файл? (y/n): ").strip().lower() == 'y':
+        path = tracker.export()
+        if path:
+            print(f"✅ Гистограммы сохранены: {path}")
 
 
 def show_info_dialog() -> None:
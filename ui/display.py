@@ -1,38 +1,52 @@
 """
 Функции для отображения информации в реальном времени.
 """
-import time
+from core.process_matcher import TargetProcess
 from core.process_monitor import ProcessMonitor
+from utils.formatters import format_target_process
+
+# Как часто строка статуса перерисовывается без смены процесса (секунды)
+STATUS_REDRAW_TIMEOUT = 1.0
 
 
 class RealTimeDisplay:
     """Отображение информации в реальном времени."""
 
     @staticmethod
-    def show_process_status(process_monitor: ProcessMonitor):
+    def show_process_status(process_monitor: ProcessMonitor, target_process: TargetProcess):
         """
         Показывает текущий статус процесса в реальном времени.
 
+        Строка перерисовывается при смене опубликованного состояния
+        монитора, а не опросом активного окна в цикле.
+
         Args:
             process_monitor: Монитор процессов для получения данных
+            target_process: Целевой процесс профиля
         """
         print("\n🖥️  Текущий статус процесса:")
         print("Нажмите Ctrl+C для возврата в меню")
 
+        # Окно статуса держит мониторинг запущенным только пока оно открыто
+        process_monitor.watch(target_process)
+        process_monitor.start_monitoring()
         try:
+            state = process_monitor.refresh_state()
             while True:
-                current_process = process_monitor.get_active_window_process()
-                is_target = process_monitor.is_target_process_active(use_cache=False)
-
-                status_icon = "✅" if is_target else "❌"
+                status_icon = "✅" if state.is_target else "❌"
                 print(
-                    f"\r{status_icon} Активный процесс: {current_process or 'Не определен'} | "
-                    f"Целевой: {process_monitor.target_process} | "
-                    f"Работает: {'ДА' if is_target else 'НЕТ'}",
+                    f"\r{status_icon} Активный процесс: {state.display_name} | "
+                    f"Целевой: {format_target_process(target_process)} | "
+                    f"Работает: {'ДА' if state.is_target else 'НЕТ'}",
                     end="",
                     flush=True
                 )
 
-                time.sleep(0.5)
+                # Короткий таймаут оставляет Ctrl+C рабочим; без монитора состояние обновляется запросом
+                state = process_monitor.wait_for_change(state.version, timeout=STATUS_REDRAW_TIMEOUT)
+                if not process_monitor.monitor_running:
+                    state = process_monitor.refresh_state()
         except KeyboardInterrupt:
-            print("\n\n🔙 Возврат в меню...")
\ No newline at end of file
+            print("\n\n🔙 Возврат в меню...")
+        finally:
+            process_monitor.stop_monitoring()
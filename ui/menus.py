@@ -6,6 +6,7 @@ import time
 from typing import Optional
 
 from utils.helpers import clear_screen
+from utils.formatters import format_target_process
 from ui.dialogs import (
     add_mapping_dialog, edit_mapping_dialog, remove_mapping_dialog,
     test_mapping_dialog, search_mappings_dialog,
@@ -15,16 +16,27 @@ from ui.dialogs import (
     export_profile_dialog, import_profile_dialog, show_statistics_dialog,
     show_info_dialog
 )
+from ui.display import RealTimeDisplay
 from ui.advanced_dialogs import (
     backup_management_dialog, macro_recording_dialog, quick_profile_dialog,
-    settings_dialog
+    settings_dialog, hotstrings_dialog
 )
 
 
+def format_active_process_status(remapper) -> str:
+    """Строка с активным процессом и признаком совпадения с целевым процессом профиля.
+
+    Активное окно запрашивается один раз при отрисовке меню, поэтому
+    монитор процессов в меню не запускается.
+    """
+    monitor = remapper.process_monitor
+    monitor.watch(remapper.config_manager.get_current_profile().target_process)
+    state = monitor.refresh_state()
+    return f"{state.display_name} {'✅' if state.name and state.is_target else '❌'}"
+
+
 def main_menu(remapper) -> None:
     """Главное меню программы."""
-    remapper.process_monitor.start_monitoring()
-
     while True:
         clear_screen()
         print("\n" + "=" * 60)
@@ -32,8 +44,8 @@ def main_menu(remapper) -> None:
         print("=" * 60)
         current_profile = remapper.config_manager.get_current_profile()
         print(f"📌 Текущий профиль: {current_profile.name}")
-        print(f"🎯 Целевой процесс: {current_profile.target_process}")
-        print(f"🖥️  Активный процесс: {remapper.process_monitor.current_process_info} {remapper.process_monitor.process_match_status}")
+        print(f"🎯 Целевой процесс: {format_target_process(current_profile.target_process)}")
+        print(f"🖥️  Активный процесс: {format_active_process_status(remapper)}")
         print("=" * 60)
         print("1. 📋 Показать текущие назначения")
         print("2. ➕ Добавить назначение")
@@ -50,12 +62,13 @@ def main_menu(remapper) -> None:
         print("D. 🎙️  Запись макросов")
         print("E. 🚀 Быстрые профили")
         print("F. ⚙️  Настройки приложения")
+        print("G. ⌨️  Сокращения (автозамена)")
 
         print("A. ℹ️  Информация о программе")
         print("B. 🖥️  Показать текущий статус процесса (детальный)")
         print("0. 🚪 Выйти")
 
-        choice = input("\n🎯 Выберите действие (0-9, A-F): ").strip().upper()
+        choice = input("\n🎯 Выберите действие (0-9, A-G): ").strip().upper()
 
         if choice == '1':
             remapper.show_mappings()
@@ -93,6 +106,8 @@ def main_menu(remapper) -> None:
             quick_profile_dialog(remapper)
         elif choice == 'F':
             settings_dialog(remapper)
+        elif choice == 'G':
+            hotstrings_dialog(remapper)
 
         elif choice == 'A' or choice == 'А':
             show_info_dialog()
@@ -101,7 +116,6 @@ def main_menu(remapper) -> None:
             show_current_process_status(remapper)
         elif choice == '0':
             print("👋 До свидания!")
-            remapper.process_monitor.stop_monitoring()
             break
         else:
             print("❌ Неверный выбор, попробуйте снова")
@@ -117,8 +131,8 @@ def manage_profiles_menu(remapper) -> None:
         print("=" * 50)
         current_profile = remapper.config_manager.get_current_profile()
         print(f"📌 Текущий профиль: {current_profile.name}")
-        print(f"🎯 Целевой процесс: {current_profile.target_process}")
-        print(f"🖥️  Активный процесс: {remapper.process_monitor.current_process_info} {remapper.process_monitor.process_match_status}")
+        print(f"🎯 Целевой процесс: {format_target_process(current_profile.target_process)}")
+        print(f"🖥️  Активный процесс: {format_active_process_status(remapper)}")
         print("=" * 50)
         print("1. 📋 Список профилей")
         print("2. ➕ Создать профиль")
@@ -177,25 +191,5 @@ def show_current_process_status(remapper) -> None:
         print("❌ Библиотеки для определения процесса не установлены!")
         return
 
-    print("\n🖥️  Текущий статус процесса:")
-    print("Нажмите Ctrl+C для возврата в меню")
-
-    try:
-        while True:
-            current_process = remapper.process_monitor.get_active_window_process()
-            current_profile = remapper.config_manager.get_current_profile()
-            is_target = remapper.process_monitor.is_target_process_active(
-                current_profile.target_process,
-                use_cache=False
-            )
-
-            status_icon = "✅" if is_target else "❌"
-            print(
-                f"\r{status_icon} Активный процесс: {current_process or 'Не определен'} | "
-                f"Целевой: {current_profile.target_process} | "
-                f"Работает: {'ДА' if is_target else 'НЕТ'}",
-                end="", flush=True
-            )
-            time.sleep(0.5)
-    except KeyboardInterrupt:
-        print("\n\n🔙 Возврат в меню...")
\ No newline at end of file
+    current_profile = remapper.config_manager.get_current_profile()
+    RealTimeDisplay.show_process_status(remapper.process_monitor, current_profile.target_process)
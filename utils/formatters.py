@@ -7,7 +7,9 @@ from constants import SYMBOL_CATEGORIES, CURRENCIES
 
 def format_key_display(key: str) -> str:
     """Форматирует клавишу для отображения."""
-    if '+' in key:
+    if ',' in key:
+        return ', '.join(format_key_display(step.strip()) for step in key.split(','))
+    elif '+' in key:
         parts = key.split('+')
         return '+'.join(part.capitalize() for part in parts)
     elif key.startswith('f'):
@@ -18,6 +20,13 @@ def format_key_display(key: str) -> str:
         return key.capitalize()
 
 
+def format_target_process(target_process) -> str:
+    """Форматирует целевой процесс (строку или список шаблонов) для отображения."""
+    if isinstance(target_process, (list, tuple)):
+        return ', '.join(target_process) if target_process else 'любой'
+    return target_process or 'любой'
+
+
 def get_action_display(action: str) -> str:
     """Получить отображаемое название действия."""
     action_handlers = {
@@ -29,6 +38,10 @@ def get_action_display(action: str) -> str:
 
     if action in action_handlers:
         return action_handlers[action]
+    elif action.startswith('macro:'):
+        return f"Макрос: {action[len('macro:'):]}"
+    elif action.startswith('date:'):
+        return f"Дата по шаблону: {action[len('date:'):]}"
     elif action.startswith('currency:'):
         return _format_currency_display(action)
     elif action.startswith('symbol:'):
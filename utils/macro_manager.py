@@ -8,14 +8,16 @@ from datetime import datetime
 from typing import Dict, List, Optional, Any
 from pathlib import Path
 
+from core.event_bus import EventBus, Topic
 from models.mapping import Macro
 
 
 class MacroManager:
     """Управление макросами."""
 
-    def __init__(self, config_manager):
+    def __init__(self, config_manager, event_bus: Optional[EventBus] = None):
         self.config_manager = config_manager
+        self.event_bus = event_bus
         self.macros_file = Path("macros.json")
         self.macros: Dict[str, Macro] = {}
         self.load_macros()
@@ -140,7 +142,11 @@ class MacroManager:
             return False
 
         try:
+            started_ns = time.perf_counter_ns()
             macro.execute(executor)
+            if self.event_bus is not None:
+                self.event_bus.publish(Topic.ACTION_EXECUTED, key=name, action_type='macro',
+                                       duration_ns=time.perf_counter_ns() - started_ns)
             return True
         except Exception as e:
             print(f"❌ Ошибка выполнения макроса '{name}': {e}")
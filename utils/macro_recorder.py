@@ -6,11 +6,18 @@ import time
 import threading
 from typing import List, Dict, Any, Optional, Callable
 
+from core.input_backend import InputBackend
+
 
 class MacroRecorder:
     """Запись и воспроизведение макросов."""
 
-    def __init__(self):
+    # Клавиша остановки записи не попадает в макрос
+    STOP_KEY = 'f12'
+
+    def __init__(self, backend: InputBackend):
+        self.backend = backend
+        self._hook = None
         self.is_recording = False
         self.recorded_events: List[Dict[str, Any]] = []
         self.start_time: Optional[float] = None
@@ -24,6 +31,7 @@ class MacroRecorder:
         self.is_recording = True
         self.recorded_events = []
         self.start_time = time.time()
+        self._hook = self.backend.hook(self._on_key_event)
 
         print("🔴 Запись макроса начата...")
         print("💡 Нажимайте клавиши для записи")
@@ -37,6 +45,12 @@ class MacroRecorder:
             return []
 
         self.is_recording = False
+        if self._hook is not None:
+            try:
+                self.backend.unhook(self._hook)
+            except (KeyError, ValueError):
+                pass
+            self._hook = None
         recording_duration = time.time() - self.start_time
 
         print(f"⏹️  Запись остановлена. Длительность: {recording_duration:.1f}с")
@@ -58,10 +72,21 @@ class MacroRecorder:
 
         self.recorded_events.append(event)
 
+    def _on_key_event(self, event) -> None:
+        """Обработчик хука: записывает нажатия и отпускания клавиш."""
+        if event.name == self.STOP_KEY:
+            return
+
+        # Клавиши, отправленные самим приложением, в макрос не попадают
+        ledger = self.backend.ledger
+        if ledger is not None and ledger.is_injected(event):
+            return
+
+        event_type = 'key_press' if event.event_type == 'down' else 'key_release'
+        self.record_event(event_type, {'key': event.name, 'scan_code': event.scan_code})
+
     def play_macro(self, events: List[Dict[str, Any]], speed: float = 1.0) -> None:
         """Воспроизводит записанный макрос."""
-        import keyboard
-
         print("▶️  Воспроизведение макроса...")
 
         for i, event in enumerate(events):
@@ -70,9 +95,9 @@ class MacroRecorder:
                 time.sleep(delay)
 
             if event['type'] == 'key_press':
-                keyboard.press(event['data']['key'])
+                self.backend.press(event['data']['key'])
             elif event['type'] == 'key_release':
-                keyboard.release(event['data']['key'])
+                self.backend.release(event['data']['key'])
 
         print("✅ Воспроизведение завершено")
 
@@ -9,6 +9,13 @@ def validate_key(key: str) -> Optional[str]:
     """Проверка валидности клавиши."""
     key_lower = key.lower().strip()
 
+    # Последовательность клавиш: 'ctrl+k, ctrl+d'
+    if ',' in key_lower:
+        steps = [validate_key(step) for step in key_lower.split(',')]
+        if len(steps) >= 2 and all(steps):
+            return ', '.join(steps)
+        return None
+
     # Функциональные клавиши F1-F24
     if key_lower.startswith('f') and len(key_lower) > 1:
         try: